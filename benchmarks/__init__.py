@@ -0,0 +1,4 @@
+"""Benchmarks of the hot paths of grapharray.
+
+Run ``python -m benchmarks --help`` from the repository root.
+"""
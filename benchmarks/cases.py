@@ -0,0 +1,450 @@
+"""Synthetic workloads and the benchmark cases run on them.
+
+A case is a setup function registered by the case decorator. It takes a
+Workload and returns the callable that is timed, so that building the
+inputs is not measured.
+"""
+
+from __future__ import annotations
+
+import io
+from functools import cached_property
+from typing import Callable, List, NamedTuple
+
+import numpy as np
+
+try:
+    import pandas
+except ImportError:  # pandas is optional.
+    pandas = None
+
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    NodeArray,
+    EdgeArray,
+    AdjacencyMatrix,
+    IncidenceMatrix,
+)
+from grapharray.functions import gather, reduce_edges
+from grapharray.spmv import ParallelMatmul
+
+# The largest number of edges for cases on a BaseGraph. networkx holds
+# several dicts per edge, so larger graphs do not fit in memory.
+BASE_GRAPH_MAX_EDGES = 10 ** 6
+
+
+class Case(NamedTuple):
+    """A benchmark case.
+
+    Attributes:
+        name: The name of the case, "<group>.<function name>".
+        setup: A function taking a Workload and returning the callable to
+            be timed. If the callable has a close method, e.g. to stop
+            threads, it is called when the callable is no longer run.
+        fresh: Whether setup is called before every run, for callables that
+            cannot be run twice, e.g. freezing a graph.
+        max_edges: The largest number of edges the case is run for.
+    """
+
+    name: str
+    setup: Callable
+    fresh: bool
+    max_edges: int
+
+
+CASES: List[Case] = []
+
+
+def case(group: str, fresh: bool = False, max_edges: int = None):
+    """Register a setup function as a benchmark case in CASES."""
+
+    def register(setup):
+        CASES.append(
+            Case(
+                f"{group}.{setup.__name__}",
+                setup,
+                fresh,
+                np.inf if max_edges is None else max_edges,
+            )
+        )
+        return setup
+
+    return register
+
+
+def synthetic_edges(n_edges: int, seed: int = 0):
+    """Draw a random directed graph without loops and parallel edges.
+
+    The graph has n_edges // 4 nodes, i.e. the average degree is 4 as in
+    road networks, and edges are in random order.
+
+    Returns:
+        A tuple of the number of nodes and the arrays of the initial and
+        terminal nodes of edges.
+    """
+    n_nodes = max(n_edges // 4, 8)
+    if n_edges > n_nodes * (n_nodes - 1):
+        raise ValueError(f"Too many edges for {n_nodes} nodes.")
+    rng = np.random.default_rng(seed)
+    codes = np.zeros(0, dtype=np.int64)
+    while len(codes) < n_edges:
+        drawn = rng.integers(0, n_nodes, size=(2, n_edges + 16))
+        drawn = drawn[:, drawn[0] != drawn[1]]
+        codes = np.concatenate((codes, drawn[0] * n_nodes + drawn[1]))
+        # Keep the first of parallel edges in the drawn order.
+        codes = codes[np.sort(np.unique(codes, return_index=True)[1])]
+    codes = codes[:n_edges]
+    return n_nodes, codes // n_nodes, codes % n_nodes
+
+
+class Workload:
+    """Inputs of the cases for a synthetic graph with n_edges edges.
+
+    Every input is created on the first access and shared by the cases.
+    """
+
+    def __init__(self, n_edges: int, seed: int = 0):
+        """Store the size of the graph."""
+        self.n_edges = n_edges
+        self.seed = seed
+
+    @cached_property
+    def _edges(self):
+        """The result of synthetic_edges"""
+        return synthetic_edges(self.n_edges, self.seed)
+
+    @property
+    def n_nodes(self) -> int:
+        """The number of nodes"""
+        return self._edges[0]
+
+    @property
+    def tails(self) -> np.ndarray:
+        """Initial nodes of the edges"""
+        return self._edges[1]
+
+    @property
+    def heads(self) -> np.ndarray:
+        """Terminal nodes of the edges"""
+        return self._edges[2]
+
+    @cached_property
+    def edge_list(self) -> list:
+        """The edges as a list of tuples"""
+        return list(zip(self.tails.tolist(), self.heads.tolist()))
+
+    def new_base_graph(self) -> BaseGraph:
+        """Build a BaseGraph, which is not frozen."""
+        graph = BaseGraph()
+        graph.add_nodes_from(range(self.n_nodes))
+        graph.add_edges_from(self.edge_list)
+        return graph
+
+    @cached_property
+    def base_graph(self) -> BaseGraph:
+        """The frozen BaseGraph"""
+        graph = self.new_base_graph()
+        graph.freeze()
+        return graph
+
+    def new_compact_graph(self) -> CompactGraph:
+        """Build a CompactGraph from the edge arrays."""
+        return CompactGraph.from_edge_arrays(
+            self.tails, self.heads, node_labels=np.arange(self.n_nodes)
+        )
+
+    @cached_property
+    def graph(self) -> CompactGraph:
+        """The CompactGraph on which array and matrix cases are run"""
+        return self.new_compact_graph()
+
+    @cached_property
+    def reordered_graph(self) -> CompactGraph:
+        """The graph whose indices are in reverse Cuthill-McKee order"""
+        graph = self.new_base_graph()
+        graph.freeze(reorder="rcm")
+        return CompactGraph.from_base_graph(graph)
+
+    @cached_property
+    def rng(self):
+        """The random generator of values"""
+        return np.random.default_rng(self.seed + 1)
+
+    def edge_array(self) -> EdgeArray:
+        """Create an EdgeArray of random values on graph."""
+        return EdgeArray(self.graph, init_val=self.rng.random(self.n_edges))
+
+    def node_array(self) -> NodeArray:
+        """Create a NodeArray of random values on graph."""
+        return NodeArray(self.graph, init_val=self.rng.random(self.n_nodes))
+
+
+# Graph construction
+
+
+@case("graph", max_edges=BASE_GRAPH_MAX_EDGES)
+def base_graph_construction(workload):
+    workload.edge_list  # Created here so that it is not timed.
+    return workload.new_base_graph
+
+
+@case("graph", fresh=True, max_edges=BASE_GRAPH_MAX_EDGES)
+def base_graph_freeze(workload):
+    return workload.new_base_graph().freeze
+
+
+@case("graph", fresh=True, max_edges=BASE_GRAPH_MAX_EDGES)
+def base_graph_freeze_rcm(workload):
+    graph = workload.new_base_graph()
+    return lambda: graph.freeze(reorder="rcm")
+
+
+@case("graph")
+def compact_graph_from_edge_arrays(workload):
+    tails, heads = workload.tails, workload.heads
+    labels = np.arange(workload.n_nodes)
+    return lambda: CompactGraph.from_edge_arrays(tails, heads, labels)
+
+
+@case("graph", max_edges=BASE_GRAPH_MAX_EDGES)
+def compact_graph_from_base_graph(workload):
+    graph = workload.base_graph
+    return lambda: CompactGraph.from_base_graph(graph)
+
+
+@case("graph", fresh=True)
+def grouped_edges(workload):
+    graph = workload.new_compact_graph()
+    return lambda: graph.grouped_edges("head")
+
+
+@case("graph")
+def edges_to_indices(workload):
+    graph = workload.graph
+    edges = np.stack((workload.tails, workload.heads), axis=1)[::-1]
+    return lambda: graph.edges_to_indices(edges)
+
+
+# Array initialization
+
+
+@case("init")
+def scalar(workload):
+    graph = workload.graph
+    return lambda: EdgeArray(graph, init_val=1.0)
+
+
+@case("init")
+def ndarray(workload):
+    graph = workload.graph
+    values = workload.rng.random(workload.n_edges)
+    return lambda: EdgeArray(graph, init_val=values)
+
+
+@case("init")
+def ndarray_float32(workload):
+    graph = workload.graph
+    values = workload.rng.random(workload.n_edges)
+    return lambda: EdgeArray(graph, init_val=values, dtype=np.float32)
+
+
+@case("init", max_edges=BASE_GRAPH_MAX_EDGES)
+def dict_on_base_graph(workload):
+    graph = workload.base_graph
+    values = dict(zip(workload.edge_list, range(workload.n_edges)))
+    return lambda: EdgeArray(graph, init_val=values)
+
+
+# Element-wise operations
+
+
+@case("ops")
+def add(workload):
+    x, y = workload.edge_array(), workload.edge_array()
+    return lambda: x + y
+
+
+@case("ops")
+def multiply_scalar(workload):
+    x = workload.edge_array()
+    return lambda: x * 2.0
+
+
+@case("ops")
+def iadd(workload):
+    x, y = workload.edge_array(), workload.edge_array()
+
+    def run():
+        nonlocal x
+        x += y
+
+    return run
+
+
+@case("ops")
+def bpr_eager(workload):
+    t0, x, c = (workload.edge_array() for _ in range(3))
+    return lambda: t0 * ((x / c) ** 4 * 0.15 + 1)
+
+
+@case("ops")
+def bpr_lazy(workload):
+    t0, x, c = (workload.edge_array() for _ in range(3))
+    return lambda: (t0.lazy() * (1 + 0.15 * (x.lazy() / c) ** 4)).evaluate()
+
+
+# Gather / scatter between nodes and edges
+
+
+@case("gather")
+def gather_tail(workload):
+    x = workload.node_array()
+    return lambda: gather(x, "tail")
+
+
+@case("gather", max_edges=BASE_GRAPH_MAX_EDGES)
+def gather_tail_rcm(workload):
+    graph = workload.reordered_graph
+    x = NodeArray(graph, init_val=workload.rng.random(workload.n_nodes))
+    return lambda: gather(x, "tail")
+
+
+@case("gather")
+def reduce_edges_sum(workload):
+    x = workload.edge_array()
+    return lambda: reduce_edges(x, "in", "sum")
+
+
+@case("gather")
+def reduce_edges_min(workload):
+    x = workload.edge_array()
+    return lambda: reduce_edges(x, "out", "min")
+
+
+@case("gather")
+def take(workload):
+    x = workload.edge_array()
+    indices = workload.rng.integers(0, workload.n_edges, workload.n_edges)
+    return lambda: x.take(indices)
+
+
+@case("gather")
+def put(workload):
+    x = workload.edge_array()
+    indices = workload.rng.permutation(workload.n_edges)
+    values = workload.rng.random(workload.n_edges)
+    return lambda: x.put(indices, values)
+
+
+# Matrix construction and products
+
+
+@case("matrix")
+def adjacency_build(workload):
+    weight = workload.edge_array()
+    return lambda: AdjacencyMatrix(weight)
+
+
+@case("matrix")
+def adjacency_matvec(workload):
+    matrix = AdjacencyMatrix(workload.edge_array())
+    x = workload.node_array()
+    return lambda: matrix @ x
+
+
+@case("matrix", max_edges=BASE_GRAPH_MAX_EDGES)
+def adjacency_matvec_rcm(workload):
+    graph = workload.reordered_graph
+    matrix = AdjacencyMatrix(
+        EdgeArray(graph, init_val=workload.rng.random(workload.n_edges))
+    )
+    x = NodeArray(graph, init_val=workload.rng.random(workload.n_nodes))
+    return lambda: matrix @ x
+
+
+@case("matrix")
+def incidence_build(workload):
+    graph = workload.graph
+    return lambda: IncidenceMatrix(graph)
+
+
+@case("matrix")
+def incidence_matvec(workload):
+    matrix = IncidenceMatrix(workload.graph)
+    x = workload.edge_array()
+    return lambda: matrix @ x
+
+
+@case("matrix", max_edges=BASE_GRAPH_MAX_EDGES)
+def incidence_matvec_rcm(workload):
+    graph = workload.reordered_graph
+    matrix = IncidenceMatrix(graph)
+    x = EdgeArray(graph, init_val=workload.rng.random(workload.n_edges))
+    return lambda: matrix @ x
+
+
+@case("matrix")
+def adjacency_matvec_threads(workload):
+    matrix = ParallelMatmul(AdjacencyMatrix(workload.edge_array()))
+    return _threaded_matvec(matrix, workload.node_array())
+
+
+@case("matrix")
+def incidence_matvec_threads(workload):
+    matrix = ParallelMatmul(IncidenceMatrix(workload.graph))
+    return _threaded_matvec(matrix, workload.edge_array())
+
+
+def _threaded_matvec(matrix: ParallelMatmul, x):
+    """Return the product with x to be timed, which stops the threads."""
+
+    def run():
+        return matrix @ x
+
+    run.close = matrix.close
+    return run
+
+
+@case("matrix")
+def incidence_matrix_free_matvec(workload):
+    matrix = IncidenceMatrix(workload.graph, matrix_free=True)
+    x = workload.edge_array()
+    return lambda: matrix @ x
+
+
+# Export
+
+
+@case("export", max_edges=BASE_GRAPH_MAX_EDGES)
+def as_dict(workload):
+    x = workload.edge_array()
+    return x.as_dict
+
+
+@case("export")
+def to_arrays(workload):
+    x = workload.edge_array()
+    x.to_arrays()  # The key columns are cached on the graph.
+    return x.to_arrays
+
+
+@case("export")
+def to_records(workload):
+    x = workload.edge_array()
+    return x.to_records
+
+
+if pandas is not None:
+
+    @case("export")
+    def to_pandas(workload):
+        x = workload.edge_array()
+        x.to_pandas()  # The index is cached on the graph.
+        return x.to_pandas
+
+
+@case("export", max_edges=BASE_GRAPH_MAX_EDGES)
+def dump(workload):
+    x = workload.edge_array()
+    return lambda: x.dump(io.StringIO())
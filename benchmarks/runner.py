@@ -0,0 +1,283 @@
+"""Running the benchmark cases and comparing the results to a baseline.
+
+Examples:
+    Run all the cases for 1e3 to 1e5 edges and save the results::
+
+        python -m benchmarks --sizes 1e3 1e4 1e5 --output baseline.json
+
+    Run the matrix cases for 1e7 edges and compare them to a baseline::
+
+        python -m benchmarks --select "matrix.*" --sizes 1e7 \\
+            --compare baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import List
+
+import numpy as np
+import scipy
+import networkx as nx
+
+import grapharray
+from benchmarks.cases import CASES, Case, Workload
+
+FORMAT_VERSION = 1
+
+# Differences of peak memory smaller than this are not regressions.
+MEMORY_SLACK = 1 << 16
+
+
+def measure(case: Case, workload: Workload, repeat: int = 5) -> dict:
+    """Time a case and measure its peak memory.
+
+    The callable is run once before timing unless the case is fresh. Its
+    peak memory is measured with tracemalloc in a separate run, since
+    tracing slows down the run. Callables are closed when they are no
+    longer run, see Case.
+
+    Returns:
+        A dict of the minimum and median seconds of the runs and the peak
+        bytes allocated by a run.
+    """
+    run = None if case.fresh else case.setup(workload)
+    try:
+        if run is not None:
+            run()
+        times = []
+        for _ in range(repeat):
+            if case.fresh:
+                _close(run)
+                run = case.setup(workload)
+            gc.collect()
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        if case.fresh:
+            _close(run)
+            run = case.setup(workload)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    finally:
+        _close(run)
+    return {
+        "time": min(times),
+        "median_time": statistics.median(times),
+        "repeat": repeat,
+        "peak_memory": peak_memory,
+    }
+
+
+def _close(run):
+    """Call the close method of a timed callable if it has one."""
+    close = getattr(run, "close", None)
+    if close is not None:
+        close()
+
+
+def select_cases(patterns: List[str] = None) -> List[Case]:
+    """Return the cases whose names match any of fnmatch patterns."""
+    if not patterns:
+        return list(CASES)
+    return [
+        case
+        for case in CASES
+        if any(fnmatch.fnmatchcase(case.name, p) for p in patterns)
+    ]
+
+
+def run(
+    sizes: List[int],
+    cases: List[Case] = None,
+    repeat: int = 5,
+    seed: int = 0,
+    report=None,
+) -> List[dict]:
+    """Run cases for graphs of every size.
+
+    Args:
+        sizes: The numbers of edges of the synthetic graphs.
+        cases: The cases to run. Defaults to all the cases.
+        repeat: The number of timed runs of each case.
+        seed: The seed of the synthetic graphs and values.
+        report: A function called with every result when it is measured.
+
+    Returns:
+        A list of the results, dicts with keys case, n_edges, time,
+        median_time, repeat and peak_memory.
+    """
+    cases = CASES if cases is None else cases
+    results = []
+    for n_edges in sizes:
+        workload = Workload(n_edges, seed)
+        for case in cases:
+            if n_edges > case.max_edges:
+                continue
+            result = {"case": case.name, "n_edges": n_edges}
+            result.update(measure(case, workload, repeat))
+            results.append(result)
+            if report is not None:
+                report(result)
+    return results
+
+
+def environment() -> dict:
+    """Return the versions of Python and the packages for the results."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "grapharray": grapharray.__version__,
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "networkx": nx.__version__,
+    }
+
+
+def save(path: str, results: List[dict]):
+    """Save results as JSON with the environment."""
+    with open(path, "w") as fp:
+        json.dump(
+            {
+                "format_version": FORMAT_VERSION,
+                "environment": environment(),
+                "results": results,
+            },
+            fp,
+            indent=2,
+        )
+
+
+def load(path: str) -> List[dict]:
+    """Load results saved by save."""
+    with open(path) as fp:
+        saved = json.load(fp)
+    if saved["format_version"] != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported format version {saved['format_version']}."
+        )
+    return saved["results"]
+
+
+def compare(
+    results: List[dict], baseline: List[dict], tolerance: float = 0.2
+) -> List[dict]:
+    """Compare results with the baseline results of the same cases.
+
+    Args:
+        results: The results of run.
+        baseline: Results of a previous run, e.g. loaded by load.
+        tolerance: The relative increase of time or peak memory regarded
+            as a regression.
+
+    Returns:
+        A list of dicts with keys case, n_edges, time_ratio, memory_ratio
+        and regression, for the results found in baseline.
+    """
+    known = {(r["case"], r["n_edges"]): r for r in baseline}
+    rows = []
+    for result in results:
+        base = known.get((result["case"], result["n_edges"]))
+        if base is None:
+            continue
+        time_ratio = result["time"] / max(base["time"], 1e-9)
+        memory_ratio = result["peak_memory"] / max(base["peak_memory"], 1)
+        rows.append(
+            {
+                "case": result["case"],
+                "n_edges": result["n_edges"],
+                "time_ratio": time_ratio,
+                "memory_ratio": memory_ratio,
+                "regression": time_ratio > 1 + tolerance
+                or (
+                    memory_ratio > 1 + tolerance
+                    and result["peak_memory"] - base["peak_memory"]
+                    > MEMORY_SLACK
+                ),
+            }
+        )
+    return rows
+
+
+def _format_result(result: dict) -> str:
+    """Format a result of run as a line."""
+    return (
+        f"{result['case']:<40} {result['n_edges']:>10} "
+        f"{result['time'] * 1e3:>12.3f} ms "
+        f"{result['peak_memory'] / (1 << 20):>10.2f} MiB"
+    )
+
+
+def _format_row(row: dict) -> str:
+    """Format a row of compare as a line."""
+    return (
+        f"{row['case']:<40} {row['n_edges']:>10} "
+        f"{row['time_ratio']:>8.2f}x time {row['memory_ratio']:>8.2f}x memory"
+        + ("  REGRESSION" if row["regression"] else "")
+    )
+
+
+def main(argv: List[str] = None) -> int:
+    """Run the benchmarks from the command line.
+
+    Returns:
+        The exit status, 1 if a regression from the baseline is found.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Measure time and peak memory of grapharray hot paths.",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=lambda s: int(float(s)),
+        default=[10 ** 3, 10 ** 4, 10 ** 5],
+        help="numbers of edges of the synthetic graphs, e.g. 1e3 1e7",
+    )
+    parser.add_argument(
+        "--select", nargs="+", help="fnmatch patterns of case names"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="path to save the results as JSON")
+    parser.add_argument("--compare", help="path to baseline results")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument(
+        "--list", action="store_true", help="list the cases and exit"
+    )
+    args = parser.parse_args(argv)
+
+    cases = select_cases(args.select)
+    if args.list:
+        for case in cases:
+            print(case.name)
+        return 0
+    baseline = None if args.compare is None else load(args.compare)
+    results = run(
+        args.sizes,
+        cases,
+        args.repeat,
+        args.seed,
+        report=lambda result: print(_format_result(result), flush=True),
+    )
+    if args.output is not None:
+        save(args.output, results)
+    if baseline is None:
+        return 0
+    print(f"\nCompared with {args.compare}:")
+    rows = compare(results, baseline, args.tolerance)
+    for row in rows:
+        print(_format_row(row))
+    return int(any(row["regression"] for row in rows))
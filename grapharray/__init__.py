@@ -1,4 +1,14 @@
 from grapharray.classes import *
 from grapharray.functions import *
+from grapharray.io import *
+from grapharray.shared import *
+from grapharray.subgraph import *
+from grapharray.lazy import *
+from grapharray.parallel import *
+from grapharray.nxview import *
+from grapharray.profiling import *
+from grapharray.shortest_path import *
+from grapharray.assignment import *
+from grapharray.spmv import *
 
 __version__ = "1.0.2"
@@ -0,0 +1,257 @@
+"""Static traffic assignment to the user equilibrium."""
+
+from __future__ import annotations
+
+from typing import NamedTuple, Union
+
+import numpy as np
+
+from grapharray.classes import EdgeArray, NodeArray, BatchNodeArray
+from grapharray.shortest_path import ShortestPathEngine
+
+# Bounds of the weight of the previous direction in conjugate Frank-Wolfe
+_MAX_CONJUGATE_WEIGHT = 0.99999
+
+
+class BPR:
+    """The link cost function of the Bureau of Public Roads.
+
+    The cost of an edge with flow x is t0 * (1 + alpha * (x / c) ** beta),
+    where t0 is the free flow time and c is the capacity of the edge. All
+    the edges are evaluated at once without temporary arrays when out is
+    given.
+
+    Args:
+        free_flow_time: The cost of each edge without flow.
+        capacity: The capacity of each edge.
+        alpha: A float or an EdgeArray of alpha.
+        beta: A float or an EdgeArray of beta.
+    """
+
+    def __init__(
+        self,
+        free_flow_time: EdgeArray,
+        capacity: EdgeArray,
+        alpha: Union[float, EdgeArray] = 0.15,
+        beta: Union[float, EdgeArray] = 4.0,
+    ):
+        """Check that the parameters are on the same base graph."""
+        free_flow_time._operation_error_check(capacity, (EdgeArray,))
+        for parameter in (alpha, beta):
+            if isinstance(parameter, EdgeArray):
+                free_flow_time._operation_error_check(parameter, (EdgeArray,))
+        self.free_flow_time = free_flow_time
+        self.capacity = capacity
+        self.alpha = alpha
+        self.beta = beta
+
+    @property
+    def base_graph(self):
+        """The graph on whose edges the costs are defined"""
+        return self.free_flow_time.base_graph
+
+    def __call__(self, flow: EdgeArray, out: EdgeArray = None) -> EdgeArray:
+        """Return the cost of each edge with flow.
+
+        Args:
+            flow: The flow of each edge.
+            out: An EdgeArray of float to which the costs are written.
+        """
+        self.free_flow_time._operation_error_check(flow, (EdgeArray,))
+        if out is None:
+            out = EdgeArray(self.base_graph, init_val=0.0)
+        self.free_flow_time._operation_error_check(out, (EdgeArray,))
+        self._evaluate(flow._array, _writable(out))
+        return out
+
+    def derivative(self, flow: EdgeArray, out: EdgeArray = None) -> EdgeArray:
+        """Return the derivative of the cost of each edge with flow.
+
+        Args:
+            flow: The flow of each edge.
+            out: An EdgeArray of float to which the derivatives are written.
+        """
+        self.free_flow_time._operation_error_check(flow, (EdgeArray,))
+        if out is None:
+            out = EdgeArray(self.base_graph, init_val=0.0)
+        self.free_flow_time._operation_error_check(out, (EdgeArray,))
+        self._evaluate_derivative(flow._array, _writable(out))
+        return out
+
+    def _evaluate(self, flow: np.ndarray, out: np.ndarray):
+        """Write the costs given the core array of flows into out."""
+        alpha, beta = _values(self.alpha), _values(self.beta)
+        np.divide(flow, self.capacity._array, out=out)
+        np.power(out, beta, out=out)
+        np.multiply(out, alpha, out=out)
+        np.add(out, 1, out=out)
+        np.multiply(out, self.free_flow_time._array, out=out)
+
+    def _evaluate_derivative(self, flow: np.ndarray, out: np.ndarray):
+        """Write the derivatives given the core array of flows into out."""
+        alpha, beta = _values(self.alpha), _values(self.beta)
+        np.divide(flow, self.capacity._array, out=out)
+        np.power(out, np.subtract(beta, 1), out=out)
+        np.multiply(out, np.multiply(alpha, beta), out=out)
+        np.divide(out, self.capacity._array, out=out)
+        np.multiply(out, self.free_flow_time._array, out=out)
+
+
+class AssignmentResult(NamedTuple):
+    """The result of user_equilibrium.
+
+    Attributes:
+        flow: The flow of each edge at the equilibrium.
+        cost: The cost of each edge with the flow.
+        gaps: The relative gap at each iteration.
+        converged: Whether the relative gap reached the tolerance.
+    """
+
+    flow: EdgeArray
+    cost: EdgeArray
+    gaps: np.ndarray
+    converged: bool
+
+
+def user_equilibrium(
+    link_cost: BPR,
+    origins,
+    demand: Union[NodeArray, BatchNodeArray],
+    method: str = "frank-wolfe",
+    max_iterations: int = 100,
+    tolerance: float = 1e-4,
+    line_search_iterations: int = 30,
+    engine: ShortestPathEngine = None,
+) -> AssignmentResult:
+    """Assign demand to the edges so that no traveler can reduce the cost.
+
+    Each iteration loads the demand of all the origins onto the shortest
+    paths with the current costs at once, and moves the flows towards
+    the loaded flows by the step found by bisection on the derivative of
+    the Beckmann objective. The flows, costs and directions are kept in
+    buffers allocated before the iterations, and the structure of the
+    graph is reused by the shortest path engine.
+
+    The relative gap is (cost @ flow - cost @ loaded) / (cost @ flow),
+    where loaded is the all-or-nothing flow with the current costs.
+
+    Args:
+        link_cost: The cost function of the edges.
+        origins: A node, or a list or 1-dimensional np.ndarray of nodes.
+        demand: The demand from the origins to each node. It is a
+            BatchNodeArray with a column per origin for a batch of
+            origins, and a NodeArray for a single origin.
+        method: "frank-wolfe", or "conjugate" for the conjugate
+            Frank-Wolfe method, which makes the directions conjugate with
+            respect to the derivatives of the costs.
+        max_iterations: The maximum number of iterations.
+        tolerance: The relative gap at which the iterations stop.
+        line_search_iterations: The number of bisections in line search.
+        engine: A ShortestPathEngine on the base graph to reuse.
+
+    Returns:
+        An AssignmentResult.
+    """
+    if method not in ("frank-wolfe", "conjugate"):
+        raise ValueError(
+            f'method must be "frank-wolfe" or "conjugate", not {method}.'
+        )
+    base_graph = link_cost.base_graph
+    if engine is None:
+        engine = ShortestPathEngine(base_graph)
+    elif engine.base_graph is not base_graph:
+        raise ValueError(
+            "Cannot compute between variables associated with different "
+            "graphs."
+        )
+    flow, loaded, cost, direction = (
+        EdgeArray(base_graph, init_val=0.0) for _ in range(4)
+    )
+    x, y, t, s = (_writable(a) for a in (flow, loaded, cost, direction))
+    # Work arrays of the line search and the conjugate direction
+    step = np.empty_like(x)
+    trial = np.empty_like(x)
+
+    link_cost._evaluate(x, t)
+    engine.solve(cost, origins, method="dijkstra").load(demand, out=flow)
+    gaps = []
+    converged = False
+    for iteration in range(max_iterations):
+        link_cost._evaluate(x, t)
+        paths = engine.solve(cost, origins, method="dijkstra")
+        paths.load(demand, out=loaded)
+        total_cost = np.dot(t, x)
+        gap = (total_cost - np.dot(t, y)) / total_cost if total_cost else 0.0
+        gaps.append(gap)
+        if gap <= tolerance:
+            converged = True
+            break
+        if method == "conjugate" and iteration > 0:
+            weight = _conjugate_weight(link_cost, x, y, s, step, trial)
+            np.multiply(s, weight, out=s)
+            np.multiply(y, 1 - weight, out=trial)
+            np.add(s, trial, out=s)
+        else:
+            np.copyto(s, y)
+        np.subtract(s, x, out=step)
+        ratio = _line_search(link_cost, x, step, trial, line_search_iterations)
+        np.multiply(step, ratio, out=step)
+        np.add(x, step, out=x)
+    link_cost._evaluate(x, t)
+    return AssignmentResult(flow, cost, np.array(gaps), converged)
+
+
+def _line_search(link_cost, x, step, trial, iterations) -> float:
+    """Return the ratio of step minimizing the Beckmann objective.
+
+    The derivative of the objective along step is
+    step @ link_cost(x + ratio * step), which increases with ratio.
+    """
+
+    def slope(ratio):
+        np.multiply(step, ratio, out=trial)
+        np.add(x, trial, out=trial)
+        link_cost._evaluate(trial, trial)
+        return np.dot(step, trial)
+
+    if slope(1.0) <= 0:
+        return 1.0
+    low, high = 0.0, 1.0
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        if slope(middle) > 0:
+            high = middle
+        else:
+            low = middle
+    return (low + high) / 2
+
+
+def _conjugate_weight(link_cost, x, y, s, step, trial) -> float:
+    """Return the weight of the previous direction s in the new direction.
+
+    The new direction weight * s + (1 - weight) * y is chosen so that its
+    step from x is conjugate to the previous step s - x with respect to
+    the derivatives of the costs at x.
+    """
+    link_cost._evaluate_derivative(x, trial)
+    np.subtract(s, x, out=step)
+    np.multiply(trial, step, out=trial)
+    weighted_y = np.dot(trial, y)
+    numerator = weighted_y - np.dot(trial, x)
+    denominator = weighted_y - np.dot(trial, s)
+    if denominator == 0:
+        return 0.0
+    return min(max(numerator / denominator, 0.0), _MAX_CONJUGATE_WEIGHT)
+
+
+def _values(parameter):
+    """Return the core array of an EdgeArray parameter, or a float."""
+    if isinstance(parameter, EdgeArray):
+        return parameter._array
+    return parameter
+
+
+def _writable(array: EdgeArray) -> np.ndarray:
+    """Return the core array of array to write into in place."""
+    array._ensure_writable()
+    return array._array
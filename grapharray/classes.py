@@ -2,11 +2,19 @@
 """
 
 from __future__ import annotations
+from collections.abc import Mapping
+from itertools import chain
 import numpy as np
 import networkx as nx
+import scipy.sparse as sp
+from scipy.sparse import csgraph
 from types import MappingProxyType
 
 
+# Types of scalars accepted as init_val and operands of arrays
+_SCALAR_TYPES = (int, float, np.number, np.bool_)
+
+
 class BaseGraph(nx.DiGraph):
     """ Directed graph object on which arrays are defined.
 
@@ -26,21 +34,764 @@ class BaseGraph(nx.DiGraph):
         """Correspondence between edges and array indices"""
         return self._edge_to_index
 
-    def freeze(self):
+    @property
+    def edge_tails(self):
+        """Array indices of the initial nodes of edges in the edge order"""
+        return self._edge_tails
+
+    @property
+    def edge_heads(self):
+        """Array indices of the terminal nodes of edges in the edge order"""
+        return self._edge_heads
+
+    def grouped_edges(self, by: str = "tail"):
+        """Group edge indices by their initial or terminal nodes.
+
+        The result is computed once and cached in the graph.
+
+        Args:
+            by: "tail" to group edges by initial nodes (out-edges),
+                "head" to group them by terminal nodes (in-edges).
+
+        Returns:
+            A tuple (indptr, order) of np.ndarray. The indices of edges
+            grouped into the node with array index i are
+            order[indptr[i]:indptr[i + 1]], sorted by the other end node.
+            This is the same layout as CSR (by="tail") or CSC (by="head")
+            sparse matrices.
+        """
+        if by not in ("tail", "head"):
+            raise ValueError(f"by must be 'tail' or 'head', not {by!r}.")
+        if by not in self._grouped_edges:
+            if by == "tail":
+                key, sub_key = self.edge_tails, self.edge_heads
+            else:
+                key, sub_key = self.edge_heads, self.edge_tails
+            self._grouped_edges[by] = _group_edges(
+                key, sub_key, self.number_of_nodes()
+            )
+        return self._grouped_edges[by]
+
+    def nodes_to_indices(self, nodes) -> np.ndarray:
+        """Translate a batch of nodes into an array of array indices.
+
+        Args:
+            nodes: A list or 1-dimensional np.ndarray of nodes.
+
+        Returns:
+            np.ndarray of array indices in the same order as nodes.
+        """
+        return _keys_to_indices(self.node_to_index, nodes)
+
+    def edges_to_indices(self, edges) -> np.ndarray:
+        """Translate a batch of edges into an array of array indices.
+
+        Args:
+            edges: A list of (init, term) tuples or an np.ndarray of
+                shape (n, 2).
+
+        Returns:
+            np.ndarray of array indices in the same order as edges.
+        """
+        if isinstance(edges, np.ndarray) and edges.ndim == 2:
+            edges = map(tuple, edges.tolist())
+        return _keys_to_indices(self.edge_to_index, edges)
+
+    def __getstate__(self):
+        """Return the state for pickle, replacing read-only mappings."""
+        state = self.__dict__.copy()
+        state.pop("_export_cache", None)
+        for name in ("_node_to_index", "_edge_to_index"):
+            if name in state:
+                state[name] = dict(state[name])
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state pickled by __getstate__."""
+        for name in ("_node_to_index", "_edge_to_index"):
+            if name in state:
+                state[name] = MappingProxyType(state[name])
+        self.__dict__.update(state)
+
+    def freeze(self, reorder: str = None):
         """Freeze the graph and map between nodes / edges and array indices
 
             This method must be called before the instance is passed to 
             array initialization methods.
+
+            Args:
+                reorder: How array indices are assigned. If None, nodes and
+                    edges are indexed in the insertion order. Otherwise,
+                    nodes are ordered as follows and edges are sorted by
+                    the indices of their (tail, head), so that the edges
+                    from each node are contiguous as in CSR matrices.
+
+                    - "tail": Nodes in the insertion order.
+                    - "bfs": Breadth-first order of each weakly connected
+                      component from its first inserted node.
+                    - "rcm": Reverse Cuthill-McKee order, which reduces
+                      the bandwidth of the adjacency matrix.
+
+                    Close nodes get close indices, which improves the memory
+                    locality of matrix products and gathers on large graphs.
+                    Arrays, imports and exports use the new indices through
+                    node_to_index and edge_to_index transparently.
         """
+        if reorder not in (None, "tail", "bfs", "rcm"):
+            raise ValueError(
+                f'reorder must be None, "tail", "bfs" or "rcm", '
+                f"not {reorder!r}."
+            )
         nx.freeze(self)
-        self._node_to_index = MappingProxyType(
-            {node: i for i, node in enumerate(self.nodes)}
-        )
+        nodes = list(self.nodes)
+        edges = list(self.edges)
+        node_to_index = dict(zip(nodes, range(len(nodes))))
+        end_nodes = chain.from_iterable(edges)
+        ends = np.fromiter(
+            map(node_to_index.__getitem__, end_nodes),
+            dtype=_index_dtype(len(nodes)),
+            count=2 * len(edges),
+        ).reshape((-1, 2))
+        tails, heads = ends[:, 0], ends[:, 1]
+        if reorder is not None:
+            node_order = _node_order(tails, heads, len(nodes), reorder)
+            rank = np.empty_like(node_order)
+            rank[node_order] = np.arange(len(nodes), dtype=rank.dtype)
+            tails, heads = rank[tails], rank[heads]
+            edge_order = np.lexsort((heads, tails))
+            tails, heads = tails[edge_order], heads[edge_order]
+            nodes = [nodes[i] for i in node_order.tolist()]
+            edges = [edges[i] for i in edge_order.tolist()]
+            node_to_index = dict(zip(nodes, range(len(nodes))))
+        self._node_to_index = MappingProxyType(node_to_index)
         self._edge_to_index = MappingProxyType(
-            {edge: i for i, edge in enumerate(self.edges)}
+            dict(zip(edges, range(len(edges))))
+        )
+        self._edge_tails = tails.copy()
+        self._edge_heads = heads.copy()
+        self._edge_tails.flags.writeable = False
+        self._edge_heads.flags.writeable = False
+        self._grouped_edges = {}
+        self.__dict__.pop("_export_cache", None)
+
+
+def _node_order(tails, heads, n_nodes: int, reorder: str) -> np.ndarray:
+    """Return the indices of nodes in the order given by reorder.
+
+    See BaseGraph.freeze for the orders.
+    """
+    index_dtype = _index_dtype(n_nodes)
+    if reorder == "tail" or n_nodes == 0:
+        return np.arange(n_nodes, dtype=index_dtype)
+    pattern = sp.csr_matrix(
+        (np.ones(len(tails), dtype=np.int8), (tails, heads)),
+        shape=(n_nodes, n_nodes),
+    )
+    pattern = (pattern + pattern.T).tocsr()
+    if reorder == "rcm":
+        order = csgraph.reverse_cuthill_mckee(pattern, symmetric_mode=True)
+        return order.astype(index_dtype)
+    _, components = csgraph.connected_components(pattern, directed=False)
+    # The first node of each component in the insertion order
+    _, starts = np.unique(components, return_index=True)
+    return np.concatenate(
+        [
+            csgraph.breadth_first_order(
+                pattern, start, directed=False, return_predecessors=False
+            )
+            for start in np.sort(starts)
+        ]
+    ).astype(index_dtype)
+
+
+class CompactGraph:
+    """Array-backed frozen directed graph on which arrays are defined.
+
+    This works as BaseGraph for arrays and matrices, but holds the graph
+    only as NumPy arrays instead of networkx dictionaries: the edges in the
+    CSR layout (indptr, indices), the edge indices in that layout, and
+    a table of node labels. Nodes and edges are resolved into array indices
+    on demand, so no Python object is kept per edge.
+
+    Args:
+        indptr: The edges from the node with array index i are stored at
+            indices[indptr[i]:indptr[i + 1]]. Its length is the number of
+            nodes plus one.
+        indices: Array indices of the terminal nodes of edges.
+        node_labels: Unique labels of nodes in the array index order. They
+            are copied unless they are a read-only np.ndarray. If None, the
+            array indices themselves are used as the labels.
+        edge_ids: The array index of the edge stored at each position of
+            indices. If None, edges are indexed in the CSR order.
+
+    Notes:
+        The edges need not be sorted in each row, but parallel edges are not
+        allowed as in BaseGraph.
+    """
+
+    frozen = True
+
+    def __init__(self, indptr, indices, node_labels=None, edge_ids=None):
+        """Validate the arrays and set up the index arrays."""
+        indptr = np.asarray(indptr)
+        indices = np.asarray(indices)
+        n_nodes = len(indptr) - 1
+        n_edges = len(indices)
+        if (
+            n_nodes < 0
+            or indptr[0] != 0
+            or indptr[-1] != n_edges
+            or np.any(np.diff(indptr) < 0)
+        ):
+            raise ValueError("indptr is not a valid CSR index pointer.")
+        if n_edges and (indices.min() < 0 or indices.max() >= n_nodes):
+            raise ValueError("indices contains invalid node indices.")
+        if edge_ids is None:
+            edge_ids = np.arange(n_edges)
+        else:
+            edge_ids = np.asarray(edge_ids)
+            if len(edge_ids) != n_edges or np.any(
+                np.bincount(edge_ids, minlength=n_edges) != 1
+            ):
+                raise ValueError("edge_ids is not a permutation of edges.")
+        dtype = _index_dtype(max(n_nodes, n_edges))
+        tails = np.repeat(np.arange(n_nodes, dtype=dtype), np.diff(indptr))
+        codes = tails.astype(np.int64) * n_nodes + indices
+        sorter = np.argsort(codes, kind="stable")
+        codes = codes[sorter]
+        if np.any(codes[1:] == codes[:-1]):
+            raise ValueError("CompactGraph cannot have parallel edges.")
+
+        edge_ids = edge_ids[sorter].astype(dtype)
+        indices = indices[sorter].astype(dtype)
+        edge_tails = np.empty(n_edges, dtype=dtype)
+        edge_tails[edge_ids] = tails
+        edge_heads = np.empty(n_edges, dtype=dtype)
+        edge_heads[edge_ids] = indices
+        self._set_state(
+            {
+                "indptr": indptr.astype(dtype),
+                "indices": indices,
+                "edge_ids": edge_ids,
+                "edge_codes": codes,
+                "edge_tails": edge_tails,
+                "edge_heads": edge_heads,
+            },
+            node_labels,
+        )
+        self._node_to_index._check_unique()
+
+    def _get_state(self) -> dict:
+        """Return the arrays that define the graph.
+
+        The graph is restored from them by _from_state without validation
+        or sorting, which is used to load and share graphs.
+        """
+        return {
+            "indptr": self._indptr,
+            "indices": self._indices,
+            "edge_ids": self._edge_ids,
+            "edge_codes": self._edge_codes,
+            "edge_tails": self._edge_tails,
+            "edge_heads": self._edge_heads,
+        }
+
+    def __reduce__(self):
+        """Pickle only the arrays that define the graph."""
+        return self._from_state, (self._get_state(), self.node_labels)
+
+    def _set_state(self, state: dict, node_labels):
+        """Set the arrays returned by _get_state to self."""
+        for name, array in state.items():
+            setattr(self, "_" + name, _read_only(array))
+        self._node_to_index = _NodeIndex(node_labels, len(self._indptr) - 1)
+        self._edge_to_index = _EdgeIndex(self)
+        self._grouped_edges = {"tail": (self._indptr, self._edge_ids)}
+
+    @classmethod
+    def _from_state(cls, state: dict, node_labels):
+        """Restore a graph from arrays returned by _get_state as they are.
+
+        The arrays are not copied, so they can be memory-mapped or shared.
+        """
+        graph = cls.__new__(cls)
+        graph._set_state(state, node_labels)
+        return graph
+
+    @classmethod
+    def from_base_graph(cls, base_graph: BaseGraph):
+        """Create a CompactGraph with the same nodes and edges as base_graph.
+
+        The array indices of nodes and edges are kept, so that values of
+        arrays on base_graph can be used on the created graph as is.
+        """
+        indptr, order = base_graph.grouped_edges("tail")
+        return cls(
+            indptr,
+            base_graph.edge_heads[order],
+            node_labels=list(base_graph.node_to_index),
+            edge_ids=order,
+        )
+
+    @classmethod
+    def from_edge_arrays(
+        cls, tails, heads, node_labels=None, duplicates: str = "raise"
+    ):
+        """Create a CompactGraph from arrays of initial and terminal nodes.
+
+        Nodes and edges are indexed in a vectorized way, and edges keep the
+        order in which they are given.
+
+        Args:
+            tails: 1-dimensional array of the initial nodes of edges.
+            heads: 1-dimensional array of the terminal nodes of edges.
+            node_labels: All the nodes in the array index order, which may
+                include nodes without edges. If None, the sorted unique
+                values of tails and heads are used.
+            duplicates: What to do with parallel edges. "raise" raises
+                ValueError and "drop" keeps only the first of them.
+        """
+        tails = np.asarray(tails)
+        heads = np.asarray(heads)
+        if tails.ndim != 1 or tails.shape != heads.shape:
+            raise ValueError(
+                "tails and heads must be 1-dimensional arrays "
+                "of the same length."
+            )
+        if duplicates not in ("raise", "drop"):
+            raise ValueError(
+                f"duplicates must be 'raise' or 'drop', not {duplicates!r}."
+            )
+        if node_labels is None:
+            node_labels, ends = np.unique(
+                np.concatenate((tails, heads)), return_inverse=True
+            )
+        else:
+            node_index = _NodeIndex(node_labels, len(node_labels))
+            node_labels = node_index.labels
+            ends = node_index.lookup(np.concatenate((tails, heads)))
+        n_nodes = len(node_labels)
+        ends = ends.reshape(-1).astype(_index_dtype(n_nodes))
+        tails, heads = ends[: len(tails)], ends[len(tails) :]
+        if duplicates == "drop":
+            codes = tails.astype(np.int64) * n_nodes + heads
+            kept = np.sort(np.unique(codes, return_index=True)[1])
+            tails, heads = tails[kept], heads[kept]
+        order = np.argsort(tails, kind="stable")
+        indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tails, minlength=n_nodes), out=indptr[1:])
+        return cls(indptr, heads[order], node_labels, edge_ids=order)
+
+    @property
+    def indptr(self):
+        """CSR index pointer of edges grouped by their initial nodes"""
+        return self._indptr
+
+    @property
+    def indices(self):
+        """Array indices of the terminal nodes of edges in the CSR order"""
+        return self._indices
+
+    @property
+    def edge_ids(self):
+        """Array indices of edges in the CSR order"""
+        return self._edge_ids
+
+    @property
+    def node_labels(self):
+        """Labels of nodes in the array index order, or None"""
+        return self._node_to_index.labels
+
+    @property
+    def node_to_index(self):
+        """Correspondence between nodes and array indices"""
+        return self._node_to_index
+
+    @property
+    def edge_to_index(self):
+        """Correspondence between edges and array indices
+
+        Edges are resolved on demand and no dictionary is created.
+        """
+        return self._edge_to_index
+
+    @property
+    def edge_tails(self):
+        """Array indices of the initial nodes of edges in the edge order"""
+        return self._edge_tails
+
+    @property
+    def edge_heads(self):
+        """Array indices of the terminal nodes of edges in the edge order"""
+        return self._edge_heads
+
+    def number_of_nodes(self):
+        """The number of nodes"""
+        return len(self._indptr) - 1
+
+    def number_of_edges(self):
+        """The number of edges"""
+        return len(self._indices)
+
+    def grouped_edges(self, by: str = "tail"):
+        """Group edge indices by their initial or terminal nodes.
+
+        See BaseGraph.grouped_edges for details.
+        """
+        if by not in ("tail", "head"):
+            raise ValueError(f"by must be 'tail' or 'head', not {by!r}.")
+        if by not in self._grouped_edges:
+            self._grouped_edges[by] = _group_edges(
+                self.edge_heads, self.edge_tails, self.number_of_nodes()
+            )
+        return self._grouped_edges[by]
+
+    def nodes_to_indices(self, nodes) -> np.ndarray:
+        """Translate a batch of nodes into an array of array indices.
+
+        Args:
+            nodes: A list or 1-dimensional np.ndarray of nodes.
+
+        Returns:
+            np.ndarray of array indices in the same order as nodes.
+        """
+        return self._node_to_index.lookup(nodes)
+
+    def edges_to_indices(self, edges) -> np.ndarray:
+        """Translate a batch of edges into an array of array indices.
+
+        The end nodes are translated in a vectorized way and the edges are
+        searched in the sorted codes of (initial, terminal) index pairs.
+
+        Args:
+            edges: A list of (init, term) tuples or an np.ndarray of
+                shape (n, 2).
+
+        Returns:
+            np.ndarray of array indices in the same order as edges.
+        """
+        if isinstance(edges, np.ndarray) and edges.ndim == 2:
+            inits, terms = edges[:, 0], edges[:, 1]
+        else:
+            edges = list(edges)
+            inits = [edge[0] for edge in edges]
+            terms = [edge[1] for edge in edges]
+        codes = (
+            self.nodes_to_indices(inits).astype(np.int64)
+            * self.number_of_nodes()
+            + self.nodes_to_indices(terms)
+        )
+        positions, missing = _search_sorted(self._edge_codes, codes)
+        if missing is not None:
+            raise KeyError((inits[missing], terms[missing]))
+        return self._edge_ids[positions].astype(np.intp)
+
+    def freeze(self):
+        """Do nothing since CompactGraph is always frozen.
+
+        This exists so that CompactGraph can be used as BaseGraph.
+        """
+
+    def to_nx_graph(self) -> nx.DiGraph:
+        """Return a nx.DiGraph with the same nodes and edges."""
+        res_graph = nx.DiGraph()
+        res_graph.add_nodes_from(self.node_to_index)
+        res_graph.add_edges_from(self.edge_to_index)
+        return res_graph
+
+    def __str__(self):
+        """Return a string for print function"""
+        return (
+            f"{self.__class__.__name__} with "
+            f"{self.number_of_nodes()} nodes and "
+            f"{self.number_of_edges()} edges."
         )
 
 
+class _NodeIndex(Mapping):
+    """Correspondence between nodes and array indices of a CompactGraph.
+
+    Numeric and string labels are looked up by binary search in a sorted
+    copy of the labels. Other labels, e.g. tuples, are looked up in a
+    dictionary built on the first access.
+    """
+
+    def __init__(self, labels, n_nodes: int):
+        """Store the node labels."""
+        if labels is not None:
+            labels = _label_array(labels)
+            if len(labels) != n_nodes:
+                raise ValueError(
+                    f"The number of node_labels ({len(labels)}) must be "
+                    f"the number of nodes ({n_nodes})."
+                )
+            if labels.flags.writeable:
+                # The caller may modify or keep using its array.
+                labels = _read_only(labels.copy())
+        self._labels = labels
+        self._n_nodes = n_nodes
+        self._sorter = None
+        self._dict = None
+
+    @property
+    def labels(self):
+        """Labels of nodes in the array index order, or None"""
+        return self._labels
+
+    def _check_unique(self):
+        """Raise ValueError if a label is given to more than one node."""
+        if self._labels is None:
+            return
+        if self._labels.dtype == object:
+            duplicated = len(set(self._labels.tolist())) != self._n_nodes
+        else:
+            sorted_labels = np.sort(self._labels)
+            duplicated = np.any(sorted_labels[1:] == sorted_labels[:-1])
+        if duplicated:
+            raise ValueError("node_labels must be unique.")
+
+    def lookup(self, nodes) -> np.ndarray:
+        """Translate a batch of nodes into an array of array indices."""
+        if self._labels is not None and self._labels.dtype == object:
+            if self._dict is None:
+                self._dict = {
+                    node: i for i, node in enumerate(self._labels.tolist())
+                }
+            return _keys_to_indices(self._dict, nodes)
+        nodes = np.asarray(nodes)
+        if nodes.ndim != 1:
+            raise KeyError(nodes.tolist())
+        elif len(nodes) == 0:
+            return np.zeros(0, dtype=np.intp)
+        if self._labels is None:
+            if (
+                nodes.dtype.kind not in "iu"
+                or np.any(nodes < 0)
+                or np.any(nodes >= self._n_nodes)
+            ):
+                raise KeyError(nodes)
+            return nodes.astype(np.intp)
+        if self._sorter is None:
+            self._sorter = _read_only(np.argsort(self._labels, kind="stable"))
+        try:
+            positions, missing = _search_sorted(
+                self._labels[self._sorter], nodes
+            )
+        except (TypeError, ValueError):
+            raise KeyError(nodes.tolist())
+        if missing is not None:
+            raise KeyError(nodes[missing])
+        return self._sorter[positions].astype(np.intp)
+
+    def __getitem__(self, node):
+        """Return the array index of node"""
+        if self._labels is None or self._labels.dtype != object:
+            if isinstance(node, tuple):
+                raise KeyError(node)
+        return int(self.lookup([node])[0])
+
+    def __iter__(self):
+        """Iterate over nodes in the array index order"""
+        if self._labels is None:
+            return iter(range(self._n_nodes))
+        return iter(self._labels.tolist())
+
+    def __len__(self):
+        """Return the number of nodes"""
+        return self._n_nodes
+
+
+class _EdgeIndex(Mapping):
+    """Correspondence between edges and array indices of a CompactGraph.
+
+    Edges are created as tuples only while iterating over them.
+    """
+
+    _CHUNK_SIZE = 65536
+
+    def __init__(self, graph: CompactGraph):
+        """Store the graph."""
+        self._graph = graph
+
+    def __getitem__(self, edge):
+        """Return the array index of edge"""
+        if not isinstance(edge, tuple) or len(edge) != 2:
+            raise KeyError(edge)
+        return int(self._graph.edges_to_indices([edge])[0])
+
+    def __iter__(self):
+        """Iterate over edges in the array index order"""
+        labels = self._graph.node_labels
+        tails, heads = self._graph.edge_tails, self._graph.edge_heads
+        for start in range(0, len(tails), self._CHUNK_SIZE):
+            chunk = slice(start, start + self._CHUNK_SIZE)
+            inits, terms = tails[chunk], heads[chunk]
+            if labels is not None:
+                inits, terms = labels[inits], labels[terms]
+            yield from zip(inits.tolist(), terms.tolist())
+
+    def __len__(self):
+        """Return the number of edges"""
+        return self._graph.number_of_edges()
+
+
+def _label_array(labels) -> np.ndarray:
+    """Convert node labels into a 1-dimensional np.ndarray
+
+    Labels other than numbers and strings, or labels of mixed types, are
+    stored in an object array.
+    """
+    if isinstance(labels, np.ndarray) and labels.ndim == 1:
+        return labels
+    labels = list(labels)
+    array = np.asarray(labels)
+    if (
+        array.ndim != 1
+        or array.dtype.kind not in "biufUS"
+        or array.tolist() != labels
+    ):
+        array = np.empty(len(labels), dtype=object)
+        for i, label in enumerate(labels):
+            array[i] = label
+    return array
+
+
+def _search_sorted(sorted_array: np.ndarray, values: np.ndarray):
+    """Search values in a sorted array.
+
+    Returns:
+        A tuple of the positions of values in sorted_array and the index of
+        the first value not found in sorted_array, or None if all are found.
+    """
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.intp), None
+    elif len(sorted_array) == 0:
+        return None, 0
+    positions = np.searchsorted(sorted_array, values)
+    np.minimum(positions, len(sorted_array) - 1, out=positions)
+    not_found = np.flatnonzero(sorted_array[positions] != values)
+    if len(not_found):
+        return positions, not_found[0]
+    return positions, None
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Make array read-only and return it"""
+    array.flags.writeable = False
+    return array
+
+
+def _group_edges(key: np.ndarray, sub_key: np.ndarray, n_nodes: int):
+    """Group edge indices by key in the CSR layout.
+
+    See BaseGraph.grouped_edges for details.
+    """
+    order = np.lexsort((sub_key, key)).astype(key.dtype)
+    indptr = np.zeros(n_nodes + 1, dtype=key.dtype)
+    np.cumsum(np.bincount(key, minlength=n_nodes), out=indptr[1:])
+    return _read_only(indptr), _read_only(order)
+
+
+def _key_columns(graph, names: tuple) -> tuple:
+    """Return arrays of nodes, or (tails, heads) of edges, of a graph.
+
+    The arrays are created once per graph and cached on it.
+
+    Args:
+        graph: BaseGraph or CompactGraph.
+        names: ("node",) for nodes and ("tail", "head") for edges.
+    """
+    cache = graph.__dict__.setdefault("_export_cache", {})
+    if names not in cache:
+        if ("node",) not in cache:
+            if isinstance(graph, CompactGraph):
+                labels = graph.node_labels
+                if labels is None:
+                    labels = np.arange(graph.number_of_nodes())
+            else:
+                labels = _label_array(graph.node_to_index)
+            cache[("node",)] = (_read_only(labels),)
+        if names == ("tail", "head"):
+            labels = cache[("node",)][0]
+            cache[names] = (
+                _read_only(labels[graph.edge_tails]),
+                _read_only(labels[graph.edge_heads]),
+            )
+    return cache[names]
+
+
+def _pandas_index(graph, names: tuple):
+    """Return the pandas Index of nodes or MultiIndex of edges of a graph.
+
+    The index is created once per graph and cached on it.
+    """
+    cache = graph.__dict__.setdefault("_export_cache", {})
+    if ("pandas",) + names not in cache:
+        import pandas as pd
+
+        columns = _key_columns(graph, names)
+        if len(columns) == 1:
+            index = pd.Index(columns[0], name=names[0])
+        else:
+            index = pd.MultiIndex.from_arrays(columns, names=names)
+        cache[("pandas",) + names] = index
+    return cache[("pandas",) + names]
+
+
+def _keys_at(key_columns: tuple, indices) -> list:
+    """Return the nodes/edges at array indices as a list"""
+    columns = [column[indices].tolist() for column in key_columns]
+    if len(columns) == 1:
+        return columns[0]
+    return list(zip(*columns))
+
+
+def _format_rows(array, indices) -> str:
+    """Format the lines of repr of array for array indices"""
+    keys = _keys_at(array._key_columns(), indices)
+    values = array._values_at(indices)
+    return "".join(f"{key}\t{value}\n" for key, value in zip(keys, values))
+
+
+def _format_table(array, indices) -> str:
+    """Format repr of array for array indices, truncated as NumPy does."""
+    options = np.get_printoptions()
+    res = "index\tvalue\n"
+    if len(indices) <= options["threshold"]:
+        return res + _format_rows(array, indices)
+    edge_items = options["edgeitems"]
+    return (
+        res
+        + _format_rows(array, indices[:edge_items])
+        + "...\n"
+        + _format_rows(array, indices[-edge_items:])
+    )
+
+
+# The number of lines written at once by dump
+_DUMP_CHUNK_SIZE = 65536
+
+
+def _dump_table(array, indices, file):
+    """Write all the lines of repr of array for array indices to file."""
+    file.write("index\tvalue\n")
+    for start in range(0, len(indices), _DUMP_CHUNK_SIZE):
+        chunk = indices[start : start + _DUMP_CHUNK_SIZE]
+        file.write(_format_rows(array, chunk))
+
+
+def _index_dtype(size: int):
+    """The smallest integer dtype used for indices of an array of the size"""
+    return np.int32 if size < np.iinfo(np.int32).max else np.int64
+
+
+def _keys_to_indices(key_to_index, keys) -> np.ndarray:
+    """Look up array indices of many keys in a single pass over the batch."""
+    if isinstance(keys, np.ndarray):
+        keys = keys.tolist()
+    return np.fromiter(map(key_to_index.__getitem__, keys), dtype=np.intp)
+
+
 class BaseGraphArray:
     """ Base object for creating vectors and matrices on networks.
 
@@ -52,10 +803,10 @@ class BaseGraphArray:
         self, base_graph: BaseGraph,
     ):
         """Store BaseGraph instance on that the variable is defined."""
-        if not isinstance(base_graph, BaseGraph):
+        if not isinstance(base_graph, (BaseGraph, CompactGraph)):
             raise TypeError(
-                f"BaseGraph must be an instance of BaseGraph, "
-                f"not {type(base_graph)}."
+                f"BaseGraph must be an instance of BaseGraph or "
+                f"CompactGraph, not {type(base_graph)}."
             )
         elif not nx.is_frozen(base_graph):
             raise ValueError("base_graph is not freezed.")
@@ -159,37 +910,63 @@ class GraphArray(BaseGraphArray):
         init_val: The initial value of the array.
         is_array_2d (bool): Whether the array is 2-dimensional column vectors.
             Default is False, which means that the array is 1-dimensional.
+        dtype: The data type of the array, e.g. np.float32, np.int32 or bool.
+            Default is float64 for a scalar or dict init_val and the dtype
+            of init_val for an array init_val.
 
     Notes:
         init_val must be either scalar, NodeVar object or
         {node: value} dictionary.
         if a scalar is given, all elements of array are set to the init_val.
-        if a NodeVar object is given, a copy of its array is used
-        as initial values.
+        if a NodeVar object is given, its array is shared with the new
+        instance by copy-on-write, i.e. copied when either of them is
+        modified in place for the first time.
         if a dictionary is given, the value on each node/edge is used
         as initial value of corresponding node/node.
-        if np.ndarray is given, it is directly used as the initial values.
+        if np.ndarray is given, it is directly used as the initial values
+        unless it has to be converted to dtype.
         This is used to make arithmetic operations faster
         by avoiding unnecessary array creation.
+        Results of arithmetic operations have the dtype given by the NumPy
+        type promotion, e.g. float32 arrays stay float32 when operated with
+        Python scalars.
 
     Attributes:
-        array (np.ndarray): An array that has values linked to nodes/edges.
+        array (np.ndarray): A read-only view of the values linked to
+            nodes/edges.
 
     """
 
+    # A one-element list of the number of instances sharing the core array
+    # by copy-on-write, or None if the core array is not shared.
+    _sharers = None
+    # Whether the core array is also the memory of column views, which
+    # copy-on-write cannot track, so that it is never shared.
+    _has_views = False
+
     def __init__(
-        self, base_graph: BaseGraph, init_val=0, is_array_2d: bool = False,
+        self,
+        base_graph: BaseGraph,
+        init_val=0,
+        is_array_2d: bool = False,
+        dtype=None,
     ):
         """Set the initial value of array."""
         super(GraphArray, self).__init__(base_graph)
         if isinstance(init_val, np.ndarray):
             self._array = init_val
+            if dtype is not None:
+                self._array = init_val.astype(dtype, copy=False)
         elif isinstance(init_val, self.__class__):
-            self._array = init_val.array
+            self._array = init_val._array
+            if dtype is not None:
+                self._array = self._array.astype(dtype, copy=False)
+            if self._array is init_val._array:
+                init_val._share_with(self)
         else:
-            self._array = np.zeros(len(self.index))
-            if isinstance(init_val, (int, float)):
-                self._array += init_val
+            self._array = self._zeros(dtype)
+            if isinstance(init_val, _SCALAR_TYPES):
+                self._array[...] = init_val
             elif isinstance(init_val, dict):
                 for item, index in self.index.items():
                     self._array[index] = init_val[item]
@@ -203,6 +980,48 @@ class GraphArray(BaseGraphArray):
         if is_array_2d:  # reshape the array to 2-dimension.
             self._array = self._array.reshape((-1, 1))
 
+    @property
+    def array(self):
+        """Read-only view of the core array
+
+        No copy is made, so the view reflects later in-place modifications
+        of self, unless the core array is shared with a copy made by
+        get_copy: the first write to self then copies the core array, and
+        views taken before it keep the old values. Use get_copy for a
+        snapshot, which defers the cost of copying to that first write.
+        """
+        view = self._array.view()
+        view.flags.writeable = False
+        return view
+
+    def _share_with(self, other):
+        """Let other use the core array of self by copy-on-write.
+
+        If the core array is the memory of column views, other gets a copy
+        instead, since writes through the views cannot be tracked.
+        """
+        if self._has_views:
+            other._array = self._array.copy(order="K")
+            return
+        if self._sharers is None:
+            self._sharers = [1]
+        self._sharers[0] += 1
+        other._sharers = self._sharers
+
+    def _ensure_writable(self):
+        """Copy the core array before modifying it if it is shared.
+
+        This must be called before every in-place modification of the core
+        array. The last instance sharing the array modifies it without copy.
+        """
+        sharers = self._sharers
+        if sharers is None:
+            return
+        self._sharers = None
+        sharers[0] -= 1
+        if sharers[0] > 0:
+            self._array = self._array.copy(order="K")
+
     @property
     def index(self):
         """Correspondence between the array indices and the nodes/edges.
@@ -216,19 +1035,130 @@ class GraphArray(BaseGraphArray):
         """Whether the array is 2-dimensional or not"""
         return self._is_2d
 
+    @property
+    def dtype(self):
+        """The data type of the array"""
+        return self._array.dtype
+
+    def astype(self, dtype):
+        """Return a copy of self whose array is converted to dtype"""
+        return self._wrap(self._array.astype(dtype))
+
+    def _zeros(self, dtype=None):
+        """Create a zero array used as the initial value"""
+        return np.zeros(len(self.index), dtype=dtype)
+
+    def _wrap(self, array, array_class=None):
+        """Create an array with the same layout as self from an np.ndarray.
+
+        Args:
+            array: The core array of the result.
+            array_class: The class of the result. Default is type(self).
+        """
+        if array_class is None:
+            array_class = type(self)
+        return array_class(
+            self.base_graph, init_val=array, is_array_2d=self.is_2d
+        )
+
+    def _as_columns(self):
+        """Return the core array viewed as (number of nodes/edges, columns)"""
+        return self._array.reshape((len(self.index), -1))
+
+    def _from_columns(self, array, array_class):
+        """Wrap an array of shape (number of nodes/edges, columns).
+
+        This is the inverse of _as_columns and is used to wrap results of
+        matrix products, whose class differs from that of self.
+        """
+        return self._wrap(array.reshape(-1), array_class)
+
+    def _operand(self, other):
+        """Check the opponent of an operation and return its core array"""
+        self._operation_error_check(other, _SCALAR_TYPES + (self.__class__,))
+        if isinstance(other, BatchGraphArray) and not isinstance(
+            self, BatchGraphArray
+        ):
+            raise TypeError(
+                f"{type(self)} cannot be operated with {type(other)}. "
+                f"Put the batch array on the left side."
+            )
+        if isinstance(other, _SCALAR_TYPES):
+            return other
+        return other._array
+
     def as_dict(self) -> dict:
         """Return values of variables as a dictionary keyed by node/edge.
         """
-        value = {
-            item: self._array[index] for item, index in self.index.items()
-        }
-        return value
+        return dict(zip(self.index, self._values_at(slice(None))))
+
+    # Names of the key columns of to_arrays and to_records
+    _key_names = ()
+
+    def _key_columns(self):
+        """Arrays of the nodes/edges in the array index order.
+
+        This is only a dummy implementation here and overridden in subclasses.
+        """
+        return ()
+
+    def _values_at(self, indices) -> list:
+        """Return the values at array indices as a list"""
+        return self._as_columns()[indices, 0].tolist()
+
+    def to_arrays(self) -> tuple:
+        """Return the keys and values as columns of np.ndarray.
+
+        Returns:
+            (nodes, values) for arrays on nodes and (tails, heads, values)
+            for arrays on edges in the array index order. The key columns
+            are cached on the base graph and read-only.
+        """
+        columns = self._as_columns()
+        values = columns if columns.shape[1] > 1 else columns[:, 0]
+        return self._key_columns() + (values.copy(),)
+
+    def to_records(self) -> np.ndarray:
+        """Return the keys and values as a structured np.ndarray.
+
+        The fields are named node and value, or tail, head and value.
+        """
+        *keys, values = self.to_arrays()
+        fields = [
+            (name, key.dtype) for name, key in zip(self._key_names, keys)
+        ]
+        fields.append(("value", values.dtype, values.shape[1:]))
+        res = np.empty(len(values), dtype=fields)
+        for name, column in zip(self._key_names + ("value",), keys + [values]):
+            res[name] = column
+        return res
+
+    def to_pandas(self, name=None):
+        """Return the values as a pandas Series indexed by nodes/edges.
+
+        The index, a MultiIndex of (tail, head) for edges, is built once per
+        base graph and reused. Batch arrays are returned as a DataFrame.
+        pandas is required only by this method.
+
+        Args:
+            name: The name of the Series.
+        """
+        index = _pandas_index(self.base_graph, self._key_names)
+        columns = self._as_columns()
+        import pandas as pd
+
+        if isinstance(self, BatchGraphArray):
+            return pd.DataFrame(columns, index=index, copy=True)
+        return pd.Series(columns[:, 0], index=index, name=name, copy=True)
 
     def as_nx_graph(self, assign_to=None):
         """Return a nx.DiGraph with the array elements as node/edge attributes.
         """
         var_dict = self.as_dict()
-        res_graph = nx.DiGraph(self.base_graph)
+        if isinstance(self.base_graph, CompactGraph):
+            res_graph = self.base_graph.to_nx_graph()
+        else:
+            res_graph = nx.DiGraph(self.base_graph)
         # todo: avoid using the assign_to argument.
         if assign_to == "node":
             for node, value in var_dict.items():
@@ -240,6 +1170,29 @@ class GraphArray(BaseGraphArray):
             raise ValueError("assign_to must be 'node' or 'edge'")
         return res_graph
 
+    def as_nx_view(self, name: str = "value"):
+        """Return a read-only nx.DiGraph view with the array as attributes.
+
+        Unlike as_nx_graph, neither the graph nor the values are copied.
+        Use ArrayAttributeGraph to expose several arrays at once.
+
+        Args:
+            name: The attribute name of the array elements.
+        """
+        from grapharray.nxview import ArrayAttributeGraph
+
+        return ArrayAttributeGraph(self.base_graph, {name: self})
+
+    def lazy(self):
+        """Return a LazyArray to build an expression evaluated in one pass.
+
+        Arithmetic on the result, e.g. ``1 + 0.15 * (x.lazy() / c) ** 4``,
+        creates no temporary arrays until LazyArray.evaluate is called.
+        """
+        from grapharray.lazy import LazyArray
+
+        return LazyArray(self)
+
     def get_copy(self):
         """Make a copy of self. 
         
@@ -247,54 +1200,105 @@ class GraphArray(BaseGraphArray):
         while the base_graph of the copy is the same instance of the original.
         This is different from the copy created by copy.deepcopy() in that both
         the array and the base_graph is a copy of the original.
+
+        The array is copied lazily: the copy shares it with self until either
+        of them is modified in place, so snapshots of iterates are cheap.
         """
-        return type(self)(
-            self.base_graph,
-            init_val=self._array.copy(),
-            is_array_2d=self.is_2d,
-        )
+        res = self._wrap(self._array)
+        self._share_with(res)
+        return res
 
-    def _operation(self, other, operation_func):
+    def _operation(self, other, operation_func, out=None):
         """Do an arithmetic operation.
 
         Args:
             other: An instance operated with self.
-            operation_func: Magic method for operation, like self.__add__.
+            operation_func: np.ufunc for the operation, like np.add.
+            out: An instance of the same class as self to which the result is
+                written. If None, a new instance is created.
 
         Returns:
             An instance of the same class as self containing the result.
 
         """
-        self._operation_error_check(other, (int, float, self.__class__))
-        if isinstance(other, (int, float)):
-            #  same as res.array = self.array {+, -, * etc.} other
-            res_array = operation_func(other)
-        else:
-            #  same as res.array  = self.array {+, -, * etc.} other.array
-            res_array = operation_func(other._array)
-        return type(self)(
-            self.base_graph, init_val=res_array, is_array_2d=self.is_2d
-        )
+        #  same as res.array = self.array {+, -, * etc.} other(.array)
+        other_array = self._operand(other)
+        if out is None:
+            return self._wrap(operation_func(self._array, other_array))
+        self._operation_error_check(out, (self.__class__,))
+        out._ensure_writable()
+        operation_func(self._array, other_array, out=out._array)
+        return out
+
+    def add(self, other, out=None):
+        """Element-wise addition, optionally written into out"""
+        return self._operation(other, np.add, out=out)
+
+    def subtract(self, other, out=None):
+        """Element-wise subtraction, optionally written into out"""
+        return self._operation(other, np.subtract, out=out)
+
+    def multiply(self, other, out=None):
+        """Element-wise multiplication, optionally written into out"""
+        return self._operation(other, np.multiply, out=out)
+
+    def divide(self, other, out=None):
+        """Element-wise division, optionally written into out"""
+        return self._operation(other, np.true_divide, out=out)
+
+    def power(self, other, out=None):
+        """Element-wise exponentiation, optionally written into out"""
+        return self._operation(other, np.power, out=out)
 
     def __add__(self, other):
         """Element-wise addition"""
-        return self._operation(other, self._array.__add__)
+        if _defers_operations(other):
+            return NotImplemented
+        return self.add(other)
 
     def __sub__(self, other):
         """Element-wise subtraction"""
-        return self._operation(other, self._array.__sub__)
+        if _defers_operations(other):
+            return NotImplemented
+        return self.subtract(other)
 
     def __mul__(self, other):
         """Element-wise multiplication"""
-        return self._operation(other, self._array.__mul__)
+        if _defers_operations(other):
+            return NotImplemented
+        return self.multiply(other)
 
     def __truediv__(self, other):
         """Element-wise division"""
-        return self._operation(other, self._array.__truediv__)
+        if _defers_operations(other):
+            return NotImplemented
+        return self.divide(other)
 
     def __pow__(self, other):
         """Element-wise exponentiation"""
-        return self._operation(other, self._array.__pow__)
+        if _defers_operations(other):
+            return NotImplemented
+        return self.power(other)
+
+    def __iadd__(self, other):
+        """In-place element-wise addition"""
+        return self.add(other, out=self)
+
+    def __isub__(self, other):
+        """In-place element-wise subtraction"""
+        return self.subtract(other, out=self)
+
+    def __imul__(self, other):
+        """In-place element-wise multiplication"""
+        return self.multiply(other, out=self)
+
+    def __itruediv__(self, other):
+        """In-place element-wise division"""
+        return self.divide(other, out=self)
+
+    def __ipow__(self, other):
+        """In-place element-wise exponentiation"""
+        return self.power(other, out=self)
 
     def __matmul__(self, other):
         """Inner product of two arrays"""
@@ -306,9 +1310,24 @@ class GraphArray(BaseGraphArray):
         self._operation_error_check(other, (self.__class__,))
         return np.all(self._array == other._array)
 
+    def _keys_to_indices(self, keys):
+        """Get the array indices corresponding to a batch of nodes or edges"""
+        return _keys_to_indices(self.index, keys)
+
     def _get_array_index(self, key):
-        """Get the array index corresponding to the specified node or edge"""
-        index = self.index[key]
+        """Get the array index corresponding to the specified node or edge
+
+        If key is a list or np.ndarray, it is regarded as a batch of
+        nodes/edges and an array of indices is returned.
+        """
+        if isinstance(key, (list, np.ndarray)):
+            index = self._keys_to_indices(key)
+        else:
+            index = self.index[key]
+        return self._to_array_index(index)
+
+    def _to_array_index(self, index):
+        """Convert indices of nodes/edges into indices of the core array"""
         if self.is_2d:
             if self.is_transposed:
                 index = (0, index)
@@ -317,25 +1336,199 @@ class GraphArray(BaseGraphArray):
         return index
 
     def __getitem__(self, key):
-        """Get the array element corresponding to the specified node or edge"""
+        """Get the array element corresponding to the specified node or edge
+
+        If key is a list or np.ndarray of nodes/edges, an np.ndarray of the
+        corresponding elements is returned.
+        """
         return self._array[self._get_array_index(key)]
 
     def __setitem__(self, key, value):
-        """Set value to the array corresponding to the specified node or edge"""
+        """Set value to the array corresponding to the specified node or edge
+
+        If key is a list or np.ndarray of nodes/edges, value must be a scalar
+        or a sequence of the same length as key.
+        """
+        self._ensure_writable()
         self._array[self._get_array_index(key)] = value
 
+    def take(self, indices: np.ndarray) -> np.ndarray:
+        """Get the elements at array indices given by BaseGraph.*_to_indices
+
+        This skips the translation from nodes/edges to indices, which is
+        useful when the same batch is accessed repeatedly.
+        """
+        return self._array[self._to_array_index(indices)]
+
+    def put(self, indices: np.ndarray, values):
+        """Set values at array indices given by BaseGraph.*_to_indices"""
+        self._ensure_writable()
+        self._array[self._to_array_index(indices)] = values
+
     def __repr__(self):
-        """Return a string representation of the array"""
-        var_dict = self.as_dict()
-        res = "index\tvalue\n"
-        for index, value in var_dict.items():
-            res += f"{index}\t{value}\n"
-        return res
+        """Return a string representation of the array
+
+        Arrays longer than the threshold of np.get_printoptions are
+        truncated as NumPy does. Use dump to write all the values.
+        """
+        return _format_table(self, np.arange(len(self.index)))
+
+    def dump(self, file):
+        """Write all the values to a text file object.
+
+        The lines are the same as those of repr and written in chunks, so
+        the whole text is never held in memory.
+        """
+        _dump_table(self, np.arange(len(self.index)), file)
 
     def __len__(self):
         """Return the length of array"""
         return len(self._array)
 
+    def __array__(self, dtype=None, copy=None):
+        """Return the core array for np.asarray and np.array
+
+        A core array shared by copy-on-write is returned as a read-only
+        view, since modifying it would modify the other instances.
+        """
+        if dtype is None and not copy:
+            return self._array if self._sharers is None else self.array
+        return np.array(self._array, dtype=dtype, copy=True)
+
+    def _ufunc_operand(self, item):
+        """Check an argument of a NumPy function and unwrap it if needed"""
+        if isinstance(item, GraphArray):
+            self._operation_error_check(item, (self.__class__,))
+            return item._array
+        elif isinstance(item, (list, tuple)):
+            return type(item)(self._ufunc_operand(i) for i in item)
+        return item
+
+    def _ufunc_result(self, result):
+        """Wrap a result of a NumPy function if it is laid out as self"""
+        shape = self._array.shape
+        if isinstance(result, np.ndarray) and result.shape == shape:
+            return self._wrap(result)
+        return result
+
+    def _ufunc_template(self, items):
+        """Choose the array that checks and wraps arguments of a function.
+
+        A batch array is chosen if any, so that single-column arrays are
+        broadcast to its columns.
+        """
+        for item in items:
+            if isinstance(item, BatchGraphArray):
+                return item
+            elif isinstance(item, (list, tuple)):
+                batch = self._ufunc_template(item)
+                if isinstance(batch, BatchGraphArray):
+                    return batch
+        return self
+
+    def __array_ufunc__(self, ufunc, method, *inputs, out=None, **kwargs):
+        """Apply a NumPy ufunc to core arrays and wrap the result.
+
+        Results shaped as the core array are returned as an instance of the
+        same class, while the others, like reductions, are returned as is.
+        Arrays given as out are written in place and returned.
+        """
+        template = self._ufunc_template(inputs + (out or ()))
+        # The first operand of ufunc.at is modified in place.
+        targets = (out or ()) + (inputs[:1] if method == "at" else ())
+        for target in targets:
+            if isinstance(target, GraphArray):
+                target._ensure_writable()
+        arrays = template._ufunc_operand(inputs)
+        if out is not None:
+            kwargs["out"] = template._ufunc_operand(out)
+        result = getattr(ufunc, method)(*arrays, **kwargs)
+        if out is not None:
+            if len(out) == 1:
+                result = (result,)
+            result = tuple(
+                o if isinstance(o, GraphArray) else r
+                for o, r in zip(out, result)
+            )
+            return result[0] if len(result) == 1 else result
+        elif isinstance(result, tuple):
+            return tuple(template._ufunc_result(r) for r in result)
+        return template._ufunc_result(result)
+
+    def __array_function__(self, func, types, args, kwargs):
+        """Apply a NumPy function to core arrays and wrap the result.
+
+        This works in the same way as __array_ufunc__, except that only the
+        results of element-wise functions and reductions are wrapped. The
+        others, e.g. np.sort and np.cumsum, move values away from their
+        nodes/edges, so their results are returned as np.ndarray.
+        """
+        template = self._ufunc_template(args + tuple(kwargs.values()))
+        out = kwargs.get("out")
+        if isinstance(out, GraphArray):
+            out._ensure_writable()
+        if func in _MUTATING_FUNCTIONS and isinstance(args[0], GraphArray):
+            args[0]._ensure_writable()
+        args = template._ufunc_operand(args)
+        kwargs = {k: template._ufunc_operand(v) for k, v in kwargs.items()}
+        result = func(*args, **kwargs)
+        if isinstance(out, GraphArray):
+            return out
+        elif func not in _ELEMENTWISE_FUNCTIONS:
+            return result
+        return template._ufunc_result(result)
+
+
+# NumPy functions modifying their first argument in place
+_MUTATING_FUNCTIONS = frozenset(
+    (
+        np.copyto,
+        np.place,
+        np.put,
+        np.putmask,
+        np.put_along_axis,
+        np.fill_diagonal,
+    )
+)
+
+# NumPy functions whose results keep the values at their nodes/edges:
+# element-wise functions, and reductions, which have a value per node/edge
+# when batch arrays are reduced along the columns.
+_ELEMENTWISE_FUNCTIONS = frozenset(
+    (
+        np.where,
+        np.clip,
+        np.copyto,
+        np.copy,
+        np.nan_to_num,
+        np.round,
+        np.isclose,
+        np.real,
+        np.imag,
+        np.zeros_like,
+        np.ones_like,
+        np.empty_like,
+        np.full_like,
+        np.sum,
+        np.prod,
+        np.mean,
+        np.average,
+        np.median,
+        np.std,
+        np.var,
+        np.max,
+        np.min,
+        np.amax,
+        np.amin,
+        np.any,
+        np.all,
+        np.nansum,
+        np.nanmean,
+        np.nanmax,
+        np.nanmin,
+    )
+)
+
 
 class NodeArray(GraphArray):
     """Object of variables defined on the nodes."""
@@ -345,6 +1538,16 @@ class NodeArray(GraphArray):
         """Correspondence between the array indices and the nodes."""
         return self.base_graph.node_to_index
 
+    def _keys_to_indices(self, keys):
+        """Get the array indices corresponding to a batch of nodes."""
+        return self.base_graph.nodes_to_indices(keys)
+
+    _key_names = ("node",)
+
+    def _key_columns(self):
+        """Arrays of the nodes in the array index order."""
+        return _key_columns(self.base_graph, self._key_names)
+
     def as_nx_graph(self):
         """Return a nx.DiGraph with the array elements as its node attributes.
         """
@@ -359,18 +1562,692 @@ class EdgeArray(GraphArray):
         """Correspondence between the array indices and the edges."""
         return self.base_graph.edge_to_index
 
+    def _keys_to_indices(self, keys):
+        """Get the array indices corresponding to a batch of edges."""
+        return self.base_graph.edges_to_indices(keys)
+
+    _key_names = ("tail", "head")
+
+    def _key_columns(self):
+        """Arrays of the initial and terminal nodes in the array index order.
+        """
+        return _key_columns(self.base_graph, self._key_names)
+
     def as_nx_graph(self):
         """Return a nx.DiGraph with the array elements as its edge attributes.
         """
         return super(EdgeArray, self).as_nx_graph(assign_to="edge")
 
 
+class BatchGraphArray(GraphArray):
+    """Extracted codes shared between BatchNodeArray and BatchEdgeArray.
+
+    A batch array holds many columns of values, e.g. scenarios, defined on
+    the same graph in an array of shape (number of nodes/edges, n_columns).
+    Each row is indexed by a node/edge as GraphArray, and matrix products
+    compute all the columns at once as a sparse-dense matrix product.
+
+    Args:
+        base_graph (BaseGraph): The graph on that the variable is defined.
+        init_val: The initial value of the array.
+        n_columns (int): The number of columns. This is used only if init_val
+            is a scalar and default is 1.
+        dtype: The data type of the array. See GraphArray.
+
+    Notes:
+        init_val must be either scalar, an instance of the same class,
+        {node: sequence of values} dictionary or np.ndarray of shape
+        (number of nodes/edges, n_columns).
+        Arithmetic operations are allowed also with a single-column array
+        of the corresponding class, e.g. NodeArray for BatchNodeArray,
+        which is broadcast to all the columns.
+
+    """
+
+    _column_class = GraphArray
+
+    def __init__(
+        self,
+        base_graph: BaseGraph,
+        init_val=0,
+        n_columns: int = None,
+        dtype=None,
+    ):
+        """Set the initial value of array."""
+        if n_columns is None and isinstance(init_val, dict) and init_val:
+            n_columns = len(next(iter(init_val.values())))
+        self._n_columns = 1 if n_columns is None else n_columns
+        super(BatchGraphArray, self).__init__(
+            base_graph, init_val=init_val, dtype=dtype
+        )
+        self._is_2d = True
+        if self._array.ndim != 2 or self._array.shape[0] != len(self.index):
+            raise ValueError(
+                f"The shape of the array must be ({len(self.index)}, "
+                f"n_columns), not {self._array.shape}."
+            )
+
+    @classmethod
+    def from_columns(cls, arrays):
+        """Create a batch array by stacking single-column arrays.
+
+        Args:
+            arrays: A sequence of single-column arrays, e.g. NodeArray for
+                BatchNodeArray, defined on the same base graph.
+        """
+        base_graph = arrays[0].base_graph
+        for array in arrays:
+            if not isinstance(array, cls._column_class) or isinstance(
+                array, BatchGraphArray
+            ):
+                raise TypeError(
+                    f"{cls} can be created only from "
+                    f"{cls._column_class}, not {type(array)}."
+                )
+            elif array.base_graph is not base_graph:
+                raise ValueError(
+                    "Cannot stack variables associated with different graphs."
+                )
+        columns = [array._array.ravel() for array in arrays]
+        return cls(base_graph, init_val=np.column_stack(columns))
+
+    @property
+    def n_columns(self):
+        """The number of columns"""
+        return self._as_columns().shape[1]
+
+    def column(self, j: int):
+        """Return the j-th column as a single-column array.
+
+        The returned array shares the memory with self, so modifying it
+        modifies self. Copies of self and of the column made afterwards
+        are therefore not lazy.
+        """
+        self._ensure_writable()
+        self._has_views = True
+        res = self._column_class(
+            self.base_graph, init_val=self._as_columns()[:, j]
+        )
+        res._has_views = True
+        return res
+
+    def _zeros(self, dtype=None):
+        """Create a zero array used as the initial value"""
+        return np.zeros((len(self.index), self._n_columns), dtype=dtype)
+
+    def _values_at(self, indices) -> list:
+        """Return the rows at array indices as a list of np.ndarray"""
+        return list(self._as_columns()[indices])
+
+    def _wrap(self, array, array_class=None):
+        """Create an array of the same class as self from an np.ndarray."""
+        if array_class is None:
+            array_class = type(self)
+        return array_class(self.base_graph, init_val=array)
+
+    def _as_columns(self):
+        """Return the core array viewed as (number of nodes/edges, columns)"""
+        return self._array.T if self.is_transposed else self._array
+
+    def _from_columns(self, array, array_class):
+        """Wrap an array of shape (number of nodes/edges, columns)."""
+        return self._wrap(array, _BATCH_CLASSES.get(array_class, array_class))
+
+    def _operand(self, other):
+        """Check the opponent of an operation and return its core array
+
+        Single-column arrays are reshaped so that they are broadcast to all
+        the columns of self.
+        """
+        if isinstance(other, self._column_class) and not isinstance(
+            other, BatchGraphArray
+        ):
+            self._operation_error_check(other, (self._column_class,))
+            shape = (1, -1) if self.is_transposed else (-1, 1)
+            return other._array.reshape(shape)
+        return super(BatchGraphArray, self)._operand(other)
+
+    def _ufunc_operand(self, item):
+        """Check an argument of a NumPy function and unwrap it if needed
+
+        Single-column arrays are reshaped so that they are broadcast to all
+        the columns of self.
+        """
+        if isinstance(item, GraphArray):
+            return self._operand(item)
+        return super(BatchGraphArray, self)._ufunc_operand(item)
+
+    def _ufunc_result(self, result):
+        """Wrap a result of a NumPy function if it is laid out as self
+
+        Results with a single value per node/edge, e.g. reductions along
+        the columns, are wrapped as a single-column array.
+        """
+        if isinstance(result, np.ndarray) and result.shape == (
+            len(self.index),
+        ):
+            return self._column_class(self.base_graph, init_val=result)
+        return super(BatchGraphArray, self)._ufunc_result(result)
+
+    def _to_array_index(self, index):
+        """Convert indices of nodes/edges into indices of the core array"""
+        if self.is_transposed:
+            return slice(None), index
+        return index
+
+
+class BatchNodeArray(BatchGraphArray, NodeArray):
+    """Object of many columns of variables defined on the nodes."""
+
+    _column_class = NodeArray
+
+
+class BatchEdgeArray(BatchGraphArray, EdgeArray):
+    """Object of many columns of variables defined on the edges."""
+
+    _column_class = EdgeArray
+
+
+_BATCH_CLASSES = {NodeArray: BatchNodeArray, EdgeArray: BatchEdgeArray}
+
+
+class SparseGraphArray(BaseGraphArray):
+    """Extracted codes shared between SparseNodeArray and SparseEdgeArray.
+
+    A sparse array stores only the nonzero values together with their array
+    indices, which are sorted. The other values are zero. This saves memory
+    when most of the values are zero, e.g. flows of an OD pair.
+
+    Args:
+        base_graph (BaseGraph): The graph on that the variable is defined.
+        init_val: The initial value of the array.
+        dtype: The data type of the values. Default is float64 for a dict
+            init_val and the dtype of init_val for an array init_val.
+
+    Notes:
+        init_val must be either None, {node/edge: value} dictionary, an
+        instance of the same class or a dense array of the corresponding
+        class, e.g. EdgeArray for SparseEdgeArray. If None, all the values
+        are zero. Zeros in init_val are not stored.
+        Arithmetic operations are allowed with scalars, arrays of the same
+        class and dense arrays of the corresponding class. The result is
+        sparse if it has the zeros of self, e.g. a product, and dense
+        otherwise, e.g. a sum with a dense array.
+        The dense array is created only by to_dense and the array property.
+    """
+
+    _dense_class = GraphArray
+
+    # Let dense arrays defer binary operations to this class.
+    __array_ufunc__ = None
+
+    def __init__(self, base_graph: BaseGraph, init_val=None, dtype=None):
+        """Set the initial value of array."""
+        super(SparseGraphArray, self).__init__(base_graph)
+        if init_val is None:
+            indices = np.zeros(0, dtype=np.intp)
+            values = np.zeros(0, dtype=dtype)
+        elif isinstance(init_val, self.__class__):
+            indices, values = init_val._indices, init_val._values.copy()
+        elif isinstance(init_val, self._dense_class) and not isinstance(
+            init_val, BatchGraphArray
+        ):
+            self._operation_error_check(init_val, (self._dense_class,))
+            dense = init_val._array.reshape(-1)
+            indices = np.flatnonzero(dense)
+            values = dense[indices]
+        elif isinstance(init_val, dict):
+            values = np.array(
+                list(init_val.values()),
+                dtype=np.float64 if dtype is None else dtype,
+            )
+            indices = self._keys_to_indices(list(init_val.keys()))
+            order = np.argsort(indices)
+            indices, values = indices[order], values[order]
+            nonzero = values != 0
+            indices, values = indices[nonzero], values[nonzero]
+        else:
+            raise TypeError(
+                f"Invalid type of init_val ({type(init_val)}). "
+                f"Init_val must be either None, {type(self)}, "
+                f"{self._dense_class} or dict."
+            )
+        self._indices = indices.astype(_index_dtype(len(self)), copy=False)
+        self._values = values
+        if dtype is not None:
+            self._values = self._values.astype(dtype, copy=False)
+
+    @classmethod
+    def from_indices(cls, base_graph: BaseGraph, indices, values):
+        """Create a sparse array from array indices and values.
+
+        Args:
+            base_graph: The graph on that the variable is defined.
+            indices: Array indices given by BaseGraph.*_to_indices. Values of
+                duplicate indices are summed up.
+            values: The values at indices.
+        """
+        indices, inverse = np.unique(indices, return_inverse=True)
+        values = np.asarray(values)
+        summed = np.zeros(len(indices), dtype=values.dtype)
+        np.add.at(summed, inverse.reshape(-1), values)
+        nonzero = summed != 0
+        return cls._from_parts(base_graph, indices[nonzero], summed[nonzero])
+
+    @classmethod
+    def _from_parts(cls, base_graph, indices, values):
+        """Create an instance from sorted unique indices and their values."""
+        res = cls.__new__(cls)
+        BaseGraphArray.__init__(res, base_graph)
+        res._indices = indices.astype(_index_dtype(len(res)), copy=False)
+        res._values = values
+        return res
+
+    @property
+    def index(self):
+        """Correspondence between the array indices and the nodes/edges.
+
+        This is only a dummy implementation here and overridden in subclasses.
+        """
+        return {}
+
+    def _keys_to_indices(self, keys):
+        """Get the array indices corresponding to a batch of nodes or edges"""
+        return _keys_to_indices(self.index, keys)
+
+    @property
+    def indices(self):
+        """Sorted array indices of the stored values"""
+        return self._indices.copy()
+
+    @property
+    def values(self):
+        """Stored values in the order of indices"""
+        return self._values.copy()
+
+    @property
+    def nnz(self):
+        """The number of stored values"""
+        return len(self._values)
+
+    @property
+    def dtype(self):
+        """The data type of the values"""
+        return self._values.dtype
+
+    @property
+    def array(self):
+        """Core array as a dense np.ndarray"""
+        return self._dense_array()
+
+    @property
+    def T(self):
+        """Sparse arrays cannot be transposed."""
+        raise TypeError(f"{type(self)} cannot be transposed.")
+
+    def __len__(self):
+        """Return the length of the dense array"""
+        return len(self.index)
+
+    def _dense_array(self):
+        """Return a new dense np.ndarray of the values"""
+        res = np.zeros(len(self), dtype=self._values.dtype)
+        res[self._indices] = self._values
+        return res
+
+    def to_dense(self):
+        """Return the dense array of the corresponding class"""
+        return self._dense_class(self.base_graph, init_val=self._dense_array())
+
+    def _as_sparse_column(self):
+        """Return the values as a scipy sparse matrix with a single column"""
+        return sp.csc_matrix(
+            (
+                self._values,
+                self._indices,
+                np.array([0, self.nnz], dtype=self._indices.dtype),
+            ),
+            shape=(len(self), 1),
+        )
+
+    def _from_columns(self, array, array_class):
+        """Wrap a dense result of a matrix product of shape (items, 1)."""
+        return array_class(self.base_graph, init_val=array.reshape(-1))
+
+    def _positions(self, indices):
+        """Find indices in the stored indices.
+
+        Returns:
+            A tuple of the positions of indices in the stored indices and
+            whether each index is stored.
+        """
+        positions = np.searchsorted(self._indices, indices)
+        positions = np.minimum(positions, max(self.nnz - 1, 0))
+        found = np.zeros(np.shape(indices), dtype=bool)
+        if self.nnz:
+            found = self._indices[positions] == indices
+        return positions, found
+
+    def take(self, indices: np.ndarray) -> np.ndarray:
+        """Get the values at array indices given by BaseGraph.*_to_indices"""
+        positions, found = self._positions(indices)
+        res = np.zeros(np.shape(indices), dtype=self._values.dtype)
+        if self.nnz:
+            res[found] = self._values[positions[found]]
+        return res
+
+    def put(self, indices: np.ndarray, values):
+        """Set values at array indices given by BaseGraph.*_to_indices
+
+        Stored values set to zero are kept until the array is created again.
+        """
+        indices = np.asarray(indices)
+        values = np.broadcast_to(values, indices.shape)
+        positions, found = self._positions(indices)
+        if self.nnz:
+            self._values[positions[found]] = values[found]
+        new = ~found & (values != 0)
+        if np.any(new):
+            new_indices, last = np.unique(indices[new][::-1], True)
+            new_values = values[new][::-1][last]
+            order = np.argsort(
+                np.concatenate((self._indices, new_indices)), kind="stable"
+            )
+            self._indices = np.concatenate(
+                (self._indices, new_indices.astype(self._indices.dtype))
+            )[order]
+            self._values = np.concatenate(
+                (self._values, new_values.astype(self._values.dtype))
+            )[order]
+
+    def _get_indices(self, key):
+        """Get the array indices corresponding to key as an np.ndarray"""
+        if isinstance(key, (list, np.ndarray)):
+            return self._keys_to_indices(key)
+        return np.array(self.index[key])
+
+    def __getitem__(self, key):
+        """Get the value corresponding to the specified node or edge
+
+        If key is a list or np.ndarray of nodes/edges, an np.ndarray of the
+        corresponding values is returned.
+        """
+        res = self.take(self._get_indices(key))
+        return res if res.ndim else res[()]
+
+    def __setitem__(self, key, value):
+        """Set value to the specified node or edge
+
+        If key is a list or np.ndarray of nodes/edges, value must be a scalar
+        or a sequence of the same length as key.
+        """
+        self.put(self._get_indices(key), value)
+
+    def as_dict(self) -> dict:
+        """Return the stored values as a dictionary keyed by node/edge."""
+        keys = _keys_at(self._key_columns(), self._indices)
+        return dict(zip(keys, self._values.tolist()))
+
+    def _key_columns(self):
+        """Arrays of the nodes/edges in the array index order.
+
+        This is only a dummy implementation here and overridden in subclasses.
+        """
+        return ()
+
+    def _values_at(self, indices) -> list:
+        """Return the values at array indices as a list"""
+        return self.take(indices).tolist()
+
+    def get_copy(self):
+        """Make a copy of self sharing the base_graph."""
+        return self._from_parts(
+            self.base_graph, self._indices, self._values.copy()
+        )
+
+    def _dense_operand(self, other):
+        """Check a dense opponent of an operation and return its 1-d array"""
+        if isinstance(other, BatchGraphArray):
+            raise TypeError(
+                f"{type(self)} cannot be operated with {type(other)}."
+            )
+        self._operation_error_check(other, (self._dense_class,))
+        return other._array.reshape(-1)
+
+    def _values_of(self, other):
+        """Get the values of other at the stored indices of self"""
+        if isinstance(other, SparseGraphArray):
+            self._operation_error_check(other, (self.__class__,))
+            return other.take(self._indices)
+        return self._dense_operand(other)[self._indices]
+
+    def _merge(self, other, sign):
+        """Add other multiplied by sign (1 or -1) to self sparsely."""
+        self._operation_error_check(other, (self.__class__,))
+        indices, inverse = np.unique(
+            np.concatenate((self._indices, other._indices)),
+            return_inverse=True,
+        )
+        inverse = inverse.reshape(-1)
+        values = np.zeros(
+            len(indices),
+            dtype=np.result_type(self._values, other._values),
+        )
+        values[inverse[: self.nnz]] = self._values
+        values[inverse[self.nnz :]] += sign * other._values
+        return self._from_parts(self.base_graph, indices, values)
+
+    def _check_scalar_or_array(self, other):
+        """Raise TypeError if other is not a valid opponent."""
+        if not isinstance(
+            other, _SCALAR_TYPES + (GraphArray, SparseGraphArray)
+        ):
+            raise TypeError(
+                f"{type(self)} can be operated only with scalars, "
+                f"{self.__class__} or {self._dense_class}, not {type(other)}."
+            )
+
+    def add(self, other):
+        """Element-wise addition
+
+        The result is sparse if other is sparse and dense otherwise.
+        """
+        self._check_scalar_or_array(other)
+        if isinstance(other, SparseGraphArray):
+            return self._merge(other, 1)
+        elif isinstance(other, GraphArray):
+            dense = self._dense_operand(other)
+            res = dense.astype(np.result_type(dense, self._values))
+            res[self._indices] += self._values
+            return self._dense_class(self.base_graph, init_val=res)
+        return self._dense_class(
+            self.base_graph, init_val=self._dense_array() + other
+        )
+
+    def subtract(self, other):
+        """Element-wise subtraction
+
+        The result is sparse if other is sparse and dense otherwise.
+        """
+        self._check_scalar_or_array(other)
+        if isinstance(other, SparseGraphArray):
+            return self._merge(other, -1)
+        elif isinstance(other, GraphArray):
+            res = -self._dense_operand(other)
+            res = res.astype(np.result_type(res, self._values))
+            res[self._indices] += self._values
+            return self._dense_class(self.base_graph, init_val=res)
+        return self._dense_class(
+            self.base_graph, init_val=self._dense_array() - other
+        )
+
+    def _sparse_result(self, values):
+        """Wrap values at the stored indices of self."""
+        return self._from_parts(self.base_graph, self._indices, values)
+
+    def multiply(self, other):
+        """Element-wise multiplication, whose result is sparse"""
+        self._check_scalar_or_array(other)
+        if isinstance(other, _SCALAR_TYPES):
+            return self._sparse_result(self._values * other)
+        elif isinstance(other, SparseGraphArray):
+            # Only the indices stored in both are stored in the result.
+            self._operation_error_check(other, (self.__class__,))
+            positions, found = other._positions(self._indices)
+            return self._from_parts(
+                self.base_graph,
+                self._indices[found],
+                self._values[found] * other._values[positions[found]],
+            )
+        return self._sparse_result(self._values * self._values_of(other))
+
+    def divide(self, other):
+        """Element-wise division by scalar or array, whose result is sparse
+
+        Zeros of self divided by zeros of other are regarded as zeros.
+        """
+        self._check_scalar_or_array(other)
+        if isinstance(other, _SCALAR_TYPES):
+            return self._sparse_result(self._values / other)
+        return self._sparse_result(self._values / self._values_of(other))
+
+    def power(self, other):
+        """Element-wise exponentiation by a positive scalar, sparse result"""
+        if not isinstance(other, _SCALAR_TYPES) or other <= 0:
+            raise ValueError("Sparse arrays can be powered only by positive.")
+        return self._sparse_result(self._values ** other)
+
+    def __add__(self, other):
+        """Element-wise addition"""
+        return self.add(other)
+
+    def __radd__(self, other):
+        """Element-wise addition with self on the right"""
+        return self.add(other)
+
+    def __sub__(self, other):
+        """Element-wise subtraction"""
+        return self.subtract(other)
+
+    def __rsub__(self, other):
+        """Element-wise subtraction with self on the right"""
+        return self.subtract(other) * -1
+
+    def __mul__(self, other):
+        """Element-wise multiplication"""
+        return self.multiply(other)
+
+    def __rmul__(self, other):
+        """Element-wise multiplication with self on the right"""
+        return self.multiply(other)
+
+    def __truediv__(self, other):
+        """Element-wise division"""
+        return self.divide(other)
+
+    def __pow__(self, other):
+        """Element-wise exponentiation"""
+        return self.power(other)
+
+    def __eq__(self, other):
+        """Whether all the elements of two arrays are equal"""
+        if isinstance(other, SparseGraphArray):
+            return not np.any(self._merge(other, -1)._values)
+        dense = self._dense_operand(other)
+        stored = np.zeros(len(self), dtype=bool)
+        stored[self._indices] = True
+        return bool(
+            np.all(dense[self._indices] == self._values)
+            and not np.any(dense[~stored])
+        )
+
+    def __repr__(self):
+        """Return a string representation of the stored values
+
+        It is truncated as GraphArray.__repr__.
+        """
+        return _format_table(self, self._indices)
+
+    def dump(self, file):
+        """Write all the stored values to a text file object."""
+        _dump_table(self, self._indices, file)
+
+
+class SparseNodeArray(SparseGraphArray):
+    """Object of mostly-zero variables defined on the nodes."""
+
+    _dense_class = NodeArray
+
+    _key_names = NodeArray._key_names
+
+    def _key_columns(self):
+        """Arrays of the nodes in the array index order."""
+        return _key_columns(self.base_graph, self._key_names)
+
+    @property
+    def index(self):
+        """Correspondence between the array indices and the nodes."""
+        return self.base_graph.node_to_index
+
+    def _keys_to_indices(self, keys):
+        """Get the array indices corresponding to a batch of nodes."""
+        return self.base_graph.nodes_to_indices(keys)
+
+
+class SparseEdgeArray(SparseGraphArray):
+    """Object of mostly-zero variables defined on the edges."""
+
+    _dense_class = EdgeArray
+
+    _key_names = EdgeArray._key_names
+
+    def _key_columns(self):
+        """Arrays of the initial and terminal nodes in the array index order.
+        """
+        return _key_columns(self.base_graph, self._key_names)
+
+    @property
+    def index(self):
+        """Correspondence between the array indices and the edges."""
+        return self.base_graph.edge_to_index
+
+    def _keys_to_indices(self, keys):
+        """Get the array indices corresponding to a batch of edges."""
+        return self.base_graph.edges_to_indices(keys)
+
+
+_ARRAY_CLASSES = {
+    cls.__name__: cls
+    for cls in (NodeArray, EdgeArray, BatchNodeArray, BatchEdgeArray)
+}
+
+
+def _describe_array(array: GraphArray):
+    """Return (class name, is_2d) used to restore array by _restore_array"""
+    if type(array).__name__ not in _ARRAY_CLASSES:
+        raise TypeError(f"Cannot serialize {type(array)} object.")
+    return type(array).__name__, array.is_2d
+
+
+def _restore_array(base_graph, description, core_array):
+    """Wrap a core array into the array described by _describe_array"""
+    class_name, is_2d = description
+    array_class = _ARRAY_CLASSES[class_name]
+    if issubclass(array_class, BatchGraphArray):
+        return array_class(base_graph, init_val=core_array)
+    return array_class(base_graph, init_val=core_array, is_array_2d=is_2d)
+
+
 class AdjacencyMatrix(BaseGraphArray):
     """N x N matrix"""
 
     def __init__(self, weight: EdgeArray, sparse_format: str = "csr"):
         """Create a matrix
 
+        The sparsity pattern is built from the edge index arrays of the
+        frozen base graph, so constructing the matrix does not walk the
+        graph in Python.
+
         Args:
             weight: the element values of the matrix. The value of 
                 weight[init, term] is set to the (init, term) element of the 
@@ -380,75 +2257,398 @@ class AdjacencyMatrix(BaseGraphArray):
             the format of the sparse matrix.
         """
         super(AdjacencyMatrix, self).__init__(weight.base_graph)
-        self._array = nx.to_scipy_sparse_matrix(
-            weight.as_nx_graph(),
-            nodelist=self.nodes,
-            weight="value",
-            format=sparse_format,
+        self._check_weight(weight)
+        self._sparse_format = sparse_format
+        n = self.number_of_nodes
+        tails, heads = self.base_graph.edge_tails, self.base_graph.edge_heads
+        weight_array = weight._array.ravel()
+        if sparse_format == "coo":
+            self._data_order = None
+            self._array = sp.coo_matrix(
+                (weight_array.copy(), (tails, heads)), shape=(n, n)
+            )
+            return
+        if sparse_format == "csc":
+            indptr, self._data_order = self.base_graph.grouped_edges("head")
+            indices = tails[self._data_order]
+            matrix_class = sp.csc_matrix
+        else:
+            indptr, self._data_order = self.base_graph.grouped_edges("tail")
+            indices = heads[self._data_order]
+            matrix_class = sp.csr_matrix
+        self._array = matrix_class(
+            (weight_array[self._data_order], indices, indptr), shape=(n, n)
         )
+        if sparse_format not in ("csr", "csc"):
+            self._array = self._array.asformat(sparse_format)
 
-    def __matmul__(self, other):
+    @classmethod
+    def _from_sparse(cls, base_graph, matrix, sparse_format, data_order):
+        """Restore a matrix from its sparse matrix without rebuilding it.
+
+        Args:
+            base_graph: The graph on that the matrix is defined.
+            matrix: The sparse matrix.
+            sparse_format: The format of matrix.
+            data_order: The edge indices in the order of matrix.data, or None
+                for the 'coo' format.
+        """
+        res = cls.__new__(cls)
+        BaseGraphArray.__init__(res, base_graph)
+        res._array = matrix
+        res._sparse_format = sparse_format
+        res._data_order = data_order
+        return res
+
+    def _check_weight(self, weight):
+        """Check that weight is an EdgeArray on the same base graph."""
+        if not isinstance(weight, EdgeArray) or isinstance(
+            weight, BatchGraphArray
+        ):
+            raise TypeError(
+                f"weight must be a single-column EdgeArray, "
+                f"not {type(weight)}."
+            )
+        self._operation_error_check(weight, (EdgeArray,))
+
+    @property
+    def sparse_format(self):
+        """The format of the sparse matrix"""
+        return self._sparse_format
+
+    def update(self, weight: EdgeArray):
+        """Overwrite the element values of the matrix with weight in place.
+
+        The sparsity pattern is reused, so only the data vector of the sparse
+        matrix is refreshed. For formats other than 'csr', 'csc' and 'coo',
+        the matrix is rebuilt from the cached pattern.
+
+        Args:
+            weight: the new element values of the matrix. It must be defined
+                on the same base graph as the matrix.
+        """
+        self._check_weight(weight)
+        weight_array = weight._array.ravel()
+        if self._sparse_format == "coo":
+            np.copyto(self._array.data, weight_array)
+        elif self._sparse_format in ("csr", "csc"):
+            np.take(weight_array, self._data_order, out=self._array.data)
+        else:
+            self._array = AdjacencyMatrix(weight, self._sparse_format)._array
+        return self
+
+    def matmul(self, other, out=None):
         """Return the vector-matrix product as an NodeArray object
-        
+
         The opponent of the operation must be Nodearray object.
+
+        Args:
+            other: NodeArray or SparseNodeArray multiplied by the matrix.
+            out: NodeArray to which the result is written. If None, a new
+                NodeArray is created. SciPy computes the product into a new
+                array, which is copied into out, so out saves only the
+                result object.
         """
-        if not isinstance(other, NodeArray):
+        if not isinstance(other, (NodeArray, SparseNodeArray)):
             raise TypeError(
                 f"Adjacency matrix can be multiplied only "
                 f"with NodeArray, not {type(other)}."
             )
+        self._operation_error_check(other, (NodeArray, SparseNodeArray))
 
-        res_array = self._array @ other._array
-        return NodeArray(
-            self.base_graph, init_val=res_array, is_array_2d=other.is_2d
-        )
+        if isinstance(other, SparseNodeArray):
+            res_array = (self._array @ other._as_sparse_column()).toarray()
+        else:
+            res_array = self._array @ other._as_columns()
+        return _columns_result(self, NodeArray, res_array, other, out)
+
+    def __matmul__(self, other):
+        """Return the vector-matrix product as an NodeArray object
+        
+        The opponent of the operation must be Nodearray object.
+        """
+        if _defers_matmul(other):
+            return NotImplemented
+        return self.matmul(other)
 
 
 class IncidenceMatrix(BaseGraphArray):
     """Node-edge incidence matrix"""
 
     def __init__(
-        self, base_graph: BaseGraph,
+        self, base_graph: BaseGraph, matrix_free: bool = False,
     ):
-        """Create incidence matrix."""
+        """Create incidence matrix.
+
+        Args:
+            base_graph: The graph on that the matrix is defined.
+            matrix_free: If True, no sparse matrix is stored and products are
+                computed directly from the edge index arrays of base_graph
+                in O(E) time. The sparse matrix is then built only when the
+                array property is accessed.
+        """
         super(IncidenceMatrix, self).__init__(base_graph)
-        self._array = nx.incidence_matrix(
-            base_graph,
-            nodelist=self.nodes,
-            edgelist=self.edges,
-            oriented=True,
+        self._matrix_free = matrix_free
+        if not matrix_free:
+            self._array = _sparse_incidence_matrix(base_graph)
+
+    @classmethod
+    def _from_sparse(cls, base_graph, matrix):
+        """Restore a matrix from its sparse matrix without rebuilding it.
+
+        If matrix is None, a matrix-free instance is created.
+        """
+        res = cls.__new__(cls)
+        BaseGraphArray.__init__(res, base_graph)
+        res._matrix_free = matrix is None
+        res._array = matrix
+        return res
+
+    @property
+    def matrix_free(self):
+        """Whether the matrix is stored as a sparse matrix or not"""
+        return self._matrix_free
+
+    @property
+    def array(self):
+        """Core array
+
+        If the matrix is matrix-free, a sparse matrix is built on each access.
+        """
+        if not self._matrix_free:
+            return super(IncidenceMatrix, self).array
+        res = _sparse_incidence_matrix(self.base_graph)
+        return res.transpose() if self._is_transposed else res
+
+    @property
+    def T(self):
+        """Transpose the matrix"""
+        if not self._matrix_free:
+            return super(IncidenceMatrix, self).T
+        self._is_transposed = not self._is_transposed
+        return self
+
+    def _matrix_free_product(self, other_array, out_array):
+        """Compute the product from the edge index arrays of the base graph.
+
+        Args:
+            other_array: Array of the opponent viewed as columns.
+            out_array: Array viewed as columns to which the result is
+                written, or None.
+
+        Returns:
+            np.ndarray of the result viewed as columns.
+        """
+        tails, heads = self.base_graph.edge_tails, self.base_graph.edge_heads
+        dtype = _incidence_dtype(other_array.dtype)
+        if self._is_transposed:
+            # potential difference between the both ends of each edge
+            other_array = other_array.astype(dtype, copy=False)
+            if out_array is not None and out_array.dtype != dtype:
+                res = np.take(other_array, heads, axis=0)
+                res -= np.take(other_array, tails, axis=0)
+                np.copyto(out_array, res, casting="same_kind")
+                return out_array
+            res = np.take(other_array, heads, axis=0, out=out_array)
+            res -= np.take(other_array, tails, axis=0)
+            return res
+        # inflow minus outflow of each node
+        n = self.number_of_nodes
+        if out_array is None:
+            out_array = np.empty((n, other_array.shape[1]), dtype=dtype)
+        for j, column in enumerate(other_array.T):
+            # bincount sums in float64, which is cast to the result dtype.
+            np.subtract(
+                np.bincount(heads, weights=column, minlength=n),
+                np.bincount(tails, weights=column, minlength=n),
+                out=out_array[:, j],
+                casting="unsafe",
+            )
+        return out_array
+
+    def _sparse_product(self, other, type_result, out):
+        """Compute the product with a sparse array.
+
+        Only the stored values of other are read, so the cost is
+        proportional to their number instead of the size of the graph.
+        """
+        dtype = _incidence_dtype(other.dtype)
+        if not self._matrix_free:
+            column = other._as_sparse_column().astype(dtype)
+            res_array = (self._array @ column).toarray()
+            return _columns_result(self, type_result, res_array, other, out)
+        tails = self.base_graph.edge_tails
+        heads = self.base_graph.edge_heads
+        if self._is_transposed:
+            # potential difference between the both ends of each edge
+            nodes = np.zeros(self.number_of_nodes, dtype=dtype)
+            nodes[other._indices] = other._values
+            res_array = np.take(nodes, heads) - np.take(nodes, tails)
+        else:
+            n = self.number_of_nodes
+            values = other._values
+            res_array = np.subtract(
+                np.bincount(heads[other._indices], values, minlength=n),
+                np.bincount(tails[other._indices], values, minlength=n),
+            ).astype(dtype, copy=False)
+        return _columns_result(
+            self, type_result, res_array.reshape(-1, 1), other, out
         )
 
-    def __matmul__(self, other):
+    def matmul(self, other, out=None):
         """Return the vector-matrix product.
-        
+
         If the matrix is not transposed, the opponent of the operation 
         must be an EdgeArray object and the result is a Nodearray object.
         Otherwise the opponent must be an NodeArray object and the result 
         is EdgeArray.
 
         Args:
-            other: EdgeVar if not transposed, otherwise NodeVar.
+            other: EdgeVar if not transposed, otherwise NodeVar. Sparse
+                arrays are also accepted and the result is dense.
+            out: An instance of the result class to which the result is
+                written. If None, a new instance is created. Matrix-free
+                products of dense arrays are written into out directly
+                with temporaries of at most a column, and the others are
+                computed into a new array, which is copied into out.
 
         Returns:
             NodeVar if not transposed, otherwise EdgeVar.
         """
         if not self._is_transposed:
-            type_other = EdgeArray
+            type_other = (EdgeArray, SparseEdgeArray)
             type_result = NodeArray
         else:
-            type_other = NodeArray
+            type_other = (NodeArray, SparseNodeArray)
             type_result = EdgeArray
 
         if not isinstance(other, type_other):
             raise TypeError(
                 f'{"transposed "*self.is_transposed}incidence matrix can '
-                f"be multiplied only with {str(type_other)}, "
+                f"be multiplied only with {str(type_other[0])}, "
                 f"not {type(other)}."
             )
-
-        res_array = self._array @ other._array
-        return type_result(
-            self.base_graph, init_val=res_array, is_array_2d=other.is_2d
+        self._operation_error_check(other, type_other)
+
+        if isinstance(other, SparseGraphArray):
+            return self._sparse_product(other, type_result, out)
+        if not self._matrix_free:
+            other_array = other._as_columns()
+            dtype = _incidence_dtype(other_array.dtype)
+            res_array = self._array @ other_array.astype(dtype, copy=False)
+            return _columns_result(self, type_result, res_array, other, out)
+        out_columns = None
+        if out is not None:
+            self._operation_error_check(out, (type_result,))
+            out_columns = _column_view(out)
+        res_array = self._matrix_free_product(
+            other._as_columns(), out_columns
         )
+        if out_columns is not None:
+            return out
+        return _columns_result(self, type_result, res_array, other, out)
+
+    def __matmul__(self, other):
+        """Return the vector-matrix product.
+
+        See matmul for details.
+        """
+        if _defers_matmul(other):
+            return NotImplemented
+        return self.matmul(other)
+
+
+# The dtype of the elements of incidence matrices
+_INCIDENCE_DTYPE = np.int8
+
+
+def _incidence_dtype(dtype) -> np.dtype:
+    """Return the dtype of products of incidence matrices with dtype.
+
+    Sums of bool and integers narrower than 32 bits, e.g. the inflow of a
+    node with many edges in a bool mask, easily overflow, so they are
+    accumulated in int64. Other dtypes, e.g. float32 and int32, are kept.
+    """
+    dtype = np.result_type(dtype, _INCIDENCE_DTYPE)
+    if dtype.kind in "biu" and dtype.itemsize < 4:
+        return np.dtype(np.int64)
+    return dtype
+
+
+def _sparse_incidence_matrix(base_graph: BaseGraph):
+    """Build the oriented node-edge incidence matrix in CSC format.
+
+    The element (node, edge) is -1 if the node is the initial node of the
+    edge and 1 if it is the terminal node. The elements are stored as int8,
+    so products keep the dtype of the opponent, e.g. float32 or int32,
+    except narrow integers promoted by _incidence_dtype.
+    """
+    n_edges = base_graph.number_of_edges()
+    edges = np.arange(n_edges)
+    return sp.coo_matrix(
+        (
+            np.repeat(np.array([-1, 1], dtype=_INCIDENCE_DTYPE), n_edges),
+            (
+                np.concatenate((base_graph.edge_tails, base_graph.edge_heads)),
+                np.concatenate((edges, edges)),
+            ),
+        ),
+        shape=(base_graph.number_of_nodes(), n_edges),
+    ).tocsc()
+
+
+def _defers_operations(other) -> bool:
+    """Whether other implements the reflected arithmetic with GraphArrays.
+
+    As in NumPy, such objects set __array_ufunc__ to None.
+    """
+    return getattr(type(other), "__array_ufunc__", False) is None
+
+
+def _defers_matmul(other) -> bool:
+    """Whether matrices leave the product with other to other.__rmatmul__.
+
+    Sparse arrays are multiplied by the matrices themselves.
+    """
+    return _defers_operations(other) and not isinstance(
+        other, SparseGraphArray
+    )
+
+
+def _column_view(array: GraphArray):
+    """Return the core array of array viewed as columns if it is a view.
+
+    This is used to write results into array, so its core array is copied
+    first if it is shared by copy-on-write.
+    """
+    array._ensure_writable()
+    columns = array._as_columns()
+    if np.may_share_memory(columns, array._array):
+        return columns
+    return None
+
+
+def _columns_result(operator, type_result, res_array, other, out):
+    """Wrap the result of a matrix product or write it into out.
+
+    This is shared by operations whose result is defined on the other kind
+    of items than the operand, like matrix products and gathers.
+
+    Args:
+        operator: The matrix or array that checks the base graph of out.
+        type_result: The class of the result, NodeArray or EdgeArray.
+        res_array: The computed product viewed as columns.
+        other: The opponent of the product, whose layout the result follows.
+        out: An instance of type_result to which the result is written,
+            or None.
+    """
+    if out is None:
+        return other._from_columns(res_array, type_result)
+    operator._operation_error_check(out, (type_result,))
+    out_columns = _column_view(out)
+    if out_columns is not None:
+        np.copyto(out_columns, res_array)
+    else:
+        np.copyto(out._array, res_array.reshape(out._array.shape))
+    return out
 
@@ -5,46 +5,57 @@ from __future__ import annotations
 from typing import Union, Callable
 import numpy as np
 
-from grapharray.classes import NodeArray, EdgeArray
+from grapharray.classes import (
+    NodeArray,
+    EdgeArray,
+    _column_view,
+    _columns_result,
+)
 
 
 def apply_element_wise_function(
-    var: Union[NodeArray, EdgeArray], function: Callable
+    var: Union[NodeArray, EdgeArray],
+    function: Callable,
+    out: Union[NodeArray, EdgeArray] = None,
 ) -> Union[NodeArray, EdgeArray]:
     """Execute a element-wise function for np.ndarray to NodeVar or EdgeVar.
 
     Args:
         var: A variable to apply function
         function: A function for np.ndarray to apply.
+        out: An instance of the same class as var's to which the result is
+            written. If given, function must accept the out keyword as
+            np.ufunc does.
 
     Returns:
         An instance of the same class as var's, whose array is the result of
         the function passed i.e., function(var.array).
     """
-    res_array = function(var._array)
-    if isinstance(var, NodeArray):
-        return NodeArray(
-            var.base_graph, init_val=res_array, is_array_2d=var.is_2d
-        )
-    elif isinstance(var, EdgeArray):
-        return EdgeArray(
-            var.base_graph, init_val=res_array, is_array_2d=var.is_2d
-        )
-    else:
+    if not isinstance(var, (NodeArray, EdgeArray)):
         raise TypeError(
             f"Invalid type of argument {type(var)}. "
             f"It must be NodeVar or EdgeVar"
         )
+    if out is not None:
+        var._operation_error_check(out, (var.__class__,))
+        out._ensure_writable()
+        function(var._array, out=out._array)
+        return out
+    return var._wrap(function(var._array))
 
 
-def exp(var: Union[NodeArray, EdgeArray]) -> Union[NodeArray, EdgeArray]:
+def exp(
+    var: Union[NodeArray, EdgeArray], out: Union[NodeArray, EdgeArray] = None
+) -> Union[NodeArray, EdgeArray]:
     """Element-wise exponential"""
-    return apply_element_wise_function(var, np.exp)
+    return apply_element_wise_function(var, np.exp, out=out)
 
 
-def log(var: Union[NodeArray, EdgeArray]) -> Union[NodeArray, EdgeArray]:
+def log(
+    var: Union[NodeArray, EdgeArray], out: Union[NodeArray, EdgeArray] = None
+) -> Union[NodeArray, EdgeArray]:
     """Element-wise natural logarithm"""
-    return apply_element_wise_function(var, np.log)
+    return apply_element_wise_function(var, np.log, out=out)
 
 
 def get_representative_value(
@@ -75,3 +86,120 @@ def max(var: Union[NodeArray, EdgeArray]) -> float:
 def min(var: Union[NodeArray, EdgeArray]) -> float:
     """The minimum of all variables"""
     return np.min(var._array)
+
+
+def _check_array(var, array_class):
+    """Raise TypeError if var is not an instance of array_class"""
+    if not isinstance(var, array_class):
+        raise TypeError(
+            f"Invalid type of argument {type(var)}. "
+            f"It must be {array_class}"
+        )
+
+
+def gather(
+    var: NodeArray, end: str = "tail", out: EdgeArray = None
+) -> EdgeArray:
+    """Copy the value on an end node of each edge to the edge.
+
+    Args:
+        var: A variable on nodes. Batch arrays are gathered column-wise.
+        end: "tail" to take values of initial nodes,
+            "head" to take values of terminal nodes.
+        out: An EdgeArray to which the result is written.
+
+    Returns:
+        An EdgeArray whose value on edge (init, term) is var[init] if end is
+        "tail", otherwise var[term].
+    """
+    _check_array(var, NodeArray)
+    if end == "tail":
+        ends = var.base_graph.edge_tails
+    elif end == "head":
+        ends = var.base_graph.edge_heads
+    else:
+        raise ValueError(f"end must be 'tail' or 'head', not {end!r}.")
+    out_columns = None
+    if out is not None:
+        var._operation_error_check(out, (EdgeArray,))
+        out_columns = _column_view(out)
+    columns = var._as_columns()
+    if out_columns is not None and out_columns.dtype != columns.dtype:
+        # np.take casts into out only safely.
+        np.copyto(
+            out_columns, np.take(columns, ends, axis=0), casting="same_kind"
+        )
+        return out
+    res_array = np.take(columns, ends, axis=0, out=out_columns)
+    if out_columns is not None:
+        return out
+    return _columns_result(var, EdgeArray, res_array, var, out)
+
+
+_REDUCE_FUNCTIONS = {"min": np.minimum, "max": np.maximum}
+
+
+def reduce_edges(
+    var: EdgeArray,
+    direction: str = "in",
+    how: str = "sum",
+    fill_value: float = None,
+    out: NodeArray = None,
+) -> NodeArray:
+    """Reduce values on edges into their end nodes.
+
+    Args:
+        var: A variable on edges. Batch arrays are reduced column-wise.
+        direction: "in" to reduce values on the in-edges of each node,
+            "out" to reduce values on the out-edges of each node.
+        how: The reduction, one of "sum", "mean", "min" and "max".
+        fill_value: The value of nodes without in/out-edges. Default is 0
+            for "sum" and integer or bool arrays, and nan for the others.
+        out: A NodeArray to which the result is written.
+
+    Returns:
+        A NodeArray of the reduced values. Its dtype is that of np.sum of
+        var for "sum", e.g. float32 for float32 and int64 for int32 or bool,
+        and float64 for "mean" of integers. "min" and "max" keep the dtype.
+    """
+    _check_array(var, EdgeArray)
+    if direction not in ("in", "out"):
+        raise ValueError(
+            f"direction must be 'in' or 'out', not {direction!r}."
+        )
+    if how not in ("sum", "mean", "min", "max"):
+        raise ValueError(
+            f"how must be 'sum', 'mean', 'min' or 'max', not {how!r}."
+        )
+    base_graph = var.base_graph
+    if direction == "in":
+        ends = base_graph.edge_heads
+        indptr, order = base_graph.grouped_edges("head")
+    else:
+        ends = base_graph.edge_tails
+        indptr, order = base_graph.grouped_edges("tail")
+    counts = np.diff(indptr)
+    columns = var._as_columns()
+    n_nodes = base_graph.number_of_nodes()
+    if how in ("sum", "mean"):
+        dtype = np.zeros(1, dtype=columns.dtype).sum().dtype
+        if how == "mean" and not np.issubdtype(dtype, np.inexact):
+            dtype = np.float64
+        res_array = np.empty((n_nodes, columns.shape[1]), dtype=dtype)
+        for j, column in enumerate(columns.T):
+            res_array[:, j] = np.bincount(
+                ends, weights=column, minlength=n_nodes
+            )
+        if how == "mean":
+            res_array /= np.maximum(counts, 1)[:, np.newaxis]
+    else:
+        res_array = np.empty((n_nodes, columns.shape[1]), dtype=columns.dtype)
+        has_edges = counts > 0
+        res_array[has_edges] = _REDUCE_FUNCTIONS[how].reduceat(
+            columns[order], indptr[:-1][has_edges], axis=0
+        )
+    if fill_value is None:
+        is_inexact = np.issubdtype(res_array.dtype, np.inexact)
+        fill_value = 0 if how == "sum" or not is_inexact else np.nan
+    res_array[counts == 0] = fill_value
+    return _columns_result(var, NodeArray, res_array, var, out)
@@ -0,0 +1,233 @@
+"""Saving and loading graphs, arrays and matrices as .npy files."""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Dict, Tuple, Union
+
+import numpy as np
+import scipy.sparse as sp
+
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    GraphArray,
+    AdjacencyMatrix,
+    IncidenceMatrix,
+    _describe_array,
+    _restore_array,
+)
+
+FORMAT_VERSION = 1
+
+# Components of sparse matrices saved for each format
+_SPARSE_COMPONENTS = {
+    "csr": ("data", "indices", "indptr"),
+    "csc": ("data", "indices", "indptr"),
+    "coo": ("data", "row", "col"),
+}
+
+
+def save(
+    path: str,
+    base_graph: Union[BaseGraph, CompactGraph],
+    arrays: Dict[str, GraphArray] = None,
+    matrices: Dict[str, Union[AdjacencyMatrix, IncidenceMatrix]] = None,
+):
+    """Save a frozen graph and arrays and matrices defined on it.
+
+    The graph is saved as a CompactGraph, i.e. its node/edge orders and
+    index arrays, so that no graph construction is needed when loading.
+    Every array is saved as a .npy file in the directory path, which can be
+    memory-mapped by load.
+
+    Args:
+        path: The directory to which the files are written.
+        base_graph: The frozen graph.
+        arrays: Arrays on base_graph keyed by names.
+        matrices: AdjacencyMatrix or IncidenceMatrix on base_graph keyed by
+            names.
+    """
+    arrays = {} if arrays is None else arrays
+    matrices = {} if matrices is None else matrices
+    for name, item in list(arrays.items()) + list(matrices.items()):
+        if item.base_graph is not base_graph:
+            raise ValueError(
+                f"{name} is not defined on the base_graph to be saved."
+            )
+    if isinstance(base_graph, BaseGraph):
+        base_graph = CompactGraph.from_base_graph(base_graph)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "graph": _save_graph(os.path.join(path, "graph"), base_graph),
+        "arrays": {},
+        "matrices": {},
+    }
+    os.makedirs(os.path.join(path, "arrays"), exist_ok=True)
+    for name, array in arrays.items():
+        class_name, is_2d = _describe_array(array)
+        core_array = array._array
+        if array.is_transposed:
+            core_array = core_array.transpose()
+        np.save(os.path.join(path, "arrays", name + ".npy"), core_array)
+        manifest["arrays"][name] = {
+            "class": class_name,
+            "is_2d": is_2d,
+            "is_transposed": array.is_transposed,
+        }
+    for name, matrix in matrices.items():
+        manifest["matrices"][name] = _save_matrix(
+            os.path.join(path, "matrices", name), matrix
+        )
+    with open(os.path.join(path, "manifest.json"), "w") as fp:
+        json.dump(manifest, fp, indent=2)
+
+
+def load(
+    path: str, mmap_mode: str = None
+) -> Tuple[CompactGraph, Dict[str, GraphArray], Dict[str, object]]:
+    """Load a graph and arrays and matrices saved by save.
+
+    Args:
+        path: The directory given to save.
+        mmap_mode: Passed to np.load. If "r", the arrays are memory-mapped
+            read-only files and are not read until they are accessed.
+
+    Returns:
+        A tuple of the CompactGraph, the dict of arrays and the dict of
+        matrices. The arrays and matrices are defined on the CompactGraph.
+    """
+    with open(os.path.join(path, "manifest.json")) as fp:
+        manifest = json.load(fp)
+    if manifest["format_version"] != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported format version {manifest['format_version']}."
+        )
+    graph = _load_graph(
+        os.path.join(path, "graph"), manifest["graph"], mmap_mode
+    )
+    arrays = {}
+    for name, info in manifest["arrays"].items():
+        core_array = np.load(
+            os.path.join(path, "arrays", name + ".npy"), mmap_mode=mmap_mode
+        )
+        array = _restore_array(
+            graph, (info["class"], info["is_2d"]), core_array
+        )
+        if info["is_transposed"]:
+            array = array.T
+        arrays[name] = array
+    matrices = {
+        name: _load_matrix(
+            os.path.join(path, "matrices", name), graph, info, mmap_mode
+        )
+        for name, info in manifest["matrices"].items()
+    }
+    return graph, arrays, matrices
+
+
+def _save_graph(path: str, graph: CompactGraph) -> dict:
+    """Save the arrays of a CompactGraph and return its manifest entry."""
+    os.makedirs(path, exist_ok=True)
+    for name, array in graph._get_state().items():
+        np.save(os.path.join(path, name + ".npy"), array)
+    labels = graph.node_labels
+    if labels is not None:
+        np.save(os.path.join(path, "node_labels.npy"), labels)
+    return {
+        "node_labels": None if labels is None else labels.dtype == object,
+    }
+
+
+def _load_graph(path: str, info: dict, mmap_mode: str) -> CompactGraph:
+    """Load a CompactGraph saved by _save_graph."""
+    state = {
+        name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode)
+        for name in (
+            "indptr",
+            "indices",
+            "edge_ids",
+            "edge_codes",
+            "edge_tails",
+            "edge_heads",
+        )
+    }
+    labels = None
+    if info["node_labels"] is not None:
+        # Object labels, e.g. tuples, are pickled and cannot be mapped.
+        is_object = info["node_labels"]
+        labels = np.load(
+            os.path.join(path, "node_labels.npy"),
+            mmap_mode=None if is_object else mmap_mode,
+            allow_pickle=is_object,
+        )
+    return CompactGraph._from_state(state, labels)
+
+
+def _save_matrix(path: str, matrix) -> dict:
+    """Save the sparse matrix of a matrix and return its manifest entry."""
+    if isinstance(matrix, IncidenceMatrix):
+        info = {"class": "IncidenceMatrix", "matrix_free": matrix.matrix_free}
+        sparse_matrix = None if matrix.matrix_free else matrix._array
+    elif isinstance(matrix, AdjacencyMatrix):
+        info = {"class": "AdjacencyMatrix", "format": matrix.sparse_format}
+        sparse_matrix = matrix._array
+    else:
+        raise TypeError(f"Cannot save {type(matrix)} object.")
+    info["is_transposed"] = matrix.is_transposed
+    if sparse_matrix is None:
+        return info
+    if matrix.is_transposed:
+        sparse_matrix = sparse_matrix.transpose()
+    if sparse_matrix.format not in _SPARSE_COMPONENTS:
+        # Other formats are saved as csr and converted when loaded.
+        sparse_matrix = sparse_matrix.tocsr()
+    info["saved_format"] = sparse_matrix.format
+    info["shape"] = list(sparse_matrix.shape)
+    os.makedirs(path, exist_ok=True)
+    for name in _SPARSE_COMPONENTS[sparse_matrix.format]:
+        np.save(
+            os.path.join(path, name + ".npy"), getattr(sparse_matrix, name)
+        )
+    if isinstance(matrix, AdjacencyMatrix) and matrix._data_order is not None:
+        np.save(os.path.join(path, "data_order.npy"), matrix._data_order)
+    return info
+
+
+def _load_matrix(path: str, graph: CompactGraph, info: dict, mmap_mode: str):
+    """Load a matrix saved by _save_matrix."""
+    sparse_matrix = None
+    if "saved_format" in info:
+        components = [
+            np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode)
+            for name in _SPARSE_COMPONENTS[info["saved_format"]]
+        ]
+        if info["saved_format"] == "coo":
+            data, row, col = components
+            sparse_matrix = sp.coo_matrix(
+                (data, (row, col)), shape=info["shape"], copy=False
+            )
+        else:
+            matrix_class = getattr(sp, info["saved_format"] + "_matrix")
+            sparse_matrix = matrix_class(
+                tuple(components), shape=info["shape"], copy=False
+            )
+    if info["class"] == "IncidenceMatrix":
+        matrix = IncidenceMatrix._from_sparse(graph, sparse_matrix)
+    else:
+        sparse_format = info["format"]
+        data_order = None
+        if sparse_format != "coo":
+            data_order = np.load(
+                os.path.join(path, "data_order.npy"), mmap_mode=mmap_mode
+            )
+        if sparse_format != info["saved_format"]:
+            sparse_matrix = sparse_matrix.asformat(sparse_format)
+        matrix = AdjacencyMatrix._from_sparse(
+            graph, sparse_matrix, sparse_format, data_order
+        )
+    if info["is_transposed"]:
+        matrix = matrix.T
+    return matrix
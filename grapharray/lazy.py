@@ -0,0 +1,296 @@
+"""Deferred element-wise arithmetic of GraphArrays evaluated in one pass."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from grapharray.classes import (
+    GraphArray,
+    BatchGraphArray,
+    _SCALAR_TYPES,
+    _column_view,
+)
+
+try:
+    import numexpr
+except ImportError:  # numexpr is optional.
+    numexpr = None
+
+# The number of elements of the result computed at once by chunked
+# evaluation, small enough for temporaries to stay in the cache.
+CHUNK_SIZE = 1 << 14
+
+_OPERATORS = {
+    "add": (np.add, "+"),
+    "subtract": (np.subtract, "-"),
+    "multiply": (np.multiply, "*"),
+    "divide": (np.true_divide, "/"),
+    "power": (np.power, "**"),
+}
+
+
+class LazyArray:
+    """An element-wise expression of GraphArrays evaluated in one pass.
+
+    This is created by GraphArray.lazy. Arithmetic with GraphArrays, scalars
+    and other LazyArrays builds an expression tree, whose operands are
+    checked when it is built. No array is allocated until evaluate is
+    called, which reads each array once and writes the result once.
+
+    Args:
+        array: The GraphArray that the expression starts from.
+    """
+
+    # Let GraphArray and np.ndarray defer binary operations to this class.
+    __array_ufunc__ = None
+
+    def __init__(self, array: GraphArray):
+        """Create an expression consisting of array only."""
+        if not isinstance(array, GraphArray):
+            raise TypeError(f"array must be a GraphArray, not {type(array)}.")
+        self._template = array
+        self._leaves = (array,)
+        self._expression = ("leaf", 0)
+
+    @classmethod
+    def _from_expression(cls, template, leaves, expression):
+        """Create an instance from the parts of an expression."""
+        res = cls.__new__(cls)
+        res._template = template
+        res._leaves = leaves
+        res._expression = expression
+        return res
+
+    def _operand(self, other):
+        """Convert an operand into (template, leaves, expression)."""
+        if isinstance(other, LazyArray):
+            return other._template, other._leaves, other._expression
+        elif isinstance(other, GraphArray):
+            return other, (other,), ("leaf", 0)
+        elif isinstance(other, _SCALAR_TYPES):
+            return None, (), ("scalar", other)
+        raise TypeError(
+            f"{type(self)} can be operated only with "
+            f"GraphArray, LazyArray or scalar, not {type(other)}."
+        )
+
+    def _combine(self, other, operator, reflected=False):
+        """Build the expression of a binary operation."""
+        left = (self._template, self._leaves, self._expression)
+        right = self._operand(other)
+        if reflected:
+            left, right = right, left
+        left_template, left_leaves, left_expression = left
+        right_template, right_leaves, right_expression = right
+        if left_template is None:
+            template = right_template
+        else:
+            template = left_template
+            if right_template is not None:
+                # The same check as GraphArray operations, done only once.
+                # Unlike them, the batch array may be on either side.
+                if isinstance(right_template, BatchGraphArray):
+                    left_template, right_template = (
+                        right_template,
+                        left_template,
+                    )
+                left_template._operand(right_template)
+        leaves = list(left_leaves)
+        renumbered = {}
+        for i, leaf in enumerate(right_leaves):
+            for j, known in enumerate(leaves):
+                if known is leaf:
+                    renumbered[i] = j
+                    break
+            else:
+                renumbered[i] = len(leaves)
+                leaves.append(leaf)
+        right_expression = _renumber(right_expression, renumbered)
+        return LazyArray._from_expression(
+            template,
+            tuple(leaves),
+            (operator, left_expression, right_expression),
+        )
+
+    def __add__(self, other):
+        """Element-wise addition"""
+        return self._combine(other, "add")
+
+    def __radd__(self, other):
+        """Element-wise addition with self on the right"""
+        return self._combine(other, "add", reflected=True)
+
+    def __sub__(self, other):
+        """Element-wise subtraction"""
+        return self._combine(other, "subtract")
+
+    def __rsub__(self, other):
+        """Element-wise subtraction with self on the right"""
+        return self._combine(other, "subtract", reflected=True)
+
+    def __mul__(self, other):
+        """Element-wise multiplication"""
+        return self._combine(other, "multiply")
+
+    def __rmul__(self, other):
+        """Element-wise multiplication with self on the right"""
+        return self._combine(other, "multiply", reflected=True)
+
+    def __truediv__(self, other):
+        """Element-wise division"""
+        return self._combine(other, "divide")
+
+    def __rtruediv__(self, other):
+        """Element-wise division with self on the right"""
+        return self._combine(other, "divide", reflected=True)
+
+    def __pow__(self, other):
+        """Element-wise exponentiation"""
+        return self._combine(other, "power")
+
+    def __rpow__(self, other):
+        """Element-wise exponentiation with self on the right"""
+        return self._combine(other, "power", reflected=True)
+
+    def evaluate(self, out: GraphArray = None, engine: str = None):
+        """Compute the expression.
+
+        Args:
+            out: An array of the same class as the result to which the result
+                is written. It may be one of the operands.
+            engine: "chunked" computes the expression block by block with
+                NumPy so that the temporaries stay in the cache. "numexpr"
+                compiles it with numexpr. Default is "numexpr" if numexpr is
+                installed and all the operands are floating point arrays,
+                and "chunked" otherwise.
+
+        Returns:
+            A GraphArray with the layout of the operands, or out.
+        """
+        if engine is None:
+            engine = "chunked"
+            if numexpr is not None and all(
+                np.issubdtype(leaf._array.dtype, np.floating)
+                for leaf in self._leaves
+            ):
+                engine = "numexpr"
+        if engine not in ("chunked", "numexpr"):
+            raise ValueError(
+                f'engine must be "chunked" or "numexpr", not {engine}.'
+            )
+        elif engine == "numexpr" and numexpr is None:
+            raise ImportError("numexpr is not installed.")
+
+        template = self._template
+        for leaf in self._leaves:
+            if isinstance(leaf, BatchGraphArray):
+                template = leaf
+                break
+        out_columns = None
+        if out is not None:
+            template._operation_error_check(out, (template.__class__,))
+            out_columns = _column_view(out)
+        columns = [leaf._as_columns() for leaf in self._leaves]
+        if engine == "numexpr":
+            res_array = self._evaluate_numexpr(columns, out_columns)
+        else:
+            res_array = self._evaluate_chunked(
+                columns, template._as_columns().shape, out_columns
+            )
+        if out is None:
+            return template._from_columns(res_array, type(template))
+        if res_array is not out_columns:
+            np.copyto(out._array, res_array.reshape(out._array.shape))
+        return out
+
+    def _evaluate_chunked(self, columns, shape, out_columns):
+        """Compute the expression for blocks of rows in turn."""
+        n_rows, n_columns = shape
+        step = max(1, CHUNK_SIZE // n_columns)
+        for start in range(0, max(n_rows, 1), step):
+            stop = min(start + step, n_rows)
+            block, _ = _evaluate(
+                self._expression, [c[start:stop] for c in columns]
+            )
+            if start == 0 and out_columns is None:
+                # The dtype of the result is known after the first block.
+                out_columns = np.empty(shape, dtype=block.dtype)
+            out_columns[start:stop] = block
+        return out_columns
+
+    def _evaluate_numexpr(self, columns, out_columns):
+        """Compute the expression with numexpr.
+
+        numexpr computes float32 operands with float constants in float64,
+        so the result is written into an array of the dtype NumPy gives.
+        """
+        local_dict = {f"a{i}": column for i, column in enumerate(columns)}
+        source = _to_source(self._expression, local_dict)
+        if out_columns is None or not out_columns.flags.c_contiguous:
+            result, _ = _evaluate(self._expression, [c[:0] for c in columns])
+            out_columns = np.empty(
+                np.broadcast_shapes(*(c.shape for c in columns)),
+                dtype=result.dtype,
+            )
+        return numexpr.evaluate(
+            source, local_dict=local_dict, out=out_columns,
+            casting="same_kind",
+        )
+
+
+def _renumber(expression, renumbered):
+    """Replace the leaf numbers of an expression."""
+    if expression[0] == "leaf":
+        return ("leaf", renumbered[expression[1]])
+    elif expression[0] == "scalar":
+        return expression
+    operator, left, right = expression
+    return (
+        operator,
+        _renumber(left, renumbered),
+        _renumber(right, renumbered),
+    )
+
+
+def _evaluate(expression, columns):
+    """Compute a block of an expression with NumPy.
+
+    Temporaries are reused as the outputs of the operations applied to them,
+    so a block allocates only as many arrays as the depth of the expression.
+
+    Returns:
+        A tuple of the result and whether it is a temporary array.
+    """
+    if expression[0] == "leaf":
+        return columns[expression[1]], False
+    elif expression[0] == "scalar":
+        return expression[1], False
+    operator, left, right = expression
+    left, left_is_temporary = _evaluate(left, columns)
+    right, right_is_temporary = _evaluate(right, columns)
+    func = _OPERATORS[operator][0]
+    shape = np.broadcast_shapes(np.shape(left), np.shape(right))
+    dtype = np.result_type(left, right)
+    for operand, is_temporary in (
+        (left, left_is_temporary),
+        (right, right_is_temporary),
+    ):
+        if is_temporary and operand.shape == shape and operand.dtype == dtype:
+            return func(left, right, out=operand), True
+    return func(left, right), True
+
+
+def _to_source(expression, local_dict):
+    """Convert an expression into the source code for numexpr."""
+    if expression[0] == "leaf":
+        return f"a{expression[1]}"
+    elif expression[0] == "scalar":
+        name = f"s{len(local_dict)}"
+        local_dict[name] = expression[1]
+        return name
+    operator, left, right = expression
+    symbol = _OPERATORS[operator][1]
+    return (
+        f"({_to_source(left, local_dict)} {symbol} "
+        f"{_to_source(right, local_dict)})"
+    )
@@ -0,0 +1,195 @@
+"""networkx graphs whose attributes are read from GraphArrays."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Dict, Union
+
+import numpy as np
+import networkx as nx
+
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    BaseGraphArray,
+    _key_columns,
+)
+
+
+class ArrayAttributeGraph(nx.DiGraph):
+    """A read-only nx.DiGraph view of a frozen graph and arrays on it.
+
+    Node and edge attribute dicts are created on access and read the
+    values from the arrays, so neither the graph nor the values are
+    copied, and changes of the arrays are seen by the view. The adjacency
+    is read from the index arrays of the graph. Unlike as_nx_graph, this
+    takes no time to create and can expose many arrays at once, e.g. to
+    run networkx algorithms with an EdgeArray as the weight::
+
+        view = ArrayAttributeGraph(graph, {"cost": cost, "flow": flow})
+        nx.shortest_path(view, source, target, weight="cost")
+
+    Args:
+        base_graph: The frozen graph.
+        arrays: GraphArrays on base_graph keyed by attribute names. Arrays
+            on nodes are node attributes and arrays on edges are edge
+            attributes.
+
+    Notes:
+        The view is frozen as nx.freeze, and the attribute dicts are
+        read-only Mappings. Values are converted to Python scalars, or to
+        rows of np.ndarray for batch arrays, on every lookup.
+    """
+
+    def __init__(
+        self,
+        base_graph: Union[BaseGraph, CompactGraph] = None,
+        arrays: Dict[str, BaseGraphArray] = None,
+    ):
+        """Set up the views of base_graph and arrays."""
+        super().__init__()
+        if base_graph is None:
+            # networkx creates empty instances in copy and graph views.
+            return
+        if not getattr(base_graph, "frozen", False):
+            raise ValueError("base_graph must be a frozen graph.")
+        arrays = {} if arrays is None else arrays
+        node_arrays, edge_arrays = {}, {}
+        for name, array in arrays.items():
+            if not isinstance(array, BaseGraphArray):
+                raise TypeError(
+                    f"{name} must be a GraphArray, not {type(array)}."
+                )
+            elif array.base_graph is not base_graph:
+                raise ValueError(
+                    f"{name} is not defined on the base_graph of the view."
+                )
+            if array._key_names == ("node",):
+                node_arrays[name] = array
+            else:
+                edge_arrays[name] = array
+        self.base_graph = base_graph
+        self.node_arrays = node_arrays
+        self.edge_arrays = edge_arrays
+        self._node = _NodeAttributes(base_graph, node_arrays)
+        self._adj = _Adjacency(base_graph, edge_arrays, "tail")
+        self._pred = _Adjacency(base_graph, edge_arrays, "head")
+        nx.freeze(self)
+
+
+class _Attributes(Mapping):
+    """The attribute dict of a node or an edge read from arrays."""
+
+    __slots__ = ("_arrays", "_index")
+
+    def __init__(self, arrays: dict, index: int):
+        """Store the arrays and the array index of the node or edge."""
+        self._arrays = arrays
+        self._index = index
+
+    def __getitem__(self, name):
+        """Return the value of the array named name"""
+        return self._arrays[name]._values_at([self._index])[0]
+
+    def __iter__(self):
+        """Iterate over the attribute names"""
+        return iter(self._arrays)
+
+    def __len__(self):
+        """Return the number of attributes"""
+        return len(self._arrays)
+
+    def copy(self) -> dict:
+        """Return the attributes as a dict, as networkx copies them."""
+        return dict(self.items())
+
+    def __repr__(self):
+        """Return the attributes as a dict."""
+        return repr(self.copy())
+
+
+class _NodeAttributes(Mapping):
+    """The mapping from nodes to their attribute dicts."""
+
+    def __init__(self, graph, arrays: dict):
+        """Store the graph and the arrays on nodes."""
+        self._graph = graph
+        self._arrays = arrays
+
+    def __getitem__(self, node):
+        """Return the attribute dict of node"""
+        return _Attributes(self._arrays, self._graph.node_to_index[node])
+
+    def __iter__(self):
+        """Iterate over nodes in the array index order"""
+        return iter(self._graph.node_to_index)
+
+    def __len__(self):
+        """Return the number of nodes"""
+        return self._graph.number_of_nodes()
+
+
+class _Adjacency(Mapping):
+    """The mapping from nodes to their successors or predecessors.
+
+    Args:
+        graph: The frozen graph.
+        arrays: The arrays on edges.
+        by: "tail" for successors and "head" for predecessors.
+    """
+
+    def __init__(self, graph, arrays: dict, by: str):
+        """Store the graph and the arrays on edges."""
+        self._graph = graph
+        self._arrays = arrays
+        self._by = by
+
+    def __getitem__(self, node):
+        """Return the neighbors of node"""
+        return _Neighbors(self, self._graph.node_to_index[node])
+
+    def __iter__(self):
+        """Iterate over nodes in the array index order"""
+        return iter(self._graph.node_to_index)
+
+    def __len__(self):
+        """Return the number of nodes"""
+        return self._graph.number_of_nodes()
+
+
+class _Neighbors(Mapping):
+    """The mapping from the neighbors of a node to the edge attributes."""
+
+    __slots__ = ("_adjacency", "_edges", "_others")
+
+    def __init__(self, adjacency: _Adjacency, node_index: int):
+        """Find the edges of the node with array index node_index."""
+        graph = adjacency._graph
+        indptr, order = graph.grouped_edges(adjacency._by)
+        edges = order[indptr[node_index] : indptr[node_index + 1]]
+        if adjacency._by == "tail":
+            others = graph.edge_heads[edges]
+        else:
+            others = graph.edge_tails[edges]
+        self._adjacency = adjacency
+        self._edges = edges
+        self._others = others
+
+    def __getitem__(self, node):
+        """Return the attribute dict of the edge to or from node"""
+        other = self._adjacency._graph.node_to_index[node]
+        positions = np.flatnonzero(self._others == other)
+        if len(positions) == 0:
+            raise KeyError(node)
+        return _Attributes(
+            self._adjacency._arrays, int(self._edges[positions[0]])
+        )
+
+    def __iter__(self):
+        """Iterate over the neighbors sorted by their array indices"""
+        labels = _key_columns(self._adjacency._graph, ("node",))[0]
+        return iter(labels[self._others].tolist())
+
+    def __len__(self):
+        """Return the number of neighbors"""
+        return len(self._edges)
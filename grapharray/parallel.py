@@ -0,0 +1,194 @@
+"""Running a function over many scenarios on the same graph in parallel."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Union
+
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    GraphArray,
+    _describe_array,
+    _restore_array,
+)
+from grapharray.shared import SharedGraph
+
+# The function and the attached graph and arrays in a worker process.
+_worker = {}
+
+
+class ScenarioResult(NamedTuple):
+    """The result of a scenario yielded by map_scenarios.
+
+    Attributes:
+        index: The position of the scenario in the given scenarios.
+        result: The return value of the function. GraphArrays are defined
+            on the base_graph given to map_scenarios.
+        elapsed: Seconds taken by the function call.
+    """
+
+    index: int
+    result: object
+    elapsed: float
+
+
+def map_scenarios(
+    function: Callable,
+    base_graph: Union[BaseGraph, CompactGraph],
+    scenarios: Iterable[GraphArray],
+    arrays: Dict[str, GraphArray] = None,
+    executor: str = "process",
+    max_workers: int = None,
+    chunksize: int = 1,
+) -> Iterator[ScenarioResult]:
+    """Call function on every scenario in parallel.
+
+    function is called as function(scenario, **arrays). In process mode,
+    the graph and arrays are published once in shared memory and attached
+    by each worker, so only the scenario arrays and the results are sent
+    between processes, and function must be picklable. In thread mode, the
+    objects are passed as they are, which is cheaper when function spends
+    most of its time in NumPy/SciPy kernels releasing the GIL.
+
+    Args:
+        function: The function called on every scenario.
+        base_graph: The frozen graph on which scenarios are defined.
+        scenarios: NodeArrays or EdgeArrays on base_graph.
+        arrays: Read-only arrays on base_graph shared by all the calls.
+        executor: "process" or "thread".
+        max_workers: The number of workers. Defaults to that of the
+            executor.
+        chunksize: The number of scenarios sent to a worker at once.
+
+    Returns:
+        An iterator of ScenarioResult in the order the chunks complete.
+    """
+    if executor not in ("process", "thread"):
+        raise ValueError(
+            f'executor must be "process" or "thread", not {executor}.'
+        )
+    elif chunksize < 1:
+        raise ValueError("chunksize must be positive.")
+    scenarios = list(scenarios)
+    for index, scenario in enumerate(scenarios):
+        if scenario.base_graph is not base_graph:
+            raise ValueError(
+                f"Scenario {index} is not defined on the base_graph."
+            )
+        elif executor == "process":
+            _describe_array(scenario)
+            if scenario.is_transposed:
+                raise ValueError(f"Cannot send transposed scenario {index}.")
+    arrays = {} if arrays is None else arrays
+    indexed = list(enumerate(scenarios))
+    chunks = [
+        indexed[start : start + chunksize]
+        for start in range(0, len(indexed), chunksize)
+    ]
+    if executor == "process":
+        return _map_in_processes(
+            function, base_graph, chunks, arrays, max_workers
+        )
+    return _map_in_threads(function, chunks, arrays, max_workers)
+
+
+def _map_in_threads(function, chunks, arrays, max_workers):
+    """Run chunks in a thread pool and yield their results."""
+    with ThreadPoolExecutor(max_workers) as pool:
+        futures = [
+            pool.submit(_run_chunk, function, chunk, arrays)
+            for chunk in chunks
+        ]
+        try:
+            for future in as_completed(futures):
+                for index, result, elapsed in future.result():
+                    yield ScenarioResult(index, result, elapsed)
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def _map_in_processes(function, base_graph, chunks, arrays, max_workers):
+    """Run chunks in a process pool and yield their results."""
+    with SharedGraph(base_graph, arrays) as shared:
+        with ProcessPoolExecutor(
+            max_workers,
+            initializer=_init_worker,
+            initargs=(shared.handle, function),
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _run_packed_chunk,
+                    [
+                        (index, _describe_array(scenario), scenario._array)
+                        for index, scenario in chunk
+                    ],
+                )
+                for chunk in chunks
+            ]
+            try:
+                for future in as_completed(futures):
+                    for index, packed, elapsed in future.result():
+                        yield ScenarioResult(
+                            index, _unpack(base_graph, packed), elapsed
+                        )
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+def _run_chunk(function, chunk, arrays):
+    """Call function on the scenarios in chunk and time each call."""
+    results = []
+    for index, scenario in chunk:
+        start = time.perf_counter()
+        result = function(scenario, **arrays)
+        results.append((index, result, time.perf_counter() - start))
+    return results
+
+
+def _init_worker(handle, function):
+    """Attach the shared graph and store function in a worker process."""
+    _worker["graph"], _worker["arrays"] = handle.attach()
+    _worker["function"] = function
+
+
+def _run_packed_chunk(packed_chunk):
+    """Run a chunk sent to a worker process and pack the results."""
+    graph = _worker["graph"]
+    chunk = [
+        (index, _restore_array(graph, description, core_array))
+        for index, description, core_array in packed_chunk
+    ]
+    return [
+        (index, _pack(result), elapsed)
+        for index, result, elapsed in _run_chunk(
+            _worker["function"], chunk, _worker["arrays"]
+        )
+    ]
+
+
+def _pack(result):
+    """Replace a GraphArray result with its core array to be sent back."""
+    if not isinstance(result, GraphArray):
+        return None, result
+    core_array = result._array
+    if result.is_transposed:
+        core_array = core_array.transpose()
+    return (_describe_array(result), result.is_transposed), core_array
+
+
+def _unpack(base_graph, packed):
+    """Restore a result packed by _pack on base_graph."""
+    info, result = packed
+    if info is None:
+        return result
+    description, is_transposed = info
+    array = _restore_array(base_graph, description, result)
+    return array.T if is_transposed else array
@@ -0,0 +1,440 @@
+"""Opt-in instrumentation of the hot paths and memory summaries.
+
+Profile counts and times the calls to graph construction, array and matrix
+construction, arithmetic, matrix products, copies and exports while it is
+active, and measures the bytes allocated by each call with tracemalloc::
+
+    with Profile() as profile:
+        run_assignment(graph)
+    print(profile.report())
+
+The hot paths are wrapped only while a Profile is active, so there is no
+overhead otherwise. memory_summary reports the bytes held by a graph and
+arrays and matrices on it.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, Union
+
+import numpy as np
+import scipy.sparse as sp
+
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    BaseGraphArray,
+    GraphArray,
+    BatchGraphArray,
+    SparseGraphArray,
+    AdjacencyMatrix,
+    IncidenceMatrix,
+)
+
+# The methods and properties wrapped by Profile, as (class, attribute).
+HOT_PATHS = (
+    (BaseGraph, "freeze"),
+    (BaseGraph, "nodes_to_indices"),
+    (BaseGraph, "edges_to_indices"),
+    (CompactGraph, "__init__"),
+    (CompactGraph, "from_base_graph"),
+    (CompactGraph, "from_edge_arrays"),
+    (CompactGraph, "nodes_to_indices"),
+    (CompactGraph, "edges_to_indices"),
+    (BaseGraphArray, "array"),
+    (BaseGraphArray, "nodes"),
+    (BaseGraphArray, "edges"),
+    (BaseGraphArray, "_operation_error_check"),
+    (GraphArray, "__init__"),
+    (GraphArray, "array"),
+    (GraphArray, "_ensure_writable"),
+    (GraphArray, "_operation"),
+    (GraphArray, "__matmul__"),
+    (GraphArray, "get_copy"),
+    (GraphArray, "astype"),
+    (GraphArray, "as_dict"),
+    (GraphArray, "to_arrays"),
+    (GraphArray, "to_records"),
+    (GraphArray, "to_pandas"),
+    (GraphArray, "as_nx_graph"),
+    (GraphArray, "dump"),
+    (BatchGraphArray, "__init__"),
+    (SparseGraphArray, "__init__"),
+    (SparseGraphArray, "array"),
+    (SparseGraphArray, "_merge"),
+    (SparseGraphArray, "as_dict"),
+    (SparseGraphArray, "dump"),
+    (AdjacencyMatrix, "__init__"),
+    (AdjacencyMatrix, "__matmul__"),
+    (IncidenceMatrix, "__init__"),
+    (IncidenceMatrix, "array"),
+    (IncidenceMatrix, "__matmul__"),
+)
+
+# The active Profile, or None.
+_active = None
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class CallStats:
+    """Statistics of the calls recorded at a call site.
+
+    Attributes:
+        calls: The number of calls.
+        time: Total seconds spent in the calls, including nested calls.
+        allocated: Total of the peak bytes allocated during each call,
+            i.e. the temporaries and copies made by the calls.
+        retained: Total bytes still allocated when each call returns,
+            e.g. the arrays of the results.
+    """
+
+    __slots__ = ("calls", "time", "allocated", "retained")
+
+    def __init__(self):
+        """Create empty statistics."""
+        self.calls = 0
+        self.time = 0.0
+        self.allocated = 0
+        self.retained = 0
+
+    def __repr__(self):
+        """Return the statistics as a string."""
+        return (
+            f"CallStats(calls={self.calls}, time={self.time}, "
+            f"allocated={self.allocated}, retained={self.retained})"
+        )
+
+
+class Profile:
+    """A context manager recording the calls to the hot paths.
+
+    Only one Profile can be active at a time. The hot paths are wrapped on
+    entering and restored on exit, for all the threads.
+
+    Args:
+        memory: Whether to measure allocated bytes with tracemalloc, which
+            makes the calls a few times slower. If tracemalloc is already
+            tracing, its peak is reset by the measurements.
+        callers: Whether to record the calls separately for each line
+            outside grapharray from which they are made.
+
+    Attributes:
+        stats: CallStats keyed by call sites, "Class.attribute", or
+            "Class.attribute (file:line)" if callers is True. Functions
+            decorated by instrument are keyed by their names.
+    """
+
+    def __init__(self, memory: bool = True, callers: bool = False):
+        """Store the options."""
+        self.memory = memory
+        self.callers = callers
+        self.stats: Dict[str, CallStats] = {}
+        self._originals = []
+        self._stack = []
+        self._started_tracing = False
+
+    def __enter__(self):
+        """Wrap the hot paths and start tracing memory."""
+        global _active
+        if _active is not None:
+            raise RuntimeError("Another Profile is already active.")
+        for owner, name in HOT_PATHS:
+            original = owner.__dict__[name]
+            self._originals.append((owner, name, original))
+            setattr(
+                owner,
+                name,
+                _wrap_attribute(original, f"{owner.__name__}.{name}"),
+            )
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _active = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Restore the hot paths and stop tracing memory."""
+        global _active
+        _active = None
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _call(self, site: str, func, args, kwargs):
+        """Call func and record the call."""
+        if self.callers:
+            site = f"{site} ({_caller()})"
+        if self.memory:
+            self._enter_memory()
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            allocated, retained = (
+                self._exit_memory() if self.memory else (0, 0)
+            )
+            stats = self.stats.get(site)
+            if stats is None:
+                stats = self.stats[site] = CallStats()
+            stats.calls += 1
+            stats.time += elapsed
+            stats.allocated += allocated
+            stats.retained += retained
+
+    def _enter_memory(self):
+        """Start measuring the memory of a call, which may be nested."""
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            # Keep the peak of the outer call before it is reset.
+            self._stack[-1][1] = max(self._stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        self._stack.append([current, current])
+
+    def _exit_memory(self):
+        """Finish measuring a call and return (allocated, retained)."""
+        current, peak = tracemalloc.get_traced_memory()
+        start, peak_seen = self._stack.pop()
+        peak = max(peak, peak_seen)
+        if self._stack:
+            self._stack[-1][1] = max(self._stack[-1][1], peak)
+        return peak - start, max(current - start, 0)
+
+    def report(self, sort: str = "time", limit: int = None) -> str:
+        """Return a table of the statistics.
+
+        Args:
+            sort: The column by which the call sites are sorted in
+                descending order, "time", "calls", "allocated" or
+                "retained".
+            limit: The number of call sites shown. Default is all.
+        """
+        if sort not in CallStats.__slots__:
+            raise ValueError(
+                f'sort must be "time", "calls", "allocated" or "retained", '
+                f"not {sort}."
+            )
+        items = sorted(
+            self.stats.items(),
+            key=lambda item: getattr(item[1], sort),
+            reverse=True,
+        )[:limit]
+        width = max([len(site) for site, _ in items] + [9])
+        lines = [
+            f"{'call site':<{width}} {'calls':>9} {'total ms':>11} "
+            f"{'us/call':>10} {'alloc MiB':>10} {'kept MiB':>10}"
+        ]
+        for site, stats in items:
+            lines.append(
+                f"{site:<{width}} {stats.calls:>9} "
+                f"{stats.time * 1e3:>11.3f} "
+                f"{stats.time / stats.calls * 1e6:>10.1f} "
+                f"{stats.allocated / (1 << 20):>10.2f} "
+                f"{stats.retained / (1 << 20):>10.2f}"
+            )
+        return "\n".join(lines)
+
+
+def instrument(name=None):
+    """Decorate a function to record its calls in the active Profile.
+
+    This costs a single check per call when no Profile is active.
+
+    Args:
+        name: The call site of the function. Default is its qualified name.
+            May be omitted as ``@instrument``.
+    """
+    if callable(name):
+        return instrument()(name)
+
+    def decorate(func):
+        return _wrap_function(func, name or func.__qualname__)
+
+    return decorate
+
+
+def _wrap_function(func, site: str):
+    """Wrap func so that its calls are recorded in the active Profile."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _active
+        if profile is None:
+            return func(*args, **kwargs)
+        return profile._call(site, func, args, kwargs)
+
+    return wrapper
+
+
+def _wrap_attribute(attribute, site: str):
+    """Wrap a function, classmethod or property found in a class dict."""
+    if isinstance(attribute, classmethod):
+        return classmethod(_wrap_function(attribute.__func__, site))
+    elif isinstance(attribute, property):
+        return property(
+            _wrap_function(attribute.fget, site),
+            attribute.fset,
+            attribute.fdel,
+            attribute.__doc__,
+        )
+    return _wrap_function(attribute, site)
+
+
+def _caller() -> str:
+    """Return "file:line" of the innermost frame outside grapharray."""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename.startswith(
+        _PACKAGE_DIR
+    ):
+        frame = frame.f_back
+    if frame is None:
+        return "<unknown>"
+    return f"{frame.f_code.co_filename}:{frame.f_lineno}"
+
+
+def nbytes(item) -> int:
+    """Return the bytes of the arrays held by an array or a matrix.
+
+    Matrix-free incidence matrices hold no arrays.
+    """
+    return sum(array.nbytes for array in _arrays_of(item).values())
+
+
+def memory_summary(
+    base_graph: Union[BaseGraph, CompactGraph],
+    arrays: Dict[str, BaseGraphArray] = None,
+    matrices: Dict[str, Union[AdjacencyMatrix, IncidenceMatrix]] = None,
+) -> Dict[str, int]:
+    """Return the bytes held by a frozen graph and arrays and matrices on it.
+
+    Arrays shared by several items, e.g. the index arrays of a graph that a
+    sparse matrix uses, are counted only for the first of them. The
+    dictionaries of a BaseGraph are estimated with sys.getsizeof, without
+    the node objects themselves.
+
+    Args:
+        base_graph: The frozen graph.
+        arrays: Arrays on base_graph keyed by names.
+        matrices: AdjacencyMatrix or IncidenceMatrix on base_graph keyed by
+            names.
+
+    Returns:
+        A dict of bytes keyed by "graph.<component>", "arrays.<name>" and
+        "matrices.<name>", and the sum of them keyed by "total".
+    """
+    arrays = {} if arrays is None else arrays
+    matrices = {} if matrices is None else matrices
+    for name, item in list(arrays.items()) + list(matrices.items()):
+        if item.base_graph is not base_graph:
+            raise ValueError(f"{name} is not defined on the base_graph.")
+    seen = set()
+    summary = {}
+    for component, size in _graph_nbytes(base_graph, seen).items():
+        summary[f"graph.{component}"] = size
+    for prefix, items in (("arrays", arrays), ("matrices", matrices)):
+        for name, item in items.items():
+            summary[f"{prefix}.{name}"] = _count_new(
+                _arrays_of(item).values(), seen
+            )
+    summary["total"] = sum(summary.values())
+    return summary
+
+
+def _arrays_of(item) -> Dict[str, np.ndarray]:
+    """Return the np.ndarray held by an array or a matrix keyed by names."""
+    if isinstance(item, SparseGraphArray):
+        return {"indices": item._indices, "values": item._values}
+    elif isinstance(item, (AdjacencyMatrix, IncidenceMatrix)):
+        res = {}
+        if item._array is not None:
+            res.update(_sparse_arrays(item._array))
+        if getattr(item, "_data_order", None) is not None:
+            res["data_order"] = item._data_order
+        return res
+    elif isinstance(item, GraphArray):
+        return {"array": item._array}
+    raise TypeError(f"Cannot measure {type(item)} object.")
+
+
+def _sparse_arrays(matrix) -> Dict[str, np.ndarray]:
+    """Return the component arrays of a sparse matrix."""
+    if not sp.issparse(matrix):
+        return {"array": np.asarray(matrix)}
+    names = ("data", "indices", "indptr", "row", "col", "offsets")
+    return {
+        name: getattr(matrix, name)
+        for name in names
+        if isinstance(getattr(matrix, name, None), np.ndarray)
+    }
+
+
+def _graph_nbytes(graph, seen: set) -> Dict[str, int]:
+    """Return the bytes of the components of a graph."""
+    res = {}
+    if isinstance(graph, CompactGraph):
+        for name, array in graph._get_state().items():
+            res[name] = _count_new([array], seen)
+        node_index = graph.node_to_index
+        res["node_labels"] = _count_new(
+            [node_index.labels, node_index._sorter], seen
+        )
+        if node_index._dict is not None:
+            res["node_labels"] += _dict_nbytes(node_index._dict)
+    else:
+        res["networkx"] = (
+            _dict_nbytes(graph._node, depth=1)
+            + _dict_nbytes(graph._succ, depth=2)
+            # The edge attribute dicts are shared with _succ.
+            + _dict_nbytes(graph._pred, depth=1)
+        )
+        res["node_to_index"] = _dict_nbytes(dict(graph.node_to_index))
+        res["edge_to_index"] = _dict_nbytes(dict(graph.edge_to_index))
+        res["edge_tails"] = _count_new([graph.edge_tails], seen)
+        res["edge_heads"] = _count_new([graph.edge_heads], seen)
+    res["grouped_edges"] = _count_new(
+        [a for group in graph._grouped_edges.values() for a in group], seen
+    )
+    arrays, pandas_nbytes = [], 0
+    for entry in graph.__dict__.get("_export_cache", {}).values():
+        if isinstance(entry, tuple):
+            arrays.extend(entry)
+        elif entry.nlevels == 1:
+            # A pandas Index may be a view of the node labels.
+            arrays.append(entry.to_numpy())
+        else:
+            pandas_nbytes += entry.memory_usage()
+    res["export_cache"] = _count_new(arrays, seen) + pandas_nbytes
+    return res
+
+
+def _dict_nbytes(mapping: dict, depth: int = 0) -> int:
+    """Estimate the bytes of dicts nested depth times with sys.getsizeof."""
+    res = sys.getsizeof(mapping)
+    if depth > 0:
+        res += sum(_dict_nbytes(v, depth - 1) for v in mapping.values())
+    return res
+
+
+def _count_new(arrays, seen: set) -> int:
+    """Sum nbytes of arrays whose memory is not in seen and add them."""
+    res = 0
+    for array in arrays:
+        if array is None:
+            continue
+        root = array
+        while isinstance(root.base, np.ndarray):
+            root = root.base
+        if id(root) in seen:
+            continue
+        seen.add(id(root))
+        res += array.nbytes
+    return res
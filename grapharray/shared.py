@@ -0,0 +1,192 @@
+"""Sharing graphs and arrays between processes through shared memory."""
+
+from __future__ import annotations
+
+import sys
+from multiprocessing import shared_memory
+from typing import Dict, Union
+
+import numpy as np
+
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    GraphArray,
+    _describe_array,
+    _restore_array,
+)
+
+# Offsets of arrays in the shared memory block are aligned to this size.
+_ALIGNMENT = 64
+
+# Graphs and arrays already attached in this process keyed by block names.
+_attached = {}
+
+
+class SharedGraphHandle:
+    """Picklable description of a graph and arrays in shared memory.
+
+    This is what is sent to worker processes. It holds only the name of the
+    shared memory block, the layout of the arrays in it and the node labels,
+    so pickling it is cheap regardless of the number of edges.
+    """
+
+    def __init__(self, name: str, layout: dict, node_labels, arrays: dict):
+        """Store the description."""
+        self._name = name
+        self._layout = layout
+        self._node_labels = node_labels
+        self._arrays = arrays
+
+    @property
+    def name(self):
+        """The name of the shared memory block"""
+        return self._name
+
+    def attach(self, writeable: bool = False):
+        """Map the graph and arrays in the shared memory without copying.
+
+        The result is cached, so attaching the same handle more than once in
+        a process returns the same objects.
+
+        Args:
+            writeable: Whether the arrays can be modified. If True,
+                modifications are visible to all the processes.
+
+        Returns:
+            A tuple of the CompactGraph and the dict of arrays on it.
+        """
+        key = (self._name, writeable)
+        if key not in _attached:
+            shm = _open_shared_memory(self._name)
+            _attached[key] = self._restore(shm, writeable)
+        return _attached[key][1:]
+
+    def _restore(self, shm, writeable: bool):
+        """Create the graph and arrays from the views of the block."""
+        views = {}
+        for key, (offset, shape, dtype) in self._layout.items():
+            view = np.ndarray(
+                shape, dtype=dtype, buffer=shm.buf, offset=offset
+            )
+            view.flags.writeable = writeable
+            views[key] = view
+        graph_state = {
+            key[len("graph/") :]: view
+            for key, view in views.items()
+            if key.startswith("graph/")
+        }
+        graph = CompactGraph._from_state(graph_state, self._node_labels)
+        arrays = {
+            name: _restore_array(graph, description, views["array/" + name])
+            for name, description in self._arrays.items()
+        }
+        return shm, graph, arrays
+
+
+class SharedGraph:
+    """A graph and arrays published in a shared memory block.
+
+    The process that creates this object owns the block. Worker processes
+    receive the handle and attach to the block without copying. The block
+    is released by close, or at the end of a with statement.
+
+    Args:
+        base_graph: The frozen graph to share. A BaseGraph is shared as the
+            CompactGraph with the same node/edge orders.
+        arrays: Arrays on base_graph to share keyed by names.
+
+    Attributes:
+        handle (SharedGraphHandle): The picklable handle sent to workers.
+        graph (CompactGraph): The shared graph in this process.
+        arrays (dict): The shared arrays in this process, which are
+            writeable and whose modifications are visible to workers.
+    """
+
+    def __init__(
+        self,
+        base_graph: Union[BaseGraph, CompactGraph],
+        arrays: Dict[str, GraphArray] = None,
+    ):
+        """Copy the graph and arrays into a new shared memory block."""
+        arrays = {} if arrays is None else arrays
+        descriptions = {}
+        for name, array in arrays.items():
+            descriptions[name] = _describe_array(array)
+            if array.base_graph is not base_graph:
+                raise ValueError(
+                    f"{name} is not defined on the base_graph to be shared."
+                )
+            elif array.is_transposed:
+                raise ValueError(f"Cannot share transposed array {name}.")
+        if isinstance(base_graph, BaseGraph):
+            base_graph = CompactGraph.from_base_graph(base_graph)
+
+        sources = {
+            "graph/" + key: array
+            for key, array in base_graph._get_state().items()
+        }
+        sources.update(
+            {"array/" + name: array._array for name, array in arrays.items()}
+        )
+        layout = {}
+        size = 0
+        for key, array in sources.items():
+            layout[key] = (size, array.shape, array.dtype.str)
+            size += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for key, array in sources.items():
+            offset, shape, dtype = layout[key]
+            view = np.ndarray(
+                shape, dtype=dtype, buffer=self._shm.buf, offset=offset
+            )
+            view[...] = array
+        self.handle = SharedGraphHandle(
+            self._shm.name,
+            layout,
+            base_graph.node_labels,
+            descriptions,
+        )
+        _, self.graph, self.arrays = self.handle._restore(self._shm, True)
+
+    def close(self):
+        """Release the shared memory block.
+
+        Objects in graph and arrays must not be used after this.
+        """
+        _attached.pop((self._shm.name, True), None)
+        _attached.pop((self._shm.name, False), None)
+        self.graph = None
+        self.arrays = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Views are still referenced; the mapping is released with them.
+            pass
+        self._shm.unlink()
+
+    def __enter__(self):
+        """Return self for the with statement."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Release the shared memory block."""
+        self.close()
+
+
+def _open_shared_memory(name: str):
+    """Open an existing shared memory block without owning it.
+
+    The block must not be unlinked when this process exits, so it is not
+    registered to the resource tracker of multiprocessing.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    from multiprocessing import resource_tracker
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
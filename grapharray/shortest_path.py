@@ -0,0 +1,298 @@
+"""Shortest paths on frozen graphs with costs given by EdgeArrays."""
+
+from __future__ import annotations
+
+from typing import Union
+
+import numpy as np
+from scipy.sparse import csgraph
+
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    NodeArray,
+    EdgeArray,
+    BatchNodeArray,
+    BatchEdgeArray,
+    AdjacencyMatrix,
+    _column_view,
+)
+
+# Methods of scipy.sparse.csgraph.shortest_path
+_METHODS = {
+    "auto": "auto",
+    "dijkstra": "D",
+    "bellman-ford": "BF",
+    "johnson": "J",
+}
+
+
+class ShortestPathEngine:
+    """Shortest path computation reusing the structure of a graph.
+
+    The CSR matrix of the graph is built once, and each call of solve only
+    refreshes its data with the costs, so that many calls with changing
+    costs, e.g. iterations of traffic assignment, cost no more than the
+    search itself. The search is done by scipy.sparse.csgraph for all the
+    origins at once.
+
+    Args:
+        base_graph: The frozen graph.
+    """
+
+    def __init__(self, base_graph: Union[BaseGraph, CompactGraph]):
+        """Build the CSR matrix and the lookup of edges by end nodes."""
+        self._matrix = AdjacencyMatrix(EdgeArray(base_graph, init_val=1.0))
+        self._base_graph = base_graph
+        _, order = base_graph.grouped_edges("tail")
+        n_nodes = base_graph.number_of_nodes()
+        # Codes of (tail, head) are sorted in the CSR order.
+        self._edge_order = order
+        self._edge_codes = (
+            base_graph.edge_tails[order].astype(np.int64) * n_nodes
+            + base_graph.edge_heads[order]
+        )
+
+    @property
+    def base_graph(self):
+        """The graph on which the shortest paths are computed"""
+        return self._base_graph
+
+    def solve(self, cost: EdgeArray, origins, method: str = "auto"):
+        """Compute the shortest paths from origins.
+
+        Args:
+            cost: The cost of each edge. Edges of zero cost are kept.
+            origins: A node, or a list or 1-dimensional np.ndarray of nodes.
+            method: "dijkstra" for non-negative costs, "bellman-ford" or
+                "johnson" for costs that may be negative, or "auto" to let
+                scipy choose.
+
+        Returns:
+            A ShortestPathResult. Its arrays are NodeArray and EdgeArray if
+            origins is a single node, and batch arrays with a column per
+            origin otherwise.
+        """
+        if method not in _METHODS:
+            raise ValueError(
+                f'method must be "auto", "dijkstra", "bellman-ford" or '
+                f'"johnson", not {method}.'
+            )
+        self._matrix._check_weight(cost)
+        if isinstance(cost, BatchEdgeArray):
+            raise TypeError("cost must be a single-column EdgeArray.")
+        if cost.dtype != self._matrix._array.dtype:
+            cost = cost.astype(self._matrix._array.dtype)
+        self._matrix.update(cost)
+
+        is_batch = isinstance(origins, (list, np.ndarray))
+        indices = self._base_graph.nodes_to_indices(
+            origins if is_batch else [origins]
+        )
+        distances, predecessors = csgraph.shortest_path(
+            self._matrix._array,
+            method=_METHODS[method],
+            directed=True,
+            return_predecessors=True,
+            indices=indices,
+        )
+        distances = np.ascontiguousarray(distances.T)
+        predecessors = np.ascontiguousarray(predecessors.T)
+        predecessors[predecessors < 0] = -1
+        return ShortestPathResult(
+            self, indices, distances, predecessors, is_batch
+        )
+
+    def _edges_between(self, tails, heads) -> np.ndarray:
+        """Return the array indices of edges given array indices of ends."""
+        codes = (
+            tails.astype(np.int64) * self._base_graph.number_of_nodes()
+            + heads
+        )
+        return self._edge_order[np.searchsorted(self._edge_codes, codes)]
+
+
+class ShortestPathResult:
+    """Shortest paths from origins computed by ShortestPathEngine.solve.
+
+    The arrays have a column per origin if the origins were given as a
+    batch, and are single-column arrays otherwise.
+
+    Attributes:
+        origins: The array indices of the origins.
+        distances: A NodeArray or BatchNodeArray of the distances from the
+            origins, which are inf for unreachable nodes.
+        predecessors: A NodeArray or BatchNodeArray of the array indices of
+            the previous nodes on the shortest paths, which are -1 for the
+            origins and unreachable nodes.
+        predecessor_edges: A NodeArray or BatchNodeArray of the array
+            indices of the last edges of the shortest paths to the nodes,
+            or -1.
+    """
+
+    def __init__(self, engine, origins, distances, predecessors, is_batch):
+        """Wrap the results of scipy into arrays."""
+        self._engine = engine
+        self._is_batch = is_batch
+        self.origins = origins
+        self._predecessors = predecessors
+        self._predecessor_edges = np.full(predecessors.shape, -1, np.intp)
+        reached = predecessors >= 0
+        self._predecessor_edges[reached] = engine._edges_between(
+            predecessors[reached], np.nonzero(reached)[0]
+        )
+        self.distances = self._node_array(distances)
+        self.predecessors = self._node_array(predecessors)
+        self.predecessor_edges = self._node_array(self._predecessor_edges)
+
+    @property
+    def base_graph(self):
+        """The graph on which the shortest paths are computed"""
+        return self._engine.base_graph
+
+    def _node_array(self, columns):
+        """Wrap an array of shape (number of nodes, origins)."""
+        if self._is_batch:
+            return BatchNodeArray(self.base_graph, init_val=columns)
+        return NodeArray(self.base_graph, init_val=columns[:, 0])
+
+    def _edge_array(self, columns):
+        """Wrap an array of shape (number of edges, origins)."""
+        if self._is_batch:
+            return BatchEdgeArray(self.base_graph, init_val=columns)
+        return EdgeArray(self.base_graph, init_val=columns[:, 0])
+
+    def tree_edges(self):
+        """Return whether each edge is in the shortest path tree.
+
+        Returns:
+            A bool EdgeArray, or BatchEdgeArray with a column per origin.
+        """
+        n_edges = self.base_graph.number_of_edges()
+        res = np.zeros((n_edges, len(self.origins)), dtype=bool)
+        nodes, columns = np.nonzero(self._predecessor_edges >= 0)
+        res[self._predecessor_edges[nodes, columns], columns] = True
+        return self._edge_array(res)
+
+    def path_edges(self, destinations):
+        """Return whether each edge is on the shortest path to destinations.
+
+        Args:
+            destinations: A node, which is the destination of the paths
+                from all the origins, or a batch of nodes, one per origin.
+
+        Returns:
+            A bool EdgeArray, or BatchEdgeArray with a column per origin.
+            The columns of unreachable destinations are all False.
+        """
+        is_batch = isinstance(destinations, (list, np.ndarray))
+        nodes = self.base_graph.nodes_to_indices(
+            destinations if is_batch else [destinations]
+        )
+        nodes = np.broadcast_to(nodes, self.origins.shape).copy()
+        columns = np.arange(len(self.origins))
+        res = np.zeros(
+            (self.base_graph.number_of_edges(), len(self.origins)),
+            dtype=bool,
+        )
+        while len(nodes):
+            edges = self._predecessor_edges[nodes, columns]
+            on_path = edges >= 0
+            nodes, columns = nodes[on_path], columns[on_path]
+            res[edges[on_path], columns] = True
+            nodes = self._predecessors[nodes, columns]
+        return self._edge_array(res)
+
+    def load(self, demand, out: EdgeArray = None) -> EdgeArray:
+        """Load demand from the origins onto the shortest paths.
+
+        This is the all-or-nothing assignment: the demand from each origin
+        to each node is put on the edges of the shortest path between them,
+        and the flows are summed over the origins. The flows are propagated
+        from the leaves of the shortest path trees towards the origins, a
+        level of the trees at a time for all the origins at once.
+
+        Args:
+            demand: A NodeArray, or BatchNodeArray with a column per origin,
+                of the demand from the origins to each node.
+            out: An EdgeArray to which the flows are written.
+
+        Returns:
+            An EdgeArray of the total flow on each edge.
+
+        Raises:
+            ValueError: If there is demand to an unreachable node.
+        """
+        demand_class = BatchNodeArray if self._is_batch else NodeArray
+        self.distances._operation_error_check(demand, (demand_class,))
+        accumulated = demand._as_columns().astype(np.float64)
+        if accumulated.shape != self._predecessors.shape:
+            raise ValueError(
+                f"demand must have {len(self.origins)} columns, "
+                f"not {accumulated.shape[1]}."
+            )
+        distances = self.distances._as_columns()
+        if np.any(np.isinf(distances) & (accumulated != 0)):
+            raise ValueError("There is demand to unreachable nodes.")
+        n_origins = len(self.origins)
+        accumulated = accumulated.ravel()
+        parents = self._predecessors.ravel().astype(np.intp)
+        parents = np.where(
+            parents >= 0,
+            parents * n_origins + np.arange(len(parents)) % n_origins,
+            -1,
+        )
+        depths = _tree_depths(parents)
+        by_depth = np.argsort(depths, kind="stable")
+        starts = np.searchsorted(depths[by_depth], np.arange(depths.max() + 2))
+        for depth in range(depths.max(), 0, -1):
+            children = by_depth[starts[depth] : starts[depth + 1]]
+            np.add.at(accumulated, parents[children], accumulated[children])
+        edges = self._predecessor_edges.ravel()
+        on_tree = edges >= 0
+        flows = np.bincount(
+            edges[on_tree],
+            weights=accumulated[on_tree],
+            minlength=self.base_graph.number_of_edges(),
+        )
+        if out is None:
+            return EdgeArray(self.base_graph, init_val=flows)
+        self.distances._operation_error_check(out, (EdgeArray,))
+        out_columns = _column_view(out)
+        if out_columns is not None:
+            np.copyto(out_columns[:, 0], flows, casting="same_kind")
+        else:
+            np.copyto(out._array, flows.reshape(out._array.shape))
+        return out
+
+
+def _tree_depths(parents: np.ndarray) -> np.ndarray:
+    """Return the depth of each vertex of trees given by parent pointers.
+
+    The depths are computed by pointer jumping, which takes O(log height)
+    vectorized passes instead of walking the trees.
+
+    Args:
+        parents: The index of the parent of each vertex, or -1 for roots.
+    """
+    depths = (parents >= 0).astype(np.intp)
+    jumps = parents.copy()
+    active = np.flatnonzero(jumps >= 0)
+    while len(active):
+        targets = jumps[active]
+        depths[active] += depths[targets]
+        jumps[active] = jumps[targets]
+        active = active[jumps[active] >= 0]
+    return depths
+
+
+def shortest_paths(cost: EdgeArray, origins, method: str = "auto"):
+    """Compute the shortest paths from origins with a new engine.
+
+    Create a ShortestPathEngine and reuse it instead when the shortest
+    paths are computed repeatedly on the same graph.
+
+    See ShortestPathEngine.solve for the arguments.
+    """
+    engine = ShortestPathEngine(cost.base_graph)
+    return engine.solve(cost, origins, method)
@@ -0,0 +1,239 @@
+"""Multithreaded products of matrices with arrays."""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+
+import numpy as np
+import scipy.sparse as sp
+
+from grapharray.classes import (
+    NodeArray,
+    EdgeArray,
+    SparseGraphArray,
+    AdjacencyMatrix,
+    IncidenceMatrix,
+    _column_view,
+    _columns_result,
+    _incidence_dtype,
+    _sparse_incidence_matrix,
+)
+
+# Matrices with fewer stored elements are multiplied by SciPy directly.
+DEFAULT_MIN_NNZ = 1_000_000
+
+
+class ParallelMatmul:
+    """Products with a matrix computed by a pool of threads.
+
+    The sparse matrix is split into blocks of about the same number of
+    stored elements once, and each product multiplies the blocks in
+    parallel. The blocks are views of the matrix, so values refreshed by
+    AdjacencyMatrix.update are used without splitting again. SciPy releases
+    the GIL while multiplying, so the threads run on all the cores.
+
+    CSR matrices are split into blocks of rows, which write disjoint parts
+    of the result. CSC matrices, including incidence matrices, are split
+    into blocks of columns, i.e. edges for incidence matrices, whose
+    partial results are summed. Matrices in other formats and matrices
+    with fewer than min_nnz stored elements are multiplied by SciPy as
+    the matrix itself does. Products with incidence matrices promote bool
+    and narrow integers as IncidenceMatrix.matmul does.
+
+    The blocks follow the orientation of the matrix when this object is
+    created, so the products raise ValueError once the matrix is
+    transposed. Create another one after transposing the matrix.
+
+    Args:
+        matrix: An AdjacencyMatrix or IncidenceMatrix. A matrix-free
+            IncidenceMatrix is built as a sparse matrix here, which is held
+            as long as this object is.
+        n_threads: The number of threads. If None, the number of CPUs.
+        min_nnz: The number of stored elements below which the products
+            are not split.
+
+    Examples:
+        >>> with ParallelMatmul(IncidenceMatrix(BG), n_threads=8) as B:
+        ...     divergence = B @ flow
+    """
+
+    def __init__(
+        self,
+        matrix: Union[AdjacencyMatrix, IncidenceMatrix],
+        n_threads: int = None,
+        min_nnz: int = DEFAULT_MIN_NNZ,
+    ):
+        """Split the matrix and start the threads."""
+        if not isinstance(matrix, (AdjacencyMatrix, IncidenceMatrix)):
+            raise TypeError(
+                f"matrix must be an AdjacencyMatrix or IncidenceMatrix, "
+                f"not {type(matrix)}."
+            )
+        if n_threads is None:
+            n_threads = os.cpu_count() or 1
+        if n_threads < 1:
+            raise ValueError(f"n_threads must be positive, not {n_threads}.")
+        self._matrix = matrix
+        self._n_threads = n_threads
+        self._is_transposed = matrix.is_transposed
+        if isinstance(matrix, AdjacencyMatrix):
+            self._type_other, self._type_result = NodeArray, NodeArray
+        elif not matrix.is_transposed:
+            self._type_other, self._type_result = EdgeArray, NodeArray
+        else:
+            self._type_other, self._type_result = NodeArray, EdgeArray
+        sparse = matrix._array
+        if sparse is None:
+            sparse = _sparse_incidence_matrix(matrix.base_graph)
+            if matrix.is_transposed:
+                sparse = sparse.transpose()
+        self._sparse = sparse
+        self._by_rows = sp.isspmatrix_csr(sparse)
+        self._blocks = None
+        self._executor = None
+        if (
+            n_threads > 1
+            and sparse.nnz >= min_nnz
+            and (self._by_rows or sp.isspmatrix_csc(sparse))
+        ):
+            self._blocks = _split(sparse, n_threads, self._by_rows)
+            self._executor = ThreadPoolExecutor(n_threads)
+
+    @property
+    def matrix(self):
+        """The matrix multiplied"""
+        return self._matrix
+
+    @property
+    def n_threads(self):
+        """The number of threads"""
+        return self._n_threads
+
+    @property
+    def is_parallel(self):
+        """Whether the products are split among the threads"""
+        return self._blocks is not None
+
+    def matmul(self, other, out=None):
+        """Return the product of the matrix and other.
+
+        Args:
+            other: An array accepted by the matmul method of the matrix.
+                Batch arrays are multiplied column by column at once.
+            out: An instance of the result class to which the result is
+                written. If None, a new instance is created.
+
+        Raises:
+            ValueError: If the matrix was transposed after this object was
+                created.
+        """
+        if self._matrix.is_transposed != self._is_transposed:
+            raise ValueError(
+                "The matrix was transposed after ParallelMatmul was created."
+            )
+        if not self.is_parallel or isinstance(other, SparseGraphArray):
+            return self._matrix.matmul(other, out=out)
+        if not isinstance(other, self._type_other):
+            raise TypeError(
+                f"{type(self._matrix)} can be multiplied only with "
+                f"{self._type_other}, not {type(other)}."
+            )
+        self._matrix._operation_error_check(other, (self._type_other,))
+        other_array = other._as_columns()
+        if isinstance(self._matrix, IncidenceMatrix):
+            other_array = other_array.astype(
+                _incidence_dtype(other_array.dtype), copy=False
+            )
+        dtype = np.result_type(self._sparse.dtype, other_array.dtype)
+        shape = (self._sparse.shape[0], other_array.shape[1])
+        out_columns = None
+        if out is not None:
+            self._matrix._operation_error_check(out, (self._type_result,))
+            out_columns = _column_view(out)
+            if out_columns is not None and out_columns.dtype != dtype:
+                out_columns = None
+        res_array = out_columns
+        if res_array is None:
+            res_array = np.empty(shape, dtype=dtype)
+        if self._by_rows:
+
+            def multiply(block):
+                start, stop, matrix = block
+                res_array[start:stop] = matrix @ other_array
+
+            for _ in self._executor.map(multiply, self._blocks):
+                pass
+        else:
+            partials = self._executor.map(
+                lambda block: block[2] @ other_array[block[0] : block[1]],
+                self._blocks,
+            )
+            res_array[...] = next(partials)
+            for partial in partials:
+                res_array += partial
+        if out_columns is not None:
+            return out
+        return _columns_result(
+            self._matrix, self._type_result, res_array, other, out
+        )
+
+    def __matmul__(self, other):
+        """Return the product of the matrix and other.
+
+        See matmul for details.
+        """
+        return self.matmul(other)
+
+    def close(self):
+        """Stop the threads.
+
+        The products are computed by SciPy without threads afterwards.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+        self._executor = None
+        self._blocks = None
+
+    def __enter__(self):
+        """Return self."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop the threads."""
+        self.close()
+
+
+def _split(matrix, n_blocks: int, by_rows: bool) -> list:
+    """Split a CSR matrix into rows or a CSC matrix into columns.
+
+    The blocks share the data and indices of matrix and have about the same
+    number of stored elements.
+
+    Returns:
+        A list of (start, stop, block) where block is the rows or columns
+        from start to stop.
+    """
+    indptr = matrix.indptr
+    bounds = np.searchsorted(
+        indptr, np.linspace(0, matrix.nnz, n_blocks + 1), side="left"
+    )
+    bounds[0], bounds[-1] = 0, len(indptr) - 1
+    bounds = np.unique(bounds)
+    matrix_class = sp.csr_matrix if by_rows else sp.csc_matrix
+    blocks = []
+    for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        first, last = indptr[start], indptr[stop]
+        size = stop - start
+        shape = (
+            (size, matrix.shape[1]) if by_rows else (matrix.shape[0], size)
+        )
+        data, indices = matrix.data[first:last], matrix.indices[first:last]
+        block = matrix_class(
+            (data, indices, indptr[start : stop + 1] - first), shape=shape
+        )
+        # SciPy copies small views of large arrays, so set the views again.
+        block.data, block.indices = data, indices
+        blocks.append((start, stop, block))
+    return blocks
@@ -0,0 +1,468 @@
+"""Subgraphs of frozen graphs and views of arrays restricted to them."""
+
+from __future__ import annotations
+
+from typing import Union
+
+import numpy as np
+import scipy.sparse as sp
+
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    GraphArray,
+    NodeArray,
+    EdgeArray,
+    AdjacencyMatrix,
+    IncidenceMatrix,
+    _describe_array,
+    _restore_array,
+    _index_dtype,
+    _label_array,
+)
+
+
+class SubGraph(CompactGraph):
+    """A subset of nodes and edges of a frozen graph.
+
+    The subgraph holds the array indices of its nodes and edges in the
+    parent graph, and is itself a CompactGraph whose nodes and edges are
+    indexed in the same order as in the parent. So arrays and matrices can
+    be defined on it, and views of arrays on the parent restricted to it
+    are created by view.
+
+    Args:
+        parent: The frozen graph from which nodes and edges are selected.
+        nodes: Nodes of the subgraph. If edges is None, the edges between
+            them are selected, i.e. the subgraph is induced by nodes.
+        edges: Edges of the subgraph. Their end nodes are also selected.
+
+    Notes:
+        Either nodes or edges must be given. Both are translated into array
+        indices in a vectorized way, and the subgraph is built from the
+        index arrays of the parent without walking the graph.
+    """
+
+    def __init__(
+        self, parent: Union[BaseGraph, CompactGraph], nodes=None, edges=None
+    ):
+        """Translate the selection into array indices and build the graph."""
+        node_indices = edge_indices = None
+        if nodes is not None:
+            node_indices = parent.nodes_to_indices(nodes)
+        if edges is not None:
+            edge_indices = parent.edges_to_indices(edges)
+        self._build(parent, node_indices, edge_indices)
+
+    @classmethod
+    def from_indices(
+        cls,
+        parent: Union[BaseGraph, CompactGraph],
+        node_indices=None,
+        edge_indices=None,
+    ):
+        """Create a subgraph from array indices of nodes and/or edges.
+
+        The selection works as the nodes and edges arguments.
+        """
+        res = cls.__new__(cls)
+        res._build(parent, node_indices, edge_indices)
+        return res
+
+    def _build(self, parent, node_indices, edge_indices):
+        """Set up the subgraph from the selected array indices."""
+        if not isinstance(parent, (BaseGraph, CompactGraph)) or not getattr(
+            parent, "frozen", False
+        ):
+            raise ValueError("parent must be a frozen graph.")
+        elif node_indices is None and edge_indices is None:
+            raise ValueError("Either nodes or edges must be given.")
+        tails, heads = parent.edge_tails, parent.edge_heads
+        if edge_indices is None:
+            is_selected = np.zeros(parent.number_of_nodes(), dtype=bool)
+            is_selected[node_indices] = True
+            edge_indices = np.flatnonzero(
+                is_selected[tails] & is_selected[heads]
+            )
+        edge_indices = np.unique(edge_indices)
+        ends = np.concatenate((tails[edge_indices], heads[edge_indices]))
+        if node_indices is None:
+            node_indices = ends
+        node_indices = np.unique(np.concatenate((node_indices, ends)))
+        n_nodes = len(node_indices)
+        dtype = _index_dtype(max(parent.number_of_nodes(), 1))
+        self._parent = parent
+        self._node_indices = node_indices.astype(dtype)
+        self._edge_indices = edge_indices.astype(
+            _index_dtype(max(parent.number_of_edges(), 1))
+        )
+        for array in (self._node_indices, self._edge_indices):
+            array.flags.writeable = False
+
+        # Both are sorted, so local indices keep the order of the parent.
+        local_ends = np.searchsorted(node_indices, ends)
+        local_tails = local_ends[: len(edge_indices)]
+        local_heads = local_ends[len(edge_indices) :]
+        order = np.argsort(local_tails, kind="stable")
+        indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(local_tails, minlength=n_nodes), out=indptr[1:])
+        if isinstance(parent, CompactGraph):
+            labels = parent.node_labels
+        else:
+            labels = _label_array(parent.node_to_index)
+        labels = node_indices if labels is None else labels[node_indices]
+        super(SubGraph, self).__init__(
+            indptr, local_heads[order], labels, edge_ids=order
+        )
+
+    def __reduce__(self):
+        """Pickle the parent and the selected indices."""
+        return (
+            SubGraph.from_indices,
+            (self._parent, self._node_indices, self._edge_indices),
+        )
+
+    @property
+    def parent(self):
+        """The graph from which the subgraph is selected"""
+        return self._parent
+
+    @property
+    def node_indices(self):
+        """Array indices of the nodes of the subgraph in the parent"""
+        return self._node_indices
+
+    @property
+    def edge_indices(self):
+        """Array indices of the edges of the subgraph in the parent"""
+        return self._edge_indices
+
+    def view(self, array: GraphArray):
+        """Return a view of an array on the parent restricted to self.
+
+        Args:
+            array: NodeArray or EdgeArray on the parent, or the batch array
+                of them.
+
+        Returns:
+            NodeArrayView or EdgeArrayView.
+        """
+        if isinstance(array, NodeArray):
+            return NodeArrayView(self, array)
+        elif isinstance(array, EdgeArray):
+            return EdgeArrayView(self, array)
+        raise TypeError(
+            f"array must be NodeArray or EdgeArray, not {type(array)}."
+        )
+
+    def restrict(self, matrix: Union[AdjacencyMatrix, IncidenceMatrix]):
+        """Return a matrix on the parent restricted to self.
+
+        The rows of the nodes and the columns of the edges of the subgraph
+        are sliced from the sparse matrix of the parent, and so are the
+        rows and columns of the nodes for AdjacencyMatrix, instead of
+        building the matrix from the subgraph.
+
+        Args:
+            matrix: AdjacencyMatrix or IncidenceMatrix on the parent.
+
+        Returns:
+            The matrix of the same class defined on self.
+        """
+        if matrix.base_graph is not self._parent:
+            raise ValueError("matrix is not defined on the parent.")
+        if isinstance(matrix, IncidenceMatrix):
+            if matrix.matrix_free:
+                res = IncidenceMatrix(self, matrix_free=True)
+            else:
+                sparse_matrix = matrix._array
+                if matrix.is_transposed:
+                    sparse_matrix = sparse_matrix.transpose()
+                sparse_matrix = sparse_matrix.tocsc()[:, self._edge_indices]
+                res = IncidenceMatrix._from_sparse(
+                    self, sparse_matrix[self._node_indices, :].tocsc()
+                )
+            return res.T if matrix.is_transposed else res
+        elif isinstance(matrix, AdjacencyMatrix):
+            if matrix.is_transposed:
+                raise ValueError("Cannot restrict transposed matrices.")
+            return _restrict_adjacency(self, matrix)
+        raise TypeError(
+            f"matrix must be AdjacencyMatrix or IncidenceMatrix, "
+            f"not {type(matrix)}."
+        )
+
+
+def _restrict_adjacency(subgraph: SubGraph, matrix: AdjacencyMatrix):
+    """Slice an adjacency matrix on the parent to the nodes of subgraph.
+
+    The elements of edges between the nodes that are not in subgraph are
+    dropped, and the result keeps the sparse format of matrix.
+    """
+    sparse_format = matrix.sparse_format
+    n = subgraph.number_of_nodes()
+    if sparse_format == "coo":
+        # The data of COO matrices are stored in the edge index order.
+        sliced = sp.coo_matrix(
+            (
+                matrix._array.data[subgraph.edge_indices],
+                (subgraph.edge_tails, subgraph.edge_heads),
+            ),
+            shape=(n, n),
+        )
+        return AdjacencyMatrix._from_sparse(subgraph, sliced, "coo", None)
+    by = "head" if sparse_format == "csc" else "tail"
+    parent = matrix._array
+    if sparse_format not in ("csr", "csc"):
+        parent = parent.tocsr()
+    nodes = subgraph.node_indices
+    sliced = parent[nodes][:, nodes]
+    sliced.sort_indices()
+    # Both are sorted by the codes of (row, column) of the elements.
+    rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(sliced.indptr))
+    codes = rows * n + sliced.indices
+    indptr, data_order = subgraph.grouped_edges(by)
+    if by == "tail":
+        key, sub_key = subgraph.edge_tails, subgraph.edge_heads
+    else:
+        key, sub_key = subgraph.edge_heads, subgraph.edge_tails
+    edge_codes = key[data_order].astype(np.int64) * n + sub_key[data_order]
+    kept = np.isin(codes, edge_codes, assume_unique=True)
+    matrix_class = sp.csc_matrix if by == "head" else sp.csr_matrix
+    sliced = matrix_class(
+        (sliced.data[kept], sliced.indices[kept], indptr), shape=(n, n)
+    )
+    if sparse_format not in ("csr", "csc"):
+        sliced = sliced.asformat(sparse_format)
+    return AdjacencyMatrix._from_sparse(
+        subgraph, sliced, sparse_format, data_order
+    )
+
+
+class GraphArrayView:
+    """Extracted codes shared between NodeArrayView and EdgeArrayView.
+
+    A view reads and writes the values of an array on the parent graph at
+    the nodes/edges of a subgraph, without copying the array. Nodes/edges
+    are given as those of the subgraph.
+
+    Arithmetic operations and matrix products are computed on the values
+    gathered by get, and return arrays on the subgraph. In-place operations
+    write the results back to the parent array.
+
+    Args:
+        subgraph: The subgraph to which the view is restricted.
+        array: The array on the parent of subgraph.
+    """
+
+    # Let GraphArray and the matrices defer binary operations to this class.
+    __array_ufunc__ = None
+
+    _array_class = GraphArray
+
+    def __init__(self, subgraph: SubGraph, array: GraphArray):
+        """Store the array and the array indices of the subgraph."""
+        if array.base_graph is not subgraph.parent:
+            raise ValueError("array is not defined on the parent.")
+        elif array.is_transposed:
+            raise ValueError("Cannot view transposed arrays.")
+        self._subgraph = subgraph
+        self._parent_array = array
+        self._description = _describe_array(array)
+
+    @property
+    def base_graph(self):
+        """The subgraph to which the view is restricted"""
+        return self._subgraph
+
+    @property
+    def parent_array(self):
+        """The viewed array on the parent"""
+        return self._parent_array
+
+    @property
+    def parent_indices(self):
+        """Array indices in the parent of the items of the view.
+
+        This is only a dummy implementation here and overridden in subclasses.
+        """
+        return np.zeros(0, dtype=np.intp)
+
+    def _keys_to_indices(self, keys):
+        """Translate keys into array indices in the parent."""
+        if isinstance(keys, (list, np.ndarray)):
+            indices = self._subgraph_keys_to_indices(keys)
+        else:
+            indices = self._subgraph_index[keys]
+        return self.parent_indices[indices]
+
+    @property
+    def array(self):
+        """A copy of the viewed values as np.ndarray"""
+        return self._parent_array.take(self.parent_indices)
+
+    def get(self) -> GraphArray:
+        """Gather the viewed values into an array on the subgraph"""
+        return _restore_array(self._subgraph, self._description, self.array)
+
+    def set(self, value):
+        """Write value to the viewed elements of the parent array.
+
+        Args:
+            value: A scalar, an array on the subgraph or an np.ndarray
+                laid out as the array property.
+        """
+        if isinstance(value, GraphArrayView):
+            value = value.get()
+        if isinstance(value, GraphArray):
+            if not isinstance(value, self._array_class):
+                raise TypeError(
+                    f"{type(self)} can be set only with "
+                    f"{self._array_class}, not {type(value)}."
+                )
+            elif value.base_graph is not self._subgraph:
+                raise ValueError("value is not defined on the subgraph.")
+            value = value.take(slice(None))
+        self._parent_array.put(self.parent_indices, value)
+
+    def take(self, indices: np.ndarray) -> np.ndarray:
+        """Get the values at array indices of the subgraph"""
+        return self._parent_array.take(self.parent_indices[indices])
+
+    def put(self, indices: np.ndarray, values):
+        """Set values at array indices of the subgraph"""
+        self._parent_array.put(self.parent_indices[indices], values)
+
+    def __getitem__(self, key):
+        """Get the value corresponding to a node/edge of the subgraph"""
+        return self._parent_array.take(self._keys_to_indices(key))
+
+    def __setitem__(self, key, value):
+        """Set the value corresponding to a node/edge of the subgraph"""
+        self._parent_array.put(self._keys_to_indices(key), value)
+
+    def __len__(self):
+        """Return the number of viewed items"""
+        return len(self.parent_indices)
+
+    def as_dict(self) -> dict:
+        """Return the viewed values as a dictionary keyed by node/edge"""
+        return self.get().as_dict()
+
+    def __repr__(self):
+        """Return a string representation of the viewed values"""
+        return repr(self.get())
+
+    @staticmethod
+    def _unwrap(other):
+        """Gather the values of other if it is a view"""
+        return other.get() if isinstance(other, GraphArrayView) else other
+
+    def __add__(self, other):
+        """Element-wise addition"""
+        return self.get() + self._unwrap(other)
+
+    def __radd__(self, other):
+        """Element-wise addition with self on the right"""
+        return other + self.get()
+
+    def __sub__(self, other):
+        """Element-wise subtraction"""
+        return self.get() - self._unwrap(other)
+
+    def __rsub__(self, other):
+        """Element-wise subtraction with self on the right"""
+        return other - self.get()
+
+    def __mul__(self, other):
+        """Element-wise multiplication"""
+        return self.get() * self._unwrap(other)
+
+    def __rmul__(self, other):
+        """Element-wise multiplication with self on the right"""
+        return other * self.get()
+
+    def __truediv__(self, other):
+        """Element-wise division"""
+        return self.get() / self._unwrap(other)
+
+    def __rtruediv__(self, other):
+        """Element-wise division with self on the right"""
+        return other / self.get()
+
+    def __pow__(self, other):
+        """Element-wise exponentiation"""
+        return self.get() ** self._unwrap(other)
+
+    def __iadd__(self, other):
+        """In-place element-wise addition written to the parent"""
+        self.set(self + other)
+        return self
+
+    def __isub__(self, other):
+        """In-place element-wise subtraction written to the parent"""
+        self.set(self - other)
+        return self
+
+    def __imul__(self, other):
+        """In-place element-wise multiplication written to the parent"""
+        self.set(self * other)
+        return self
+
+    def __itruediv__(self, other):
+        """In-place element-wise division written to the parent"""
+        self.set(self / other)
+        return self
+
+    def __ipow__(self, other):
+        """In-place element-wise exponentiation written to the parent"""
+        self.set(self ** other)
+        return self
+
+    def __rmatmul__(self, other):
+        """Product of a matrix on the subgraph and the viewed values"""
+        return other @ self.get()
+
+    def __eq__(self, other):
+        """Whether all the viewed values are equal to those of other"""
+        return self.get() == self._unwrap(other)
+
+
+class NodeArrayView(GraphArrayView):
+    """View of a NodeArray restricted to the nodes of a subgraph."""
+
+    _array_class = NodeArray
+
+    @property
+    def parent_indices(self):
+        """Array indices in the parent of the nodes of the subgraph"""
+        return self._subgraph.node_indices
+
+    @property
+    def _subgraph_index(self):
+        """Correspondence between nodes and array indices of the subgraph"""
+        return self._subgraph.node_to_index
+
+    def _subgraph_keys_to_indices(self, keys):
+        """Translate a batch of nodes into array indices of the subgraph"""
+        return self._subgraph.nodes_to_indices(keys)
+
+
+class EdgeArrayView(GraphArrayView):
+    """View of an EdgeArray restricted to the edges of a subgraph."""
+
+    _array_class = EdgeArray
+
+    @property
+    def parent_indices(self):
+        """Array indices in the parent of the edges of the subgraph"""
+        return self._subgraph.edge_indices
+
+    @property
+    def _subgraph_index(self):
+        """Correspondence between edges and array indices of the subgraph"""
+        return self._subgraph.edge_to_index
+
+    def _subgraph_keys_to_indices(self, keys):
+        """Translate a batch of edges into array indices of the subgraph"""
+        return self._subgraph.edges_to_indices(keys)
@@ -0,0 +1,11 @@
+import pytest
+
+from grapharray.classes import BaseGraph
+
+
+@pytest.fixture
+def graph():
+    g = [(0, 2), (0, 4), (2, 4), (2, 6), (4, 6)]
+    bg = BaseGraph(g)
+    bg.freeze()
+    return bg
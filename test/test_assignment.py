@@ -0,0 +1,80 @@
+import pytest
+
+import numpy as np
+from grapharray.classes import BaseGraph, NodeArray, EdgeArray, BatchNodeArray
+from grapharray.assignment import BPR, user_equilibrium
+from grapharray.shortest_path import ShortestPathEngine
+
+
+@pytest.fixture
+def graph():
+    g = [(0, 1), (0, 2), (1, 3), (2, 3)]
+    bg = BaseGraph(g)
+    bg.freeze()
+    return bg
+
+
+@pytest.fixture
+def link_cost(graph):
+    # The costs of the routes via 1 and 2 are 1 + x and 2 + x.
+    return BPR(
+        EdgeArray(graph, init_val=np.array([1.0, 2, 0, 0])),
+        EdgeArray(graph, init_val=np.array([1.0, 2, 1, 1])),
+        alpha=1.0,
+        beta=1.0,
+    )
+
+
+def test_bpr(graph):
+    t0 = EdgeArray(graph, init_val=np.array([1.0, 2, 3, 4]))
+    capacity = EdgeArray(graph, init_val=10.0)
+    link_cost = BPR(t0, capacity)
+    flow = EdgeArray(graph, init_val=np.array([0.0, 10, 20, 5]))
+    expected = t0.array * (1 + 0.15 * (flow.array / 10) ** 4)
+    out = EdgeArray(graph)
+    assert link_cost(flow, out=out) is out
+    assert np.allclose(out.array, expected)
+    h = 1e-6
+    numerical = (link_cost(flow + h).array - expected) / h
+    assert np.allclose(link_cost.derivative(flow).array, numerical, atol=1e-4)
+    other = BaseGraph([(0, 1)])
+    other.freeze()
+    with pytest.raises(ValueError):
+        BPR(t0, EdgeArray(other))
+
+
+@pytest.mark.parametrize("method", ["frank-wolfe", "conjugate"])
+def test_user_equilibrium(graph, link_cost, method):
+    demand = NodeArray(graph, init_val=np.array([0, 0, 0, 5.0]))
+    result = user_equilibrium(
+        link_cost, 0, demand, method=method, tolerance=1e-8
+    )
+    assert result.converged
+    assert result.gaps[-1] <= 1e-8
+    assert np.allclose(result.flow.array, [3, 2, 3, 2])
+    assert np.allclose(result.cost.array, [4, 4, 0, 0])
+
+
+def test_user_equilibrium_with_many_origins(graph, link_cost):
+    demand = BatchNodeArray(
+        graph, init_val=np.array([[0, 0], [0, 0], [0, 0], [3.0, 2]])
+    )
+    engine = ShortestPathEngine(graph)
+    result = user_equilibrium(
+        link_cost, [0, 0], demand, tolerance=1e-8, engine=engine
+    )
+    assert np.allclose(result.flow.array, [3, 2, 3, 2])
+    result = user_equilibrium(link_cost, [0, 0], demand, max_iterations=1)
+    assert not result.converged and len(result.gaps) == 1
+
+
+def test_user_equilibrium_errors(graph, link_cost):
+    demand = NodeArray(graph, init_val=np.array([0, 0, 0, 5.0]))
+    with pytest.raises(ValueError):
+        user_equilibrium(link_cost, 0, demand, method="msa")
+    other = BaseGraph([(0, 1)])
+    other.freeze()
+    with pytest.raises(ValueError):
+        user_equilibrium(
+            link_cost, 0, demand, engine=ShortestPathEngine(other)
+        )
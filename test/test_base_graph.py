@@ -1,7 +1,8 @@
 import pytest
 
 import networkx as nx
-from grapharray.classes import BaseGraph
+import numpy as np
+from grapharray.classes import BaseGraph, EdgeArray
 
 
 @pytest.fixture
@@ -18,3 +19,53 @@ def test_are_nodes_edges_to_index_created_when_freeze():
     g.freeze()
     assert g.edge_to_index == {(1, 2): 0, (2, 3): 1}
     assert g.node_to_index == {1: 0, 2: 1, 3: 2}
+
+
+def test_can_translate_batch_of_keys_into_indices():
+    g = BaseGraph([(1, 2), (2, 3), (3, 1)])
+    g.freeze()
+    assert np.all(g.nodes_to_indices([3, 1]) == [2, 0])
+    assert np.all(g.edges_to_indices([(3, 1), (1, 2)]) == [2, 0])
+    assert np.all(g.edges_to_indices(np.array([[2, 3], [3, 1]])) == [1, 2])
+    with pytest.raises(KeyError):
+        g.edges_to_indices([(2, 1)])
+
+
+def test_are_edge_end_indices_created_when_freeze():
+    g = BaseGraph([(1, 2), (2, 3), (3, 1), (1, 3)])
+    g.freeze()
+    assert np.all(g.edge_tails == [0, 0, 1, 2])
+    assert np.all(g.edge_heads == [1, 2, 2, 0])
+    indptr, order = g.grouped_edges("head")
+    assert np.all(indptr == [0, 1, 2, 4])
+    assert np.all(order == [3, 0, 1, 2])
+
+
+@pytest.mark.parametrize("reorder", ["tail", "bfs", "rcm"])
+def test_can_reorder_indices_when_freeze(reorder):
+    # A path 0 - 1 - ... - 9 whose nodes are inserted in a shuffled order
+    nodes = [3, 7, 0, 9, 5, 1, 8, 2, 6, 4]
+    path = [(i, i + 1) for i in range(9)] + [(i + 1, i) for i in range(9)]
+    g = BaseGraph()
+    g.add_nodes_from(nodes)
+    g.add_edges_from(path)
+    g.freeze(reorder=reorder)
+    assert sorted(g.node_to_index.values()) == list(range(10))
+    assert list(g.edge_to_index.values()) == list(range(18))
+    assert all(
+        (g.node_to_index[u], g.node_to_index[v]) == (t, h)
+        for (u, v), t, h in zip(g.edge_to_index, g.edge_tails, g.edge_heads)
+    )
+    tails, heads = g.edge_tails.astype(int), g.edge_heads.astype(int)
+    assert np.all(np.diff(tails) >= 0)
+    if reorder != "tail":
+        assert np.all(np.abs(tails - heads) <= 2)
+    x = EdgeArray(g, init_val={(u, v): u * 10 + v for u, v in path})
+    assert all(x[u, v] == u * 10 + v for u, v in path)
+    assert x.as_dict() == {(u, v): u * 10 + v for u, v in path}
+
+
+def test_is_invalid_reorder_denied():
+    g = BaseGraph([(1, 2)])
+    with pytest.raises(ValueError):
+        g.freeze(reorder="metis")
@@ -0,0 +1,116 @@
+import pytest
+
+import numpy as np
+from grapharray.classes import (
+    NodeArray,
+    EdgeArray,
+    BatchNodeArray,
+    BatchEdgeArray,
+    AdjacencyMatrix,
+    IncidenceMatrix,
+)
+
+
+@pytest.fixture(
+    params=[(NodeArray, BatchNodeArray), (EdgeArray, BatchEdgeArray)]
+)
+def array_classes(request):
+    return request.param
+
+
+@pytest.fixture
+def columns(graph, array_classes):
+    ColumnArray, _ = array_classes
+    n = len(ColumnArray(graph))
+    return [
+        ColumnArray(graph, init_val=np.arange(n) * (j + 1.0)) for j in range(3)
+    ]
+
+
+@pytest.fixture
+def batch(columns, array_classes):
+    return array_classes[1].from_columns(columns)
+
+
+def test_is_shape_correct(graph, array_classes, batch):
+    ColumnArray, BatchArray = array_classes
+    n = len(ColumnArray(graph))
+    assert batch.array.shape == (n, 3)
+    assert batch.n_columns == 3
+    assert BatchArray(graph, init_val=2, n_columns=4).array.shape == (n, 4)
+    with pytest.raises(ValueError):
+        BatchArray(graph, init_val=np.zeros(n))
+
+
+def test_can_init_val_set_with_dict(graph, batch, array_classes):
+    tested = array_classes[1](graph, init_val=batch.as_dict())
+    assert tested == batch
+
+
+def test_can_get_and_set_rows(batch):
+    key = next(iter(batch.index))
+    batch[key] = [7, 8, 9]
+    assert np.all(batch[key] == [7, 8, 9])
+    assert np.all(batch.T[key] == [7, 8, 9])
+
+
+def test_can_access_columns(batch, columns):
+    for j, column in enumerate(columns):
+        assert batch.column(j) == column
+    key = next(iter(batch.index))
+    batch.column(1)[key] = -1
+    assert batch[key][1] == -1
+
+
+def test_column_views_are_not_shared_by_copies(batch):
+    key = next(iter(batch.index))
+    column = batch.column(0)
+    snapshot = batch.get_copy()
+    column_snapshot = column.get_copy()
+    column[key] = 99
+    assert batch[key][0] == 99
+    assert snapshot[key][0] != 99
+    assert column_snapshot[key] != 99
+    snapshot = batch.get_copy()
+    batch[key] = [1, 2, 3]
+    assert column[key] == 1 and snapshot[key][0] == 99
+
+
+def test_is_operation_correct(batch, columns):
+    assert (batch * 2 + batch).column(2) == columns[2] * 3
+    assert (batch - columns[0]).column(1) == columns[1] - columns[0]
+    with pytest.raises(TypeError):
+        columns[0] + batch
+
+
+def test_is_adj_matmul_correct(graph):
+    weight = EdgeArray(graph, init_val=np.arange(5.0))
+    adj = AdjacencyMatrix(weight)
+    columns = [NodeArray(graph, init_val=np.arange(4.0) + j) for j in range(3)]
+    res = adj @ BatchNodeArray.from_columns(columns)
+    assert isinstance(res, BatchNodeArray)
+    for j, column in enumerate(columns):
+        assert res.column(j) == adj @ column
+
+
+@pytest.mark.parametrize("matrix_free", [False, True])
+def test_is_inc_matmul_correct(graph, matrix_free):
+    inc = IncidenceMatrix(graph, matrix_free=matrix_free)
+    flows = [EdgeArray(graph, init_val=np.arange(5.0) * j) for j in range(3)]
+    res = inc @ BatchEdgeArray.from_columns(flows)
+    assert isinstance(res, BatchNodeArray)
+    for j, flow in enumerate(flows):
+        assert res.column(j) == inc @ flow
+    out = BatchEdgeArray(graph, n_columns=3)
+    inc.T.matmul(res, out=out)
+    for j in range(3):
+        assert out.column(j) == inc @ res.column(j)
+
+
+def test_ufunc_broadcasts_columns(batch, columns):
+    tested = np.subtract(batch, columns[0])
+    assert isinstance(tested, type(batch))
+    assert tested.column(2) == columns[2] - columns[0]
+    tested = np.sum(batch, axis=1)
+    assert isinstance(tested, type(columns[0]))
+    assert tested == columns[0] * 6
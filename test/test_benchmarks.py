@@ -0,0 +1,52 @@
+import pytest
+
+import numpy as np
+from benchmarks import runner
+from benchmarks.cases import Case, Workload, synthetic_edges
+
+
+def test_synthetic_edges():
+    n_nodes, tails, heads = synthetic_edges(1000)
+    assert n_nodes == 250
+    assert len(tails) == len(heads) == 1000
+    assert not np.any(tails == heads)
+    assert len(np.unique(tails * n_nodes + heads)) == 1000
+
+
+def test_benchmarks_run_and_compare(tmp_path):
+    results = runner.run([100], repeat=1)
+    assert len(results) == len(runner.CASES)
+    assert all(r["time"] > 0 and r["peak_memory"] >= 0 for r in results)
+    path = str(tmp_path / "baseline.json")
+    runner.save(path, results)
+    baseline = runner.load(path)
+    slower = [dict(r, time=r["time"] * 2) for r in results]
+    rows = runner.compare(slower, baseline, tolerance=0.5)
+    assert len(rows) == len(results)
+    assert all(row["regression"] for row in rows)
+    rows = runner.compare(results, baseline)
+    assert not any(row["regression"] for row in rows)
+    argv = ["--sizes", "100", "--select", "ops.add", "--repeat", "1"]
+    assert runner.main(argv + ["--compare", path, "--tolerance", "1e9"]) == 0
+
+
+
+@pytest.mark.parametrize("fresh", [False, True])
+def test_measure_closes_callables(fresh):
+    opened = []
+
+    def setup(workload):
+        def run():
+            assert not run.closed
+
+        def close():
+            run.closed = True
+
+        run.closed = False
+        run.close = close
+        opened.append(run)
+        return run
+
+    case = Case("test.close", setup, fresh, np.inf)
+    runner.measure(case, Workload(100), repeat=2)
+    assert opened and all(run.closed for run in opened)
@@ -0,0 +1,120 @@
+import pytest
+
+import numpy as np
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    NodeArray,
+    EdgeArray,
+    AdjacencyMatrix,
+    IncidenceMatrix,
+)
+from grapharray.functions import reduce_edges
+
+
+@pytest.fixture
+def base_graph():
+    bg = BaseGraph([("b", "a"), ("a", "c"), ("b", "c"), ("c", "d")])
+    bg.freeze()
+    return bg
+
+
+@pytest.fixture
+def graph(base_graph):
+    return CompactGraph.from_base_graph(base_graph)
+
+
+def test_is_order_kept_from_base_graph(base_graph, graph):
+    assert dict(graph.node_to_index) == dict(base_graph.node_to_index)
+    assert dict(graph.edge_to_index) == dict(base_graph.edge_to_index)
+    assert np.all(graph.edge_tails == base_graph.edge_tails)
+    assert np.all(graph.edge_heads == base_graph.edge_heads)
+
+
+def test_can_resolve_keys(graph):
+    assert graph.node_to_index["c"] == 2
+    assert graph.edge_to_index["a", "c"] == 2
+    assert ("c", "a") not in graph.edge_to_index
+    assert "e" not in graph.node_to_index
+    assert np.all(graph.edges_to_indices([("c", "d"), ("b", "a")]) == [3, 0])
+    with pytest.raises(KeyError):
+        graph.edges_to_indices([("c", "d"), ("d", "c")])
+
+
+def test_can_use_integer_and_object_labels():
+    graph = CompactGraph([0, 2, 3, 3], [2, 1, 2])
+    assert list(graph.edge_to_index) == [(0, 2), (0, 1), (1, 2)]
+    assert graph.node_to_index[2] == 2
+    with pytest.raises(KeyError):
+        graph.node_to_index[3]
+    labels = [(0, 0), (0, 1), (1, 1)]
+    graph = CompactGraph([0, 2, 3, 3], [2, 1, 2], node_labels=labels)
+    assert graph.edge_to_index[(0, 0), (0, 1)] == 1
+    assert list(graph.node_to_index) == labels
+
+
+def test_is_invalid_structure_denied():
+    with pytest.raises(ValueError):
+        CompactGraph([0, 2, 1], [1, 0])
+    with pytest.raises(ValueError):
+        CompactGraph([0, 2, 2], [1, 1])
+    with pytest.raises(ValueError):
+        CompactGraph([0, 1, 1], [1], node_labels=["a"])
+    with pytest.raises(ValueError):
+        CompactGraph([0, 1, 1], [1], node_labels=["a", "a"])
+    with pytest.raises(ValueError):
+        CompactGraph([0, 1, 1], [1], node_labels=[(0, 1), (0, 1)])
+
+
+def test_are_node_labels_copied():
+    labels = np.array([10, 20, 30])
+    graph = CompactGraph([0, 2, 3, 3], [2, 1, 2], node_labels=labels)
+    assert labels.flags.writeable
+    labels[0] = 40
+    assert graph.node_to_index[10] == 0
+    assert graph.node_labels[0] == 10
+
+
+def test_arrays_and_matrices_work_as_on_base_graph(base_graph, graph):
+    weight = {("b", "a"): 1, ("a", "c"): 2, ("b", "c"): 3, ("c", "d"): 4}
+    node_val = {"a": 1, "b": 2, "c": 3, "d": 4}
+    results = []
+    for g in (base_graph, graph):
+        edge_array = EdgeArray(g, init_val=weight)
+        node_array = NodeArray(g, init_val=node_val)
+        assert edge_array.as_dict() == weight
+        assert node_array.as_nx_graph().nodes["c"]["value"] == 3
+        results.append(
+            [
+                (AdjacencyMatrix(edge_array) @ node_array).array,
+                (IncidenceMatrix(g) @ edge_array).array,
+                (IncidenceMatrix(g, matrix_free=True).T @ node_array).array,
+                reduce_edges(edge_array, "in", "max").array,
+            ]
+        )
+    for tested, correct in zip(*results):
+        assert np.allclose(tested, correct, equal_nan=True)
+
+
+def test_can_create_from_edge_arrays():
+    tails = np.array([30, 10, 10, 20])
+    heads = np.array([10, 30, 20, 30])
+    graph = CompactGraph.from_edge_arrays(tails, heads)
+    assert list(graph.node_to_index) == [10, 20, 30]
+    assert list(graph.edge_to_index) == list(zip(tails, heads))
+    indices = graph.edges_to_indices(np.stack([tails, heads], axis=1))
+    assert np.all(indices == [0, 1, 2, 3])
+    graph = CompactGraph.from_edge_arrays(
+        tails, heads, node_labels=[40, 30, 20, 10]
+    )
+    assert graph.node_to_index[40] == 0
+    assert list(graph.edge_to_index) == list(zip(tails, heads))
+
+
+def test_are_duplicated_edges_checked():
+    tails = np.array(["a", "b", "a", "b"])
+    heads = np.array(["b", "a", "b", "c"])
+    with pytest.raises(ValueError):
+        CompactGraph.from_edge_arrays(tails, heads)
+    graph = CompactGraph.from_edge_arrays(tails, heads, duplicates="drop")
+    assert list(graph.edge_to_index) == [("a", "b"), ("b", "a"), ("b", "c")]
@@ -0,0 +1,98 @@
+import io
+
+import pytest
+
+import numpy as np
+from grapharray.classes import (
+    CompactGraph,
+    NodeArray,
+    EdgeArray,
+    BatchEdgeArray,
+    SparseEdgeArray,
+)
+
+
+@pytest.fixture(params=[False, True])
+def graph(graph, request):
+    if request.param:
+        return CompactGraph.from_base_graph(graph)
+    return graph
+
+
+@pytest.fixture
+def weight(graph):
+    return EdgeArray(graph, init_val=np.arange(5.0))
+
+
+def test_to_arrays(graph, weight):
+    tails, heads, values = weight.to_arrays()
+    np.testing.assert_array_equal(tails, [0, 0, 2, 2, 4])
+    np.testing.assert_array_equal(heads, [2, 4, 4, 6, 6])
+    np.testing.assert_array_equal(values, np.arange(5.0))
+    assert weight.to_arrays()[0] is tails
+    values[0] = 10
+    assert weight[0, 2] == 0
+    nodes, values = NodeArray(graph, init_val=1).to_arrays()
+    np.testing.assert_array_equal(nodes, [0, 2, 4, 6])
+    np.testing.assert_array_equal(values, [1, 1, 1, 1])
+    batch = BatchEdgeArray.from_columns([weight, weight * 2])
+    *_, values = batch.to_arrays()
+    np.testing.assert_array_equal(values, batch.array)
+    assert not np.may_share_memory(values, batch.array)
+
+
+def test_to_records(graph, weight):
+    records = weight.to_records()
+    assert records.dtype.names == ("tail", "head", "value")
+    assert records[3].tolist() == (2, 6, 3.0)
+    batch = BatchEdgeArray.from_columns([weight, weight * 2])
+    assert batch.to_records()["value"].shape == (5, 2)
+
+
+def test_to_pandas(graph, weight):
+    pd = pytest.importorskip("pandas")
+    series = weight.to_pandas(name="weight")
+    assert series.name == "weight"
+    assert series[(2, 6)] == 3.0
+    assert weight.to_pandas().index is series.index
+    node_series = NodeArray(graph, init_val=np.arange(4.0)).to_pandas()
+    assert node_series[6] == 3.0
+    batch = BatchEdgeArray.from_columns([weight, weight * 2])
+    frame = batch.to_pandas()
+    assert isinstance(frame, pd.DataFrame)
+    assert frame.loc[(2, 6), 1] == 6.0
+
+
+def test_as_dict(graph, weight):
+    assert weight.as_dict() == {
+        (0, 2): 0.0,
+        (0, 4): 1.0,
+        (2, 4): 2.0,
+        (2, 6): 3.0,
+        (4, 6): 4.0,
+    }
+
+
+def test_repr_is_truncated(graph, weight):
+    assert repr(weight).splitlines()[1:3] == ["(0, 2)\t0.0", "(0, 4)\t1.0"]
+    with np.printoptions(threshold=3, edgeitems=1):
+        assert repr(weight) == "index\tvalue\n(0, 2)\t0.0\n...\n(4, 6)\t4.0\n"
+        flow = SparseEdgeArray(graph, weight)
+        assert repr(flow).splitlines() == [
+            "index\tvalue",
+            "(0, 4)\t1.0",
+            "...",
+            "(4, 6)\t4.0",
+        ]
+        file = io.StringIO()
+        weight.dump(file)
+        assert file.getvalue().count("\n") == 6
+
+
+def test_dump(graph, weight, monkeypatch):
+    from grapharray import classes
+
+    monkeypatch.setattr(classes, "_DUMP_CHUNK_SIZE", 2)
+    file = io.StringIO()
+    weight.dump(file)
+    assert file.getvalue() == repr(weight)
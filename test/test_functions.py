@@ -0,0 +1,81 @@
+import pytest
+
+import numpy as np
+from grapharray.classes import (
+    NodeArray,
+    EdgeArray,
+    BatchNodeArray,
+    BatchEdgeArray,
+)
+from grapharray.functions import gather, reduce_edges
+
+
+@pytest.fixture
+def edge_val(graph):
+    return EdgeArray(
+        graph, {(0, 2): 6, (0, 4): 4, (2, 4): 3, (2, 6): 1, (4, 6): 2}
+    )
+
+
+def test_gather(graph):
+    label = NodeArray(graph, {0: 0, 2: 2, 4: 3, 6: 5})
+    tested = gather(label, "tail")
+    assert tested.as_dict() == {
+        (0, 2): 0, (0, 4): 0, (2, 4): 2, (2, 6): 2, (4, 6): 3
+    }
+    out = EdgeArray(graph)
+    assert gather(label, "head", out=out) is out
+    assert out.as_dict() == {
+        (0, 2): 2, (0, 4): 3, (2, 4): 3, (2, 6): 5, (4, 6): 5
+    }
+    int_label = NodeArray(graph, label, dtype=np.int32)
+    assert gather(int_label, "tail", out=out) is out
+    assert out == tested
+    with pytest.raises(ValueError):
+        gather(label, "middle")
+    with pytest.raises(TypeError):
+        gather(out)
+
+
+@pytest.mark.parametrize(
+    "direction, how, correct",
+    [
+        ("in", "sum", [0, 6, 7, 3]),
+        ("in", "mean", [np.nan, 6, 3.5, 1.5]),
+        ("in", "min", [np.nan, 6, 3, 1]),
+        ("out", "max", [6, 3, 2, np.nan]),
+        ("out", "sum", [10, 4, 2, 0]),
+    ],
+)
+def test_reduce_edges(edge_val, direction, how, correct):
+    tested = reduce_edges(edge_val, direction, how)
+    assert isinstance(tested, NodeArray)
+    assert np.allclose(tested.array, correct, equal_nan=True)
+
+
+def test_gather_and_reduce_batch(graph, edge_val):
+    batch = BatchEdgeArray.from_columns([edge_val, edge_val * 2])
+    tested = reduce_edges(batch, "in", "max", fill_value=-1)
+    assert isinstance(tested, BatchNodeArray)
+    assert tested.column(1) == reduce_edges(edge_val * 2, "in", "max", -1)
+    assert gather(tested).column(0) == gather(tested.column(0))
+
+
+@pytest.mark.parametrize(
+    "dtype, how, correct",
+    [
+        (np.float32, "sum", np.float32),
+        (np.int32, "sum", np.zeros(1, np.int32).sum().dtype),
+        (bool, "sum", np.zeros(1, bool).sum().dtype),
+        (np.int32, "mean", np.float64),
+        (np.int32, "max", np.int32),
+    ],
+)
+def test_reduce_edges_dtype(graph, dtype, how, correct):
+    var = EdgeArray(graph, init_val=np.arange(5) % 3, dtype=dtype)
+    reduced = reduce_edges(var, how=how, fill_value=0)
+    assert reduced.dtype == correct
+    np.testing.assert_array_equal(
+        reduced.array,
+        reduce_edges(var.astype(float), how=how, fill_value=0).array,
+    )
@@ -7,18 +7,12 @@ from grapharray.classes import (
     BaseGraphArray,
     NodeArray,
     EdgeArray,
+    BatchEdgeArray,
     AdjacencyMatrix,
     IncidenceMatrix,
+    SparseEdgeArray,
 )
-from grapharray.functions import exp
-
-
-@pytest.fixture
-def graph():
-    g = [(0, 2), (0, 4), (2, 4), (2, 6), (4, 6)]
-    bg = BaseGraph(g)
-    bg.freeze()
-    return bg
+from grapharray.functions import exp, log
 
 
 @pytest.fixture(params=[NodeArray, EdgeArray])
@@ -78,6 +72,21 @@ def test_can_get_item(graph, NodeEdgeArray, dict_init_val):
         assert tested[k] == dict_init_val[k]
 
 
+def test_can_get_and_set_items_in_bulk(graph, NodeEdgeArray, dict_init_val):
+    keys = list(dict_init_val)[::-1]
+    values = [dict_init_val[k] for k in keys]
+    for is_array_2d in (False, True):
+        tested = NodeEdgeArray(graph, is_array_2d=is_array_2d)
+        tested[keys] = values
+        assert np.all(tested[keys] == values)
+        correct = NodeEdgeArray(graph, dict_init_val)
+        assert tested.as_dict() == correct.as_dict()
+        indices = NodeEdgeArray(graph)._keys_to_indices(keys)
+        assert np.all(tested.take(indices) == values)
+        tested.put(indices, 0)
+        assert np.all(tested.array == 0)
+
+
 def test_can_init_val_set_with_scalar(graph, NodeEdgeArray):
     init_val = 3.1415
     tested = NodeEdgeArray(graph, init_val=init_val)
@@ -101,6 +110,69 @@ def test_can_init_val_set_with_self(graph, NodeEdgeArray):
     assert tested == original
 
 
+def test_array_is_read_only_view(graph, NodeEdgeArray):
+    tested = NodeEdgeArray(graph, init_val=1.0)
+    view = tested.array
+    assert np.shares_memory(view, tested._array)
+    with pytest.raises(ValueError):
+        view[0] = 2
+    tested += 1
+    assert np.all(view == 2)
+
+
+def test_copies_share_array_until_written(graph, NodeEdgeArray):
+    original = NodeEdgeArray(graph, init_val=1.0)
+    copies = [original.get_copy(), NodeEdgeArray(graph, init_val=original)]
+    for copy in copies:
+        assert copy._array is original._array
+    assert not np.asarray(copies[0]).flags.writeable
+    copies[0] *= 2
+    copies[1][next(iter(original.index))] = 5
+    # The last sharer writes without copying.
+    buffer = original._array
+    np.add(original, 1, out=original)
+    assert original._array is buffer
+    assert np.all(copies[0].array == 2)
+    assert np.all(copies[1].array[1:] == 1) and copies[1].array[0] == 5
+    assert np.all(original.array == 2)
+
+
+def test_in_place_numpy_functions_copy_shared_array(graph, NodeEdgeArray):
+    original = NodeEdgeArray(graph, init_val=1.0)
+    snapshot = original.get_copy()
+    np.add.at(original, [0], 10)
+    assert original.array[0] == 11 and np.all(snapshot.array == 1)
+    snapshot = original.get_copy()
+    np.copyto(original, 3.0)
+    assert np.all(original.array == 3) and snapshot.array[0] == 11
+    snapshot = original.get_copy()
+    np.put(original, [1], 7.0)
+    assert original.array[1] == 7 and snapshot.array[1] == 3
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.int32, bool])
+def test_can_set_dtype(graph, NodeEdgeArray, dtype, dict_init_val):
+    for init_val in (1, dict_init_val, np.arange(len(dict_init_val))):
+        tested = NodeEdgeArray(graph, init_val=init_val, dtype=dtype)
+        assert tested.dtype == dtype
+        assert tested.get_copy().dtype == dtype
+        assert NodeEdgeArray(graph, init_val=tested).dtype == dtype
+    assert NodeEdgeArray(graph).dtype == np.float64
+    assert NodeEdgeArray(graph, is_array_2d=True, dtype=dtype).dtype == dtype
+    assert NodeEdgeArray(graph, dtype=np.float32).astype(dtype).dtype == dtype
+
+
+def test_is_dtype_kept_in_operations(graph, NodeEdgeArray):
+    float32 = NodeEdgeArray(graph, init_val=2, dtype=np.float32)
+    int32 = NodeEdgeArray(graph, init_val=2, dtype=np.int32)
+    assert (float32 * 1.5 + float32).dtype == np.float32
+    assert (int32 + int32).dtype == np.int32
+    assert (int32 / int32).dtype == np.float64
+    assert np.exp(float32).dtype == np.float32
+    with pytest.raises(TypeError):
+        int32.divide(int32, out=int32)
+
+
 def test_can_array_set_vertical(graph, NodeEdgeArray):
     tested = NodeEdgeArray(graph, is_array_2d=True)
     assert tested.array.shape == (len(tested.index), 1)
@@ -173,6 +245,16 @@ def test_is_multiply_correct(operated_vals, graph, NodeEdgeArray):
     assert tested == correct
 
 
+@pytest.mark.parametrize("scalar", [np.float32(2), np.int64(2), np.True_])
+def test_can_operate_with_numpy_scalars(graph, NodeEdgeArray, scalar):
+    a = NodeEdgeArray(graph, init_val=1.5, dtype=np.float32)
+    tested = a * scalar
+    assert tested.dtype == (a.array * scalar).dtype
+    np.testing.assert_array_equal(tested.array, a.array * scalar)
+    a += scalar
+    np.testing.assert_array_equal(a.array, 1.5 + scalar)
+
+
 def test_is_true_divide_correct(operated_vals, graph, NodeEdgeArray):
     a, b = operated_vals
     tested = a / b
@@ -183,6 +265,40 @@ def test_is_true_divide_correct(operated_vals, graph, NodeEdgeArray):
     assert tested == correct
 
 
+def test_is_in_place_operation_correct(operated_vals, graph, NodeEdgeArray):
+    a, b = operated_vals
+    correct = NodeEdgeArray(
+        graph, init_val=((a.array + b.array - 3) * b.array / 2) ** 2
+    )
+    tested = a.get_copy()
+    tested += b  # Copies the array shared with a.
+    buffer = tested._array
+    tested -= 3
+    tested *= b
+    tested /= 2
+    tested **= 2
+    assert tested == correct
+    assert tested._array is buffer
+
+
+def test_is_out_operation_correct(operated_vals, graph, NodeEdgeArray):
+    a, b = operated_vals
+    out = NodeEdgeArray(graph)
+    buffer = out._array
+    assert a.add(b, out=out) is out
+    assert out == a + b
+    a.power(2, out=out)
+    assert out == a ** 2
+    assert out._array is buffer
+
+
+def test_is_out_of_different_class_denied(operated_vals, graph):
+    a, b = operated_vals
+    other = NodeArray if isinstance(a, EdgeArray) else EdgeArray
+    with pytest.raises(TypeError):
+        a.add(b, out=other(graph))
+
+
 def test_is_matmul_correct(graph, NodeEdgeArray):
     gvar_1 = NodeEdgeArray(graph, init_val=5)
     gvar_2 = NodeEdgeArray(graph, init_val=10)
@@ -206,6 +322,28 @@ def test_is_matrix_correct(adj_matrix) -> None:
     assert np.all(adj_matrix.array == true_matrix)
 
 
+@pytest.mark.parametrize("sparse_format", ["csr", "csc", "coo", "lil"])
+def test_can_update_adj_matrix_in_place(graph, sparse_format):
+    weight = EdgeArray(graph, init_val=1)
+    tested = AdjacencyMatrix(weight, sparse_format=sparse_format)
+    assert tested.array.format == sparse_format
+    weight[2, 4] = 7
+    assert tested.update(weight) is tested
+    assert np.all(
+        tested.array.toarray() == AdjacencyMatrix(weight).array.toarray()
+    )
+    assert tested.array.toarray()[1, 2] == 7
+
+
+def test_is_batch_weight_of_adj_matrix_denied(graph):
+    weight = BatchEdgeArray(graph, init_val=np.ones((5, 2)))
+    with pytest.raises(TypeError):
+        AdjacencyMatrix(weight)
+    tested = AdjacencyMatrix(EdgeArray(graph, init_val=1))
+    with pytest.raises(TypeError):
+        tested.update(weight)
+
+
 def test_is_adj_matmul_correct(adj_matrix, graph):
     nv = NodeArray(graph, init_val={0: 1, 2: 2, 4: 3, 6: 4})
     result = adj_matrix @ nv
@@ -213,9 +351,29 @@ def test_is_adj_matmul_correct(adj_matrix, graph):
     assert result == answer
 
 
-@pytest.fixture
-def inc_matrix(graph):
-    return IncidenceMatrix(graph)
+def test_is_adj_matmul_out_correct(adj_matrix, graph):
+    nv = NodeArray(graph, init_val={0: 1, 2: 2, 4: 3, 6: 4})
+    out = NodeArray(graph)
+    assert adj_matrix.matmul(nv, out=out) is out
+    assert out == adj_matrix @ nv
+
+
+@pytest.fixture(params=[False, True])
+def inc_matrix(graph, request):
+    return IncidenceMatrix(graph, matrix_free=request.param)
+
+
+def test_is_inc_matrix_correct(inc_matrix):
+    true_matrix = np.array(
+        [
+            [-1, -1, 0, 0, 0],
+            [1, 0, -1, -1, 0],
+            [0, 1, 1, 0, -1],
+            [0, 0, 0, 1, 1],
+        ]
+    )
+    assert np.all(inc_matrix.array.toarray() == true_matrix)
+    assert np.all(inc_matrix.T.array.toarray() == true_matrix.T)
 
 
 def test_is_inc_matmul_correct(graph, inc_matrix):
@@ -234,6 +392,35 @@ def test_is_transposed_matmul_correct(graph, inc_matrix):
     difference = EdgeArray(graph, init_val=diff)
     res = inc_matrix.T @ node_label
     assert res == difference
+    out = EdgeArray(graph, is_array_2d=True)
+    inc_matrix.matmul(NodeArray(graph, label, is_array_2d=True), out=out)
+    assert np.all(out.array.ravel() == difference.array)
+    out = EdgeArray(graph)
+    potential = NodeArray(graph, init_val=label, dtype=np.int32)
+    assert inc_matrix.matmul(potential, out=out) is out
+    assert out == difference
+
+
+def test_is_inc_matmul_out_correct(graph, inc_matrix):
+    edge_flow = EdgeArray(graph, init_val=2)
+    out = NodeArray(graph)
+    assert inc_matrix.matmul(edge_flow, out=out) is out
+    assert out == inc_matrix @ edge_flow
+
+
+def test_is_matmul_written_into_buffer_of_out(graph, adj_matrix, inc_matrix):
+    # out keeps its core array, so views of it see the results.
+    cases = [
+        (adj_matrix, NodeArray(graph, init_val=np.arange(4.0))),
+        (inc_matrix, EdgeArray(graph, init_val=np.arange(5.0))),
+    ]
+    for matrix, other in cases:
+        out = type(matrix @ other)(graph)
+        buffer = out._array
+        view = out.array
+        matrix.matmul(other, out=out)
+        assert out._array is buffer
+        np.testing.assert_array_equal(view, (matrix @ other).array)
 
 
 @pytest.fixture
@@ -246,3 +433,84 @@ def test_exp(node_edge_array, graph, NodeEdgeArray):
         graph, np.exp(node_edge_array.array)
     )
 
+
+def test_exp_log_out(node_edge_array, graph, NodeEdgeArray):
+    out = NodeEdgeArray(graph)
+    assert exp(node_edge_array, out=out) is out
+    assert out == exp(node_edge_array)
+    log(out, out=out)
+    assert np.allclose(out.array, node_edge_array.array)
+
+
+def test_ufunc_returns_graph_array(operated_vals, graph, NodeEdgeArray):
+    a, b = operated_vals
+    tested = np.maximum(a, b)
+    assert isinstance(tested, NodeEdgeArray)
+    assert np.all(tested.array == np.maximum(a.array, b.array))
+    assert np.add.reduce(a) == np.sum(a.array)
+    assert isinstance(np.greater(np.exp(a), b), NodeEdgeArray)
+    out = NodeEdgeArray(graph)
+    assert np.multiply(a, 2, out=out) is out
+    assert out == a * 2
+    with pytest.raises(ValueError):
+        another_graph = BaseGraph(graph)
+        another_graph.freeze()
+        np.add(a, NodeEdgeArray(another_graph))
+
+
+def test_array_function_returns_graph_array(operated_vals, NodeEdgeArray):
+    a, b = operated_vals
+    tested = np.where(np.greater(a, b), a, b)
+    assert isinstance(tested, NodeEdgeArray)
+    assert tested == np.maximum(a, b)
+    tested = np.clip(a, 10, 20)
+    assert isinstance(tested, NodeEdgeArray)
+    assert np.all(tested.array == np.clip(a.array, 10, 20))
+    assert np.max(a) == np.max(a.array)
+    assert np.all(np.asarray(a) == a.array)
+    assert isinstance(np.isclose(a, b), NodeEdgeArray)
+    for func in (np.sort, np.argsort, np.flip, np.cumsum):
+        tested = func(a)
+        assert type(tested) is np.ndarray
+        np.testing.assert_array_equal(tested, func(a.array))
+    assert type(np.roll(a, 1)) is np.ndarray
+
+
+def test_ufunc_between_node_and_edge_arrays_denied(graph):
+    with pytest.raises(TypeError):
+        np.add(NodeArray(graph), EdgeArray(graph))
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.int32, bool])
+def test_is_dtype_kept_in_matmul(graph, inc_matrix, dtype):
+    flow = EdgeArray(graph, init_val=np.arange(5) % 2, dtype=dtype)
+    result_dtype = np.int64 if dtype is bool else dtype
+    inflow = inc_matrix @ flow
+    assert inflow.dtype == result_dtype
+    np.testing.assert_array_equal(
+        inflow.array, IncidenceMatrix(graph).array @ flow.array.astype(int)
+    )
+    potential = NodeArray(graph, init_val=1, dtype=dtype)
+    assert (inc_matrix.T @ potential).dtype == result_dtype
+    weight = EdgeArray(graph, init_val=2, dtype=np.float32)
+    assert AdjacencyMatrix(weight).array.dtype == np.float32
+    assert (AdjacencyMatrix(weight) @ potential).dtype == np.result_type(
+        np.float32, dtype
+    )
+
+
+@pytest.mark.parametrize("matrix_free", [False, True])
+@pytest.mark.parametrize("dtype", [bool, np.int8, np.uint8])
+def test_is_incidence_matmul_of_small_dtypes_not_overflowed(
+    matrix_free, dtype
+):
+    star = BaseGraph([(i, 0) for i in range(1, 201)])
+    star.freeze()
+    matrix = IncidenceMatrix(star, matrix_free=matrix_free)
+    mask = EdgeArray(star, init_val=1, dtype=dtype)
+    inflow = matrix @ mask
+    assert inflow.dtype == np.int64
+    assert inflow[0] == 200
+    assert (matrix @ SparseEdgeArray(star, mask))[0] == 200
+    potential = NodeArray(star, init_val=1, dtype=dtype)
+    assert (matrix.T @ potential).dtype == np.int64
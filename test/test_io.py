@@ -0,0 +1,100 @@
+import pytest
+
+import numpy as np
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    NodeArray,
+    EdgeArray,
+    BatchEdgeArray,
+    AdjacencyMatrix,
+    IncidenceMatrix,
+)
+from grapharray.io import save, load
+
+
+@pytest.fixture
+def saved(graph, tmp_path):
+    weight = EdgeArray(graph, init_val=np.arange(5.0))
+    arrays = {
+        "weight": weight,
+        "label": NodeArray(graph, init_val=np.arange(4.0), is_array_2d=True),
+        "batch": BatchEdgeArray.from_columns([weight, weight * 2]),
+    }
+    matrices = {
+        "adj": AdjacencyMatrix(weight, sparse_format="csc"),
+        "adj_lil": AdjacencyMatrix(weight, sparse_format="lil"),
+        "inc_t": IncidenceMatrix(graph).T,
+        "inc_free": IncidenceMatrix(graph, matrix_free=True),
+    }
+    save(str(tmp_path), graph, arrays, matrices)
+    return arrays, matrices
+
+
+@pytest.mark.parametrize("mmap_mode", [None, "r"])
+def test_can_load_saved_items(graph, saved, tmp_path, mmap_mode):
+    arrays, matrices = saved
+    loaded_graph, loaded_arrays, loaded_matrices = load(
+        str(tmp_path), mmap_mode=mmap_mode
+    )
+    assert isinstance(loaded_graph, CompactGraph)
+    assert dict(loaded_graph.edge_to_index) == dict(graph.edge_to_index)
+    for name, array in arrays.items():
+        loaded = loaded_arrays[name]
+        assert type(loaded) is type(array)
+        assert loaded.base_graph is loaded_graph
+        assert loaded.as_dict().keys() == array.as_dict().keys()
+        assert np.all(loaded.array == array.array)
+    for name, matrix in matrices.items():
+        loaded = loaded_matrices[name]
+        assert type(loaded) is type(matrix)
+        assert loaded.is_transposed == matrix.is_transposed
+        assert np.all(loaded.array.toarray() == matrix.array.toarray())
+    weight = loaded_arrays["weight"]
+    assert np.allclose(
+        (loaded_matrices["adj"] @ NodeArray(loaded_graph, 1)).array,
+        (matrices["adj"] @ NodeArray(graph, 1)).array,
+    )
+    assert (loaded_matrices["inc_t"] @ NodeArray(loaded_graph, 1)) == (
+        EdgeArray(loaded_graph, 0)
+    )
+    if mmap_mode == "r":
+        assert isinstance(weight._array, np.memmap)
+        with pytest.raises(ValueError):
+            weight[0, 2] = 1
+
+
+def test_can_update_loaded_adj_matrix(saved, tmp_path):
+    loaded_graph, loaded_arrays, loaded_matrices = load(str(tmp_path))
+    weight = loaded_arrays["weight"] * 2
+    for name in ("adj", "adj_lil"):
+        loaded_matrices[name].update(weight)
+        correct = AdjacencyMatrix(weight).array.toarray()
+        assert np.all(loaded_matrices[name].array.toarray() == correct)
+
+
+def test_is_array_on_another_graph_denied(graph, tmp_path):
+    another_graph = BaseGraph(graph)
+    another_graph.freeze()
+    with pytest.raises(ValueError):
+        save(str(tmp_path), graph, {"x": NodeArray(another_graph)})
+
+
+def test_can_save_graph_with_object_labels(tmp_path):
+    labels = [("a", 0), ("b", 0), ("c", 1)]
+    graph = CompactGraph([0, 2, 3, 3], [2, 1, 2], node_labels=labels)
+    save(str(tmp_path), graph)
+    loaded_graph, _, _ = load(str(tmp_path), mmap_mode="r")
+    assert list(loaded_graph.edge_to_index) == list(graph.edge_to_index)
+
+
+def test_is_dtype_kept_when_loaded(graph, tmp_path):
+    arrays = {
+        "cost": EdgeArray(graph, init_val=1.5, dtype=np.float32),
+        "count": NodeArray(graph, init_val=3, dtype=np.int32),
+        "mask": EdgeArray(graph, init_val=True, dtype=bool),
+    }
+    save(str(tmp_path), graph, arrays)
+    _, loaded_arrays, _ = load(str(tmp_path))
+    for name, array in arrays.items():
+        assert loaded_arrays[name].dtype == array.dtype
@@ -0,0 +1,119 @@
+import pytest
+
+import numpy as np
+from grapharray.classes import (
+    BaseGraph,
+    NodeArray,
+    EdgeArray,
+    BatchEdgeArray,
+)
+from grapharray import lazy
+from grapharray.lazy import LazyArray
+
+ENGINES = ["chunked"]
+if lazy.numexpr is not None:
+    ENGINES.append("numexpr")
+
+
+@pytest.fixture
+def bpr_inputs(graph):
+    t0 = EdgeArray(graph, init_val=np.arange(1.0, 6.0))
+    x = EdgeArray(graph, init_val=np.arange(5.0) * 3)
+    c = EdgeArray(graph, init_val=4.0)
+    return t0, x, c
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_lazy_expression(bpr_inputs, engine):
+    t0, x, c = bpr_inputs
+    expression = t0 * (1 + 0.15 * (x.lazy() / c) ** 4)
+    assert isinstance(expression, LazyArray)
+    result = expression.evaluate(engine=engine)
+    assert isinstance(result, EdgeArray)
+    assert result.base_graph is t0.base_graph
+    np.testing.assert_allclose(
+        result.array, t0.array * (1 + 0.15 * (x.array / c.array) ** 4)
+    )
+    expression = 2 - x.lazy() + 1 / (c.lazy() - 1)
+    np.testing.assert_allclose(
+        expression.evaluate(engine=engine).array,
+        2 - x.array + 1 / (c.array - 1),
+    )
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_lazy_expression_keeps_dtype(graph, engine, dtype):
+    x = EdgeArray(graph, init_val=np.arange(5.0), dtype=dtype)
+    expression = 1 + 0.15 * (x.lazy() / 4.0) ** 4
+    result = expression.evaluate(engine=engine)
+    assert result.dtype == dtype
+    np.testing.assert_allclose(
+        result.array, 1 + 0.15 * (x.array / 4.0) ** 4, rtol=1e-6
+    )
+    assert (x.lazy() * 2).evaluate(engine=engine).dtype == dtype
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_lazy_expression_with_numpy_scalars(graph, engine, dtype):
+    x = EdgeArray(graph, init_val=np.arange(5.0), dtype=dtype)
+    alpha, beta = np.float32(0.15), np.int64(4)
+    result = (1 + alpha * (x.lazy() / 4.0) ** beta).evaluate(engine=engine)
+    expected = 1 + alpha * (x.array / 4.0) ** beta
+    assert result.dtype == expected.dtype
+    np.testing.assert_allclose(result.array, expected, rtol=1e-6)
+    result = (np.float32(2) * x.lazy() * np.float32(2)).evaluate(
+        engine=engine
+    )
+    assert result.dtype == dtype
+    np.testing.assert_allclose(result.array, x.array * 4)
+    result = (np.int64(2) * x.lazy()).evaluate(engine=engine)
+    assert result.dtype == (np.int64(2) * x.array).dtype
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_lazy_expression_writes_into_out(bpr_inputs, engine):
+    t0, x, c = bpr_inputs
+    expected = t0.array * (1 + x.array / c.array)
+    expression = t0.lazy() * (1 + x.lazy() / c)
+    assert expression.evaluate(out=t0, engine=engine) is t0
+    np.testing.assert_allclose(t0.array, expected)
+    out = EdgeArray(t0.base_graph, init_val=np.zeros((5, 2))[:, 0])
+    (x.lazy() * 2).evaluate(out=out, engine=engine)
+    np.testing.assert_allclose(out.array, x.array * 2)
+
+
+def test_lazy_expression_in_chunks(graph, monkeypatch):
+    monkeypatch.setattr(lazy, "CHUNK_SIZE", 2)
+    x = EdgeArray(graph, init_val=np.arange(5.0))
+    result = (x.lazy() * x + 1).evaluate(engine="chunked")
+    np.testing.assert_allclose(result.array, np.arange(5.0) ** 2 + 1)
+    counts = EdgeArray(graph, init_val=np.arange(5))
+    result = (counts.lazy() * 2).evaluate(engine="chunked")
+    assert result.array.dtype == np.arange(5).dtype
+
+
+def test_lazy_expression_with_batch_array(graph):
+    x = EdgeArray(graph, init_val=np.arange(5.0))
+    batch = BatchEdgeArray.from_columns([x, x * 2, x * 3])
+    result = (batch.lazy() + x * 1.0).evaluate()
+    assert isinstance(result, BatchEdgeArray)
+    assert result.column(2) == x * 4
+    result = (x.lazy() * 1.0 + batch).evaluate()
+    assert isinstance(result, BatchEdgeArray)
+    assert result.column(1) == x * 3
+
+
+def test_lazy_expression_checks_operands(graph):
+    x = EdgeArray(graph)
+    with pytest.raises(TypeError):
+        x.lazy() + NodeArray(graph)
+    other = BaseGraph([(0, 2)])
+    other.freeze()
+    with pytest.raises(ValueError):
+        x.lazy() + EdgeArray(other)
+    with pytest.raises(TypeError):
+        x.lazy() + np.zeros(5)
+    with pytest.raises(TypeError):
+        (x.lazy() + 1).evaluate(out=NodeArray(graph))
@@ -0,0 +1,76 @@
+import pytest
+
+import numpy as np
+import networkx as nx
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    NodeArray,
+    EdgeArray,
+    BatchEdgeArray,
+    SparseEdgeArray,
+)
+from grapharray.nxview import ArrayAttributeGraph
+
+
+@pytest.mark.parametrize("to_compact", [False, True])
+def test_view_has_graph_and_attributes(graph, to_compact):
+    if to_compact:
+        graph = CompactGraph.from_base_graph(graph)
+    potential = NodeArray(graph, init_val=np.arange(4.0))
+    cost = EdgeArray(graph, init_val=np.array([1.0, 5.0, 1.0, 5.0, 1.0]))
+    flow = EdgeArray(graph, init_val=np.arange(5))
+    view = ArrayAttributeGraph(
+        graph, {"potential": potential, "cost": cost, "flow": flow}
+    )
+    assert list(view.nodes) == [0, 2, 4, 6]
+    assert list(view.edges) == [(0, 2), (0, 4), (2, 4), (2, 6), (4, 6)]
+    assert view.number_of_edges() == 5
+    assert view.has_edge(2, 6) and not view.has_edge(6, 2)
+    assert 4 in view and 5 not in view
+    assert list(view.successors(2)) == [4, 6]
+    assert list(view.predecessors(4)) == [0, 2]
+    assert dict(view.in_degree) == {0: 0, 2: 1, 4: 2, 6: 2}
+    assert view.nodes[4] == {"potential": 2.0}
+    assert view.edges[2, 6] == {"cost": 5.0, "flow": 3}
+    assert nx.get_edge_attributes(view, "flow") == flow.as_dict()
+    assert nx.shortest_path(view, 0, 6, weight="cost") == [0, 2, 4, 6]
+    assert view.size(weight="flow") == 10
+
+
+def test_view_reads_current_values(graph):
+    cost = EdgeArray(graph, init_val=1.0)
+    view = cost.as_nx_view("cost")
+    cost[0, 2] = 10
+    assert view[0][2]["cost"] == 10
+    assert nx.shortest_path(view, 0, 4, weight="cost") == [0, 4]
+    assert view.copy().edges[0, 2] == {"cost": 10}
+    sub = view.subgraph([2, 4, 6])
+    assert list(sub.edges(data="cost")) == [
+        (2, 4, 1.0), (2, 6, 1.0), (4, 6, 1.0)
+    ]
+    assert list(view.reverse(copy=False).successors(4)) == [0, 2]
+
+
+def test_view_supports_batch_and_sparse_arrays(graph):
+    x = EdgeArray(graph, init_val=np.arange(5.0))
+    batch = BatchEdgeArray.from_columns([x, x * 2])
+    sparse = SparseEdgeArray(graph, init_val={(2, 4): 3.0})
+    view = ArrayAttributeGraph(graph, {"batch": batch, "sparse": sparse})
+    np.testing.assert_array_equal(view.edges[2, 4]["batch"], [2.0, 4.0])
+    assert view.edges[2, 4]["sparse"] == 3.0
+    assert view.edges[0, 2]["sparse"] == 0.0
+
+
+def test_view_is_read_only(graph):
+    view = NodeArray(graph).as_nx_view()
+    with pytest.raises(nx.NetworkXError):
+        view.add_edge(6, 0)
+    with pytest.raises(TypeError):
+        view.nodes[0]["value"] = 1
+    other = BaseGraph([(0, 2)])
+    other.freeze()
+    with pytest.raises(ValueError):
+        ArrayAttributeGraph(graph, {"value": NodeArray(other)})
+    with pytest.raises(TypeError):
+        ArrayAttributeGraph(graph, {"value": np.zeros(4)})
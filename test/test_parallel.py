@@ -0,0 +1,63 @@
+import pytest
+
+from grapharray.classes import (
+    BaseGraph,
+    NodeArray,
+    EdgeArray,
+    IncidenceMatrix,
+)
+from grapharray.parallel import map_scenarios
+
+
+def _scaled_inflow(flow, scale):
+    return IncidenceMatrix(flow.base_graph, matrix_free=True) @ (flow * scale)
+
+
+def _total(flow):
+    return float(flow.array.sum())
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+@pytest.mark.parametrize("chunksize", [1, 3])
+def test_map_scenarios(graph, executor, chunksize):
+    scale = EdgeArray(graph, init_val=2)
+    scenarios = [EdgeArray(graph, init_val=i) for i in range(5)]
+    results = list(
+        map_scenarios(
+            _scaled_inflow,
+            graph,
+            scenarios,
+            arrays={"scale": scale},
+            executor=executor,
+            max_workers=2,
+            chunksize=chunksize,
+        )
+    )
+    assert sorted(result.index for result in results) == list(range(5))
+    incidence = IncidenceMatrix(graph)
+    for index, result, elapsed in results:
+        assert isinstance(result, NodeArray)
+        assert result.base_graph is graph
+        assert result == incidence @ (scenarios[index] * 2)
+        assert elapsed >= 0
+
+
+def test_map_scenarios_returns_objects(graph):
+    scenarios = [EdgeArray(graph, init_val=i) for i in range(3)]
+    results = map_scenarios(_total, graph, scenarios, max_workers=2)
+    assert sorted((r.index, r.result) for r in results) == [
+        (0, 0.0),
+        (1, 5.0),
+        (2, 10.0),
+    ]
+
+
+def test_map_scenarios_checks_scenarios(graph):
+    other = BaseGraph([(0, 2)])
+    other.freeze()
+    with pytest.raises(ValueError):
+        map_scenarios(_total, graph, [EdgeArray(other)])
+    with pytest.raises(ValueError):
+        map_scenarios(_total, graph, [EdgeArray(graph)], executor="gpu")
+    with pytest.raises(ValueError):
+        map_scenarios(_total, graph, [EdgeArray(graph).T])
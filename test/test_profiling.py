@@ -0,0 +1,96 @@
+import pytest
+
+import numpy as np
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    GraphArray,
+    NodeArray,
+    EdgeArray,
+    AdjacencyMatrix,
+    IncidenceMatrix,
+)
+from grapharray.profiling import Profile, instrument, memory_summary, nbytes
+
+
+def test_profile_counts_hot_paths(graph):
+    x = EdgeArray(graph, init_val=np.arange(5.0))
+    operation = GraphArray.__dict__["_operation"]
+    with Profile() as profile:
+        y = x + x
+        y += x
+        snapshot = y.get_copy()
+        y += x  # Copies the array shared with snapshot.
+        x.array
+        IncidenceMatrix(graph) @ x
+    assert GraphArray.__dict__["_operation"] is operation
+    stats = profile.stats
+    assert stats["GraphArray._operation"].calls == 3
+    assert stats["GraphArray.__init__"].calls >= 3
+    assert stats["IncidenceMatrix.__matmul__"].calls == 1
+    assert stats["GraphArray.array"].calls == 1
+    assert stats["GraphArray._ensure_writable"].allocated >= x._array.nbytes
+    assert snapshot == x * 3
+    assert stats["BaseGraphArray._operation_error_check"].time > 0
+    report = profile.report(sort="calls", limit=3)
+    assert len(report.splitlines()) == 4
+    with pytest.raises(ValueError):
+        profile.report(sort="name")
+
+
+def test_profile_records_callers_and_instrumented_functions(graph):
+    @instrument
+    def double(array):
+        return array * 2
+
+    x = NodeArray(graph, init_val=1.0)
+    assert double(x) == x * 2
+    with Profile(memory=False, callers=True) as profile:
+        double(x)
+        with pytest.raises(RuntimeError):
+            Profile().__enter__()
+    sites = list(profile.stats)
+    assert any(s.startswith("GraphArray._operation (") for s in sites)
+    assert any(__file__ in s for s in sites)
+    assert any("double" in s for s in sites)
+    assert all(stats.allocated == 0 for stats in profile.stats.values())
+
+
+@pytest.mark.parametrize("to_compact", [False, True])
+def test_memory_summary(graph, to_compact):
+    if to_compact:
+        graph = CompactGraph.from_base_graph(graph)
+    x = EdgeArray(graph, init_val=np.arange(5.0))
+    adjacency = AdjacencyMatrix(x)
+    incidence = IncidenceMatrix(graph, matrix_free=True)
+    assert nbytes(x) == 40
+    assert nbytes(incidence) == 0
+    summary = memory_summary(
+        graph,
+        arrays={"x": x, "y": x},
+        matrices={"A": adjacency, "B": incidence},
+    )
+    assert summary["arrays.x"] == 40
+    assert summary["arrays.y"] == 0  # The same array is counted once.
+    assert 0 < summary["matrices.A"] < nbytes(adjacency)
+    assert summary["matrices.B"] == 0
+    assert summary["graph.edge_tails"] > 0
+    assert summary["total"] == sum(
+        v for k, v in summary.items() if k != "total"
+    )
+    other = BaseGraph([(0, 2)])
+    other.freeze()
+    with pytest.raises(ValueError):
+        memory_summary(other, arrays={"x": x})
+
+
+def test_memory_summary_after_export_to_pandas(graph):
+    pytest.importorskip("pandas")
+    x = EdgeArray(graph, init_val=np.arange(5.0))
+    x.to_pandas()
+    NodeArray(graph).to_pandas()
+    summary = memory_summary(graph, arrays={"x": x})
+    assert summary["graph.export_cache"] > 0
+    assert summary["total"] == sum(
+        v for k, v in summary.items() if k != "total"
+    )
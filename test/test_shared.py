@@ -0,0 +1,61 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import numpy as np
+from grapharray.classes import (
+    CompactGraph,
+    NodeArray,
+    EdgeArray,
+    BatchEdgeArray,
+    IncidenceMatrix,
+)
+from grapharray.shared import SharedGraph
+
+
+@pytest.mark.parametrize("to_compact", [False, True])
+def test_can_pickle_graph_and_arrays(graph, to_compact):
+    if to_compact:
+        graph = CompactGraph.from_base_graph(graph)
+    edge_array = EdgeArray(graph, init_val=np.arange(5.0))
+    node_array = NodeArray(graph, init_val=1)
+    loaded = pickle.loads(pickle.dumps((graph, edge_array, node_array)))
+    loaded_graph, loaded_edge_array, loaded_node_array = loaded
+    assert loaded_edge_array.base_graph is loaded_graph
+    assert loaded_edge_array.as_dict() == edge_array.as_dict()
+    assert dict(loaded_graph.edge_to_index) == dict(graph.edge_to_index)
+    assert IncidenceMatrix(loaded_graph) @ loaded_edge_array == (
+        NodeArray(loaded_graph, (IncidenceMatrix(graph) @ edge_array).array)
+    )
+
+
+def test_can_attach_shared_graph(graph):
+    weight = EdgeArray(graph, init_val=np.arange(5.0))
+    batch = BatchEdgeArray.from_columns([weight, weight * 2])
+    with SharedGraph(graph, {"weight": weight, "batch": batch}) as shared:
+        handle = pickle.loads(pickle.dumps(shared.handle))
+        attached_graph, arrays = handle.attach()
+        assert handle.attach()[0] is attached_graph
+        assert dict(attached_graph.edge_to_index) == dict(graph.edge_to_index)
+        assert arrays["weight"].as_dict() == weight.as_dict()
+        assert arrays["batch"].column(1) == arrays["weight"] * 2
+        with pytest.raises(ValueError):
+            arrays["weight"][0, 2] = 10
+        shared.arrays["weight"][0, 2] = 10
+        assert arrays["weight"][0, 2] == 10
+        del attached_graph, arrays
+
+
+def _inflow_to_sink(handle):
+    graph, arrays = handle.attach()
+    inflow = IncidenceMatrix(graph, matrix_free=True) @ arrays["flow"]
+    return inflow[6]
+
+
+def test_can_use_shared_graph_in_process_pool(graph):
+    flow = EdgeArray(graph, init_val=np.arange(5.0))
+    with SharedGraph(graph, {"flow": flow}) as shared:
+        with ProcessPoolExecutor(2) as executor:
+            results = list(executor.map(_inflow_to_sink, [shared.handle] * 4))
+    assert results == [7.0] * 4
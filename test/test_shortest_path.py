@@ -0,0 +1,85 @@
+import pytest
+
+import numpy as np
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    NodeArray,
+    EdgeArray,
+    BatchNodeArray,
+    BatchEdgeArray,
+)
+from grapharray.shortest_path import ShortestPathEngine, shortest_paths
+
+
+@pytest.fixture
+def graph():
+    g = [(0, 2), (0, 4), (2, 4), (2, 6), (4, 6), (6, 8)]
+    bg = BaseGraph(g)
+    bg.freeze()
+    return bg
+
+
+@pytest.mark.parametrize("to_compact", [False, True])
+@pytest.mark.parametrize("method", ["auto", "dijkstra", "bellman-ford"])
+def test_single_origin(graph, to_compact, method):
+    if to_compact:
+        graph = CompactGraph.from_base_graph(graph)
+    cost = EdgeArray(graph, init_val=np.array([1, 5, 1, 5, 1, 0]))
+    result = ShortestPathEngine(graph).solve(cost, 0, method=method)
+    assert isinstance(result.distances, NodeArray)
+    assert np.array_equal(result.distances.array, [0, 1, 2, 3, 3])
+    assert np.array_equal(result.predecessors.array, [-1, 0, 1, 2, 3])
+    assert np.array_equal(result.predecessor_edges.array, [-1, 0, 2, 4, 5])
+    tree = result.tree_edges()
+    assert isinstance(tree, EdgeArray)
+    assert np.array_equal(tree.array, [1, 0, 1, 0, 1, 1])
+    path = result.path_edges(6)
+    assert np.array_equal(path.array, [1, 0, 1, 0, 1, 0])
+
+
+def test_many_origins_and_refreshed_costs(graph):
+    engine = ShortestPathEngine(graph)
+    cost = EdgeArray(graph, init_val=np.array([1.0, 5, 1, 5, 1, 1]))
+    result = engine.solve(cost, [0, 4, 8])
+    assert isinstance(result.distances, BatchNodeArray)
+    assert np.array_equal(
+        result.distances.array,
+        [[0, np.inf, np.inf], [1, np.inf, np.inf], [2, 0, np.inf],
+         [3, 1, np.inf], [4, 2, 0]],
+    )
+    path = result.path_edges([6, 8, 8])
+    assert isinstance(path, BatchEdgeArray)
+    assert np.array_equal(path.column(0).array, [1, 0, 1, 0, 1, 0])
+    assert np.array_equal(path.column(1).array, [0, 0, 0, 0, 1, 1])
+    assert not path.column(2).array.any()
+    cost[0, 2] = 10.0
+    result = engine.solve(cost, [2, 0])
+    assert np.array_equal(result.distances.column(1).array, [0, 10, 5, 6, 7])
+
+
+def test_load(graph):
+    cost = EdgeArray(graph, init_val=np.array([1, 5, 1, 5, 1, 1]))
+    result = shortest_paths(cost, [0, 2])
+    demand = BatchNodeArray(
+        graph, init_val=np.array([[0, 0], [1, 0], [2, 1], [3, 0], [4, 5]])
+    )
+    flow = result.load(demand)
+    assert np.array_equal(flow.array, [10, 0, 15, 0, 12, 9])
+    out = EdgeArray(graph)
+    assert result.load(demand, out=out) is out
+    assert out == flow
+    with pytest.raises(ValueError):
+        result.load(BatchNodeArray(graph, init_val=np.ones((5, 2))))
+
+
+def test_errors(graph):
+    engine = ShortestPathEngine(graph)
+    with pytest.raises(ValueError):
+        engine.solve(EdgeArray(graph), 0, method="floyd")
+    with pytest.raises(TypeError):
+        engine.solve(NodeArray(graph), 0)
+    other = BaseGraph([(0, 2)])
+    other.freeze()
+    with pytest.raises(ValueError):
+        engine.solve(EdgeArray(other), 0)
@@ -0,0 +1,117 @@
+import pytest
+
+import numpy as np
+from grapharray.classes import (
+    BaseGraph,
+    NodeArray,
+    EdgeArray,
+    BatchEdgeArray,
+    SparseNodeArray,
+    SparseEdgeArray,
+    AdjacencyMatrix,
+    IncidenceMatrix,
+)
+
+
+@pytest.fixture
+def flow(graph):
+    return SparseEdgeArray(graph, {(2, 6): 3.0, (0, 2): 1.5, (4, 6): 0})
+
+
+def test_sparse_array_stores_nonzeros(graph, flow):
+    assert flow.nnz == 2
+    assert flow[2, 6] == 3.0
+    assert flow[0, 4] == 0
+    np.testing.assert_array_equal(flow[[(0, 2), (2, 4)]], [1.5, 0])
+    np.testing.assert_array_equal(flow.array, [1.5, 0, 0, 3.0, 0])
+    assert flow.as_dict() == {(0, 2): 1.5, (2, 6): 3.0}
+    dense = EdgeArray(graph, init_val=flow.array)
+    assert flow.to_dense() == dense
+    assert SparseEdgeArray(graph, dense) == flow
+    assert flow == dense
+    assert SparseEdgeArray(graph).nnz == 0
+
+
+def test_can_set_items_of_sparse_array(flow):
+    flow[0, 4] = 2.0
+    flow[[(2, 6), (4, 6), (2, 4)]] = [1.0, 0, 5.0]
+    assert flow.nnz == 4
+    np.testing.assert_array_equal(flow.array, [1.5, 2.0, 5.0, 1.0, 0])
+    np.testing.assert_array_equal(flow.indices, [0, 1, 2, 3])
+
+
+def test_can_create_sparse_array_from_indices(graph):
+    indices = graph.edges_to_indices([(2, 6), (0, 2), (2, 6)])
+    flow = SparseEdgeArray.from_indices(graph, indices, [1.0, 2.0, 3.0])
+    assert flow.as_dict() == {(0, 2): 2.0, (2, 6): 4.0}
+
+
+def test_sparse_arithmetic(graph, flow):
+    dense = EdgeArray(graph, init_val=np.arange(1.0, 6.0))
+    other = SparseEdgeArray(graph, {(2, 6): 1.0, (2, 4): 2.0})
+    expected = flow.array
+    cases = [
+        (flow + other, SparseEdgeArray, expected + other.array),
+        (flow - other, SparseEdgeArray, expected - other.array),
+        (flow * other, SparseEdgeArray, expected * other.array),
+        (flow + dense, EdgeArray, expected + dense.array),
+        (dense + flow, EdgeArray, expected + dense.array),
+        (dense - flow, EdgeArray, dense.array - expected),
+        (flow - dense, EdgeArray, expected - dense.array),
+        (flow * dense, SparseEdgeArray, expected * dense.array),
+        (dense * flow, SparseEdgeArray, expected * dense.array),
+        (flow / dense, SparseEdgeArray, expected / dense.array),
+        (2 * flow, SparseEdgeArray, 2 * expected),
+        (flow ** 2, SparseEdgeArray, expected ** 2),
+        (flow + 1, EdgeArray, expected + 1),
+    ]
+    for result, result_class, correct in cases:
+        assert type(result) is result_class
+        np.testing.assert_array_equal(result.array, correct)
+    assert (flow * other).nnz == 1
+
+
+@pytest.mark.parametrize("scalar", [np.int64(2), np.float32(2)])
+def test_sparse_arithmetic_with_numpy_scalars(flow, scalar):
+    expected = flow.array
+    cases = [
+        (flow * scalar, SparseEdgeArray, expected * 2),
+        (scalar * flow, SparseEdgeArray, expected * 2),
+        (flow / scalar, SparseEdgeArray, expected / 2),
+        (flow ** scalar, SparseEdgeArray, expected ** 2),
+        (flow + scalar, EdgeArray, expected + 2),
+        (scalar + flow, EdgeArray, expected + 2),
+        (scalar - flow, EdgeArray, 2 - expected),
+    ]
+    for result, result_class, correct in cases:
+        assert type(result) is result_class
+        np.testing.assert_array_equal(result.array, correct)
+    assert flow.power(np.float64(2)).nnz == flow.nnz
+
+
+def test_invalid_sparse_operations_denied(graph, flow):
+    with pytest.raises(TypeError):
+        flow + NodeArray(graph)
+    with pytest.raises(TypeError):
+        flow + SparseNodeArray(graph)
+    with pytest.raises(TypeError):
+        flow * BatchEdgeArray(graph, n_columns=2)
+    other = BaseGraph([(0, 2)])
+    other.freeze()
+    with pytest.raises(ValueError):
+        flow + SparseEdgeArray(other)
+
+
+@pytest.mark.parametrize("matrix_free", [False, True])
+def test_sparse_matmul(graph, flow, matrix_free):
+    inc = IncidenceMatrix(graph, matrix_free=matrix_free)
+    dense = flow.to_dense()
+    assert inc @ flow == inc @ dense
+    potential = SparseNodeArray(graph, {4: 2.0})
+    transposed = IncidenceMatrix(graph, matrix_free=matrix_free).T
+    assert transposed @ potential == transposed @ potential.to_dense()
+    out = NodeArray(graph)
+    assert inc.matmul(flow, out=out) is out
+    assert out == IncidenceMatrix(graph) @ dense
+    adj = AdjacencyMatrix(EdgeArray(graph, init_val=np.arange(5.0)))
+    assert adj @ potential == adj @ potential.to_dense()
@@ -0,0 +1,88 @@
+import pytest
+
+import numpy as np
+from grapharray.classes import (
+    BaseGraph,
+    CompactGraph,
+    NodeArray,
+    EdgeArray,
+    BatchNodeArray,
+    SparseEdgeArray,
+    AdjacencyMatrix,
+    IncidenceMatrix,
+)
+from grapharray.spmv import ParallelMatmul
+
+
+@pytest.fixture
+def graph():
+    g = [(0, 2), (0, 4), (2, 4), (2, 6), (4, 6), (6, 0), (6, 2)]
+    bg = BaseGraph(g)
+    bg.freeze()
+    return bg
+
+
+@pytest.mark.parametrize("to_compact", [False, True])
+@pytest.mark.parametrize("sparse_format", ["csr", "csc"])
+def test_adjacency_matmul(graph, to_compact, sparse_format):
+    if to_compact:
+        graph = CompactGraph.from_base_graph(graph)
+    weight = EdgeArray(graph, init_val=np.arange(1.0, 8.0))
+    matrix = AdjacencyMatrix(weight, sparse_format)
+    x = NodeArray(graph, init_val=np.array([1.0, 2, 3, 4]))
+    with ParallelMatmul(matrix, n_threads=3, min_nnz=0) as parallel:
+        assert parallel.is_parallel
+        assert parallel @ x == matrix @ x
+        matrix.update(weight * 2)
+        assert parallel @ x == matrix @ x
+        batch = BatchNodeArray(graph, init_val=np.arange(8.0).reshape(4, 2))
+        assert np.array_equal((parallel @ batch).array, (matrix @ batch).array)
+        out = NodeArray(graph)
+        assert parallel.matmul(x, out=out) is out
+        assert out == matrix @ x
+        with pytest.raises(TypeError):
+            parallel @ weight
+    assert not parallel.is_parallel
+    assert parallel @ x == matrix @ x
+
+
+@pytest.mark.parametrize("matrix_free", [False, True])
+def test_incidence_matmul(graph, matrix_free):
+    matrix = IncidenceMatrix(graph, matrix_free=matrix_free)
+    flow = EdgeArray(graph, init_val=np.arange(7, dtype=np.int32))
+    parallel = ParallelMatmul(matrix, n_threads=2, min_nnz=0)
+    res = parallel @ flow
+    assert res.dtype == np.int32
+    assert res == matrix @ flow
+    sparse = SparseEdgeArray(graph, {(0, 2): 1.0})
+    assert parallel @ sparse == matrix @ sparse
+    x = NodeArray(graph, init_val=np.array([1.0, 2, 3, 4]))
+    transposed = ParallelMatmul(matrix.T, n_threads=2, min_nnz=0)
+    assert transposed @ x == matrix @ x
+    with pytest.raises(ValueError):
+        parallel @ x
+    parallel.close()
+    transposed.close()
+
+
+@pytest.mark.parametrize("matrix_free", [False, True])
+def test_is_incidence_matmul_of_small_dtypes_not_overflowed(matrix_free):
+    star = BaseGraph([(i, 0) for i in range(1, 201)])
+    star.freeze()
+    matrix = IncidenceMatrix(star, matrix_free=matrix_free)
+    mask = EdgeArray(star, init_val=np.ones(200, dtype=bool))
+    with ParallelMatmul(matrix, n_threads=2, min_nnz=0) as parallel:
+        assert parallel.is_parallel
+        res = parallel @ mask
+    assert res.dtype == np.int64
+    assert res[0] == 200
+
+
+def test_small_matrix_is_not_split(graph):
+    matrix = IncidenceMatrix(graph)
+    assert not ParallelMatmul(matrix, n_threads=4).is_parallel
+    assert not ParallelMatmul(matrix, n_threads=1, min_nnz=0).is_parallel
+    with pytest.raises(ValueError):
+        ParallelMatmul(matrix, n_threads=0)
+    with pytest.raises(TypeError):
+        ParallelMatmul(EdgeArray(graph))
@@ -0,0 +1,116 @@
+import pickle
+
+import pytest
+
+import numpy as np
+from grapharray.classes import (
+    CompactGraph,
+    NodeArray,
+    EdgeArray,
+    BatchEdgeArray,
+    AdjacencyMatrix,
+    IncidenceMatrix,
+)
+from grapharray.subgraph import SubGraph, NodeArrayView, EdgeArrayView
+
+
+@pytest.mark.parametrize("to_compact", [False, True])
+def test_can_select_subgraph(graph, to_compact):
+    if to_compact:
+        graph = CompactGraph.from_base_graph(graph)
+    induced = SubGraph(graph, nodes=[4, 2, 6])
+    assert list(induced.node_to_index) == [2, 4, 6]
+    assert list(induced.edge_to_index) == [(2, 4), (2, 6), (4, 6)]
+    np.testing.assert_array_equal(induced.edge_indices, [2, 3, 4])
+    by_edges = SubGraph(graph, edges=[(2, 6), (0, 2)])
+    assert list(by_edges.node_to_index) == [0, 2, 6]
+    assert list(by_edges.edge_to_index) == [(0, 2), (2, 6)]
+    assert by_edges.parent is graph
+    loaded = pickle.loads(pickle.dumps(by_edges))
+    assert list(loaded.edge_to_index) == [(0, 2), (2, 6)]
+    with pytest.raises(ValueError):
+        SubGraph(graph)
+
+
+def test_view_writes_through(graph):
+    sub = SubGraph(graph, nodes=[2, 4, 6])
+    flow = EdgeArray(graph, init_val=np.arange(5.0))
+    view = sub.view(flow)
+    assert isinstance(view, EdgeArrayView)
+    assert len(view) == 3
+    assert view[2, 6] == 3.0
+    np.testing.assert_array_equal(view[[(4, 6), (2, 4)]], [4.0, 2.0])
+    view[2, 4] = 10
+    assert flow[2, 4] == 10
+    view *= 2
+    np.testing.assert_array_equal(flow.array, [0, 1, 20, 6, 8])
+    gathered = view.get()
+    assert isinstance(gathered, EdgeArray)
+    assert gathered.base_graph is sub
+    view.set(gathered + 1)
+    np.testing.assert_array_equal(flow.array, [0, 1, 21, 7, 9])
+    view.set(0)
+    np.testing.assert_array_equal(flow.array, [0, 1, 0, 0, 0])
+    with pytest.raises(TypeError):
+        view.set(NodeArray(sub))
+
+
+def test_view_operations(graph):
+    sub = SubGraph(graph, edges=[(0, 2), (2, 6)])
+    potential = NodeArray(graph, {0: 1.0, 2: 3.0, 4: 5.0, 6: 2.0})
+    view = sub.view(potential)
+    assert isinstance(view, NodeArrayView)
+    local = NodeArray(sub, init_val=2.0)
+    assert view + local == NodeArray(sub, {0: 3.0, 2: 5.0, 6: 4.0})
+    assert local * view == NodeArray(sub, {0: 2.0, 2: 6.0, 6: 4.0})
+    inc = IncidenceMatrix(sub)
+    assert inc.T @ view == EdgeArray(sub, {(0, 2): 2.0, (2, 6): -1.0})
+
+
+def test_view_of_batch_array(graph):
+    sub = SubGraph(graph, nodes=[2, 4, 6])
+    flow = EdgeArray(graph, init_val=np.arange(5.0))
+    batch = BatchEdgeArray.from_columns([flow, flow * 2])
+    view = sub.view(batch)
+    np.testing.assert_array_equal(view[2, 6], [3.0, 6.0])
+    view += 1
+    np.testing.assert_array_equal(batch.column(1).array, [0, 2, 5, 7, 9])
+
+
+@pytest.mark.parametrize("matrix_free", [False, True])
+def test_can_restrict_incidence_matrix(graph, matrix_free):
+    sub = SubGraph(graph, nodes=[2, 4, 6])
+    restricted = sub.restrict(IncidenceMatrix(graph, matrix_free=matrix_free))
+    assert restricted.base_graph is sub
+    np.testing.assert_array_equal(
+        restricted.array.toarray(), IncidenceMatrix(sub).array.toarray()
+    )
+    transposed = sub.restrict(IncidenceMatrix(graph).T)
+    assert transposed.is_transposed
+    flow = sub.view(EdgeArray(graph, init_val=np.arange(5.0)))
+    assert restricted @ flow == IncidenceMatrix(sub) @ flow.get()
+
+
+@pytest.mark.parametrize("sparse_format", ["csr", "csc", "coo", "lil"])
+def test_can_restrict_adjacency_matrix(graph, sparse_format):
+    sub = SubGraph(graph, nodes=[2, 4, 6])
+    weight = EdgeArray(graph, init_val=np.arange(1.0, 6.0))
+    restricted = sub.restrict(AdjacencyMatrix(weight, sparse_format))
+    correct = AdjacencyMatrix(sub.view(weight).get())
+    np.testing.assert_array_equal(
+        restricted.array.toarray(), correct.array.toarray()
+    )
+    assert restricted.sparse_format == sparse_format
+    sub = SubGraph(graph, edges=[(2, 4), (4, 6)])
+    weight[2, 4] = 0.0
+    restricted = sub.restrict(AdjacencyMatrix(weight, sparse_format))
+    correct = AdjacencyMatrix(sub.view(weight).get())
+    np.testing.assert_array_equal(
+        restricted.array.toarray(), correct.array.toarray()
+    )
+    sub_weight = EdgeArray(sub, init_val=np.array([1.0, 2.0]))
+    restricted.update(sub_weight)
+    np.testing.assert_array_equal(
+        restricted.array.toarray(),
+        AdjacencyMatrix(sub_weight).array.toarray(),
+    )